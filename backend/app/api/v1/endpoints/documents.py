@@ -4,14 +4,14 @@ Document API endpoints — upload, list, download, process, RAG search.
 
 import uuid
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, File, Form, Header, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.document import (
     DocumentDetail,
+    DocumentPagesResponse,
     DocumentResponse,
     ProcessResponse,
     SearchRequest,
@@ -19,7 +19,8 @@ from app.schemas.document import (
     SearchResult,
 )
 from app.services.auth_service import get_current_user
-from app.services import document_service, rag_service
+from app.core.config import settings
+from app.services import document_service, rag_service, storage_service
 
 router = APIRouter()
 
@@ -54,6 +55,17 @@ async def get_document(
     return await document_service.get_document(document_id, db)
 
 
+@router.get("/{document_id}/pages", response_model=DocumentPagesResponse)
+async def get_document_pages(
+    document_id: uuid.UUID,
+    start: int = Query(1, ge=1),
+    end: int | None = Query(None, ge=1),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await document_service.get_pages(document_id, start, end, db)
+
+
 @router.delete("/{document_id}", status_code=204)
 async def delete_document(
     document_id: uuid.UUID,
@@ -75,21 +87,21 @@ async def process_document(
 @router.get("/{document_id}/download")
 async def download_document(
     document_id: uuid.UUID,
+    redirect: bool = Query(False, description="以預簽網址直接自 MinIO 下載"),
+    range_header: str | None = Header(None, alias="Range"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    data, filename, file_type = await document_service.download_document(
+    object_name, filename, file_type = await document_service.get_document_object(
         document_id, db
     )
-    media_types = {
-        "pdf": "application/pdf",
-        "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    }
-    return Response(
-        content=data,
-        media_type=media_types.get(file_type, "application/octet-stream"),
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    media_type = storage_service.media_type_for(file_type)
+    if redirect:
+        return storage_service.redirect_to_object(
+            settings.BUCKET_TENDER_DOCS, object_name, filename, media_type
+        )
+    return await storage_service.stream_object(
+        settings.BUCKET_TENDER_DOCS, object_name, filename, media_type, range_header
     )
 
 
@@ -3,10 +3,8 @@ Export API endpoints — generate DOCX/PDF, manage templates.
 """
 
 import uuid
-from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, File, Form, Header, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
@@ -20,7 +18,8 @@ from app.schemas.export import (
     TemplateUpdate,
 )
 from app.services.auth_service import get_current_user
-from app.services import export_service
+from app.core.config import settings
+from app.services import export_service, storage_service
 
 router = APIRouter()
 
@@ -35,6 +34,7 @@ async def create_export(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """Queue an export; poll ``/{export_id}/status`` until it completes."""
     return await export_service.export_project(body, current_user.id, db)
 
 
@@ -50,20 +50,19 @@ async def get_export_status(
 @router.get("/{export_id}/download")
 async def download_export(
     export_id: uuid.UUID,
+    redirect: bool = Query(False, description="以預簽網址直接自 MinIO 下載"),
+    range_header: str | None = Header(None, alias="Range"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    data, filename, fmt = await export_service.download_export(export_id, db)
-    media_types = {
-        "pdf": "application/pdf",
-        "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    }
-    return Response(
-        content=data,
-        media_type=media_types.get(fmt, "application/octet-stream"),
-        headers={
-            "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"
-        },
+    object_name, filename, fmt = await export_service.get_export_object(export_id, db)
+    media_type = storage_service.media_type_for(fmt)
+    if redirect:
+        return storage_service.redirect_to_object(
+            settings.BUCKET_EXPORTS, object_name, filename, media_type
+        )
+    return await storage_service.stream_object(
+        settings.BUCKET_EXPORTS, object_name, filename, media_type, range_header
     )
 
 
@@ -4,9 +4,10 @@ Project API endpoints.
 
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import concurrency
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.project import (
@@ -15,6 +16,7 @@ from app.schemas.project import (
     ProjectList,
     ProjectMemberCreate,
     ProjectMemberResponse,
+    ProjectProgressResponse,
     ProjectResponse,
     ProjectUpdate,
 )
@@ -44,20 +46,30 @@ async def list_projects(
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: uuid.UUID,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await project_service.get_project(project_id, db)
+    project = await project_service.get_project(project_id, db)
+    response.headers["ETag"] = concurrency.etag(project.row_version)
+    return project
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: uuid.UUID,
     body: ProjectUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await project_service.update_project(project_id, body, current_user, db)
+    """Send the ETag from the last read as If-Match; 409 if it is stale."""
+    project = await project_service.update_project(
+        project_id, body, current_user, db, if_match=if_match
+    )
+    response.headers["ETag"] = concurrency.etag(project.row_version)
+    return project
 
 
 @router.delete("/{project_id}", status_code=204)
@@ -96,3 +108,12 @@ async def get_budget(
     db: AsyncSession = Depends(get_db),
 ):
     return await project_service.get_budget(project_id, db)
+
+
+@router.get("/{project_id}/progress", response_model=ProjectProgressResponse)
+async def get_progress(
+    project_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await project_service.get_progress(project_id, db)
@@ -0,0 +1,30 @@
+"""
+Realtime API — per-project WebSocket of lock, version and status events.
+"""
+
+import uuid
+
+from fastapi import APIRouter, Query, WebSocket
+
+from app.services import realtime_service
+
+router = APIRouter()
+
+
+@router.websocket("/projects/{project_id}")
+async def project_events(
+    websocket: WebSocket,
+    project_id: uuid.UUID,
+    token: str = Query(...),
+):
+    user = await realtime_service.authenticate(token)
+    # Accept first: closing during the handshake is an HTTP 403 and the
+    # browser would only see 1006, not the code that asks for a refresh
+    await websocket.accept()
+    if user is None:
+        await websocket.close(code=realtime_service.CLOSE_UNAUTHORIZED)
+        return
+    if not await realtime_service.can_watch(project_id, user):
+        await websocket.close(code=realtime_service.CLOSE_FORBIDDEN)
+        return
+    await realtime_service.serve(websocket, project_id, user)
@@ -4,24 +4,32 @@ Section API endpoints — CRUD, tree, locking, versions.
 
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import concurrency
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.section import (
+    PageBudgetResponse,
     ReorderRequest,
+    SectionBulkRequest,
     SectionCreate,
     SectionLockResponse,
     SectionResponse,
+    SectionSearchPage,
     SectionTree,
     SectionUpdate,
     SectionVersionCreate,
+    SectionVersionPage,
     SectionVersionResponse,
     SetCurrentVersionRequest,
+    VersionDiffResponse,
+    VersionMergeRequest,
+    VersionMergeResponse,
 )
 from app.services.auth_service import get_current_user
-from app.services import section_service
+from app.services import search_service, section_service
 
 router = APIRouter()
 
@@ -42,29 +50,108 @@ async def create_section(
 @router.get("/tree/{project_id}", response_model=list[SectionTree])
 async def get_sections_tree(
     project_id: uuid.UUID,
+    if_none_match: str | None = Header(default=None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await section_service.get_sections_tree(project_id, db)
+    etag, body = await section_service.get_sections_tree_json(project_id, db, if_none_match)
+    # Browsers revalidate on every load and get 304 while the tree is unchanged
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/page-budget/{project_id}", response_model=PageBudgetResponse)
+async def get_page_budget(
+    project_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.get_page_budget(project_id, db)
+
+
+# Registered before the /{section_id} routes, which would otherwise match
+# "reorder", "bulk" or "search" as a section id
+@router.put("/reorder", response_model=list[SectionResponse])
+async def reorder_sections(
+    body: ReorderRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.reorder_sections(body, db)
+
+
+@router.post("/bulk", response_model=list[SectionResponse])
+async def bulk_update_sections(
+    body: SectionBulkRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.bulk_update_sections(body, current_user, db)
+
+
+@router.get("/search", response_model=SectionSearchPage)
+async def search_sections(
+    q: str = Query(..., min_length=1, max_length=200),
+    project_id: uuid.UUID | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Current section content across the user's projects, best match first."""
+    return await search_service.search_sections(
+        q, current_user, db, project_id=project_id, limit=limit, offset=offset
+    )
 
 
 @router.get("/{section_id}", response_model=SectionResponse)
 async def get_section(
+    section_id: uuid.UUID,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    section = await section_service.get_section(section_id, db)
+    response.headers["ETag"] = concurrency.etag(section.row_version)
+    return section
+
+
+@router.get("/{section_id}/subtree", response_model=list[SectionResponse])
+async def get_subtree(
+    section_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.get_subtree(section_id, db)
+
+
+@router.get("/{section_id}/ancestors", response_model=list[SectionResponse])
+async def get_ancestors(
     section_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await section_service.get_section(section_id, db)
+    return await section_service.get_ancestors(section_id, db)
 
 
 @router.put("/{section_id}", response_model=SectionResponse)
 async def update_section(
     section_id: uuid.UUID,
     body: SectionUpdate,
+    response: Response,
+    if_match: str | None = Header(default=None),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await section_service.update_section(section_id, body, current_user, db)
+    """Send the ETag from the last read as If-Match; 409 with the current
+    section if it is stale."""
+    section = await section_service.update_section(
+        section_id, body, current_user, db, if_match=if_match
+    )
+    response.headers["ETag"] = concurrency.etag(section.row_version)
+    return section
 
 
 @router.delete("/{section_id}", status_code=204)
@@ -76,15 +163,6 @@ async def delete_section(
     await section_service.delete_section(section_id, current_user, db)
 
 
-@router.put("/reorder", response_model=list[SectionResponse])
-async def reorder_sections(
-    body: ReorderRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    return await section_service.reorder_sections(body, db)
-
-
 # ---------------------------------------------------------------------------
 # Locking
 # ---------------------------------------------------------------------------
@@ -130,6 +208,49 @@ async def get_versions(
     return await section_service.get_versions(section_id, db)
 
 
+# Registered before /versions/{version_id}, which would match these names
+@router.get("/{section_id}/versions/history", response_model=SectionVersionPage)
+async def list_versions(
+    section_id: uuid.UUID,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.list_versions(section_id, db, limit=limit, offset=offset)
+
+
+@router.get("/{section_id}/versions/diff", response_model=VersionDiffResponse)
+async def diff_versions(
+    section_id: uuid.UUID,
+    from_version_id: uuid.UUID,
+    to_version_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.diff_versions(section_id, from_version_id, to_version_id, db)
+
+
+@router.post("/{section_id}/versions/merge", response_model=VersionMergeResponse)
+async def merge_versions(
+    section_id: uuid.UUID,
+    body: VersionMergeRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.merge_versions(section_id, body, current_user, db)
+
+
+@router.get("/{section_id}/versions/{version_id}", response_model=SectionVersionResponse)
+async def get_version(
+    section_id: uuid.UUID,
+    version_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await section_service.get_version(section_id, version_id, db)
+
+
 @router.put("/{section_id}/current-version", response_model=SectionResponse)
 async def set_current_version(
     section_id: uuid.UUID,
@@ -0,0 +1,36 @@
+"""
+Optimistic concurrency — row versions as ETags and If-Match checks.
+
+Sections and projects carry ``row_version``, bumped by each update of
+their fields.  Responses send it as the ETag; an update sent with
+``If-Match`` applies only while the row is still at that version, and is
+otherwise refused with 409 and the row's current state.
+"""
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+
+def etag(row_version: int) -> str:
+    return f'"{row_version}"'
+
+
+def expected_version(if_match: str | None) -> int | None:
+    """Row version an ``If-Match`` header requires; None when absent or ``*``."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.split(",")[0].strip().removeprefix("W/").strip('"')
+    try:
+        return int(tag)
+    except ValueError:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "If-Match 格式錯誤")
+
+
+def conflict(message: str, current: BaseModel, row_version: int) -> HTTPException:
+    """409 carrying the row as it is now, so the client can reapply its
+    edit and retry with the new ETag."""
+    return HTTPException(
+        status.HTTP_409_CONFLICT,
+        {"message": message, "current": current.model_dump(mode="json")},
+        headers={"ETag": etag(row_version)},
+    )
@@ -50,6 +50,8 @@ class Settings(BaseSettings):
     # Redis Settings
     # =========================================================================
     REDIS_URL: str = Field(default="redis://redis:6379/0")
+    # Fail fast so a Redis outage degrades to database locks instead of hanging
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = Field(default=2.0)
     
     # =========================================================================
     # MinIO Settings
@@ -58,6 +60,9 @@ class Settings(BaseSettings):
     MINIO_ACCESS_KEY: str = Field(default="aipg_minio_admin")
     MINIO_SECRET_KEY: str = Field(default="aipg_minio_secret_2024")
     MINIO_SECURE: bool = Field(default=False)
+    MINIO_REGION: str = Field(default="us-east-1")
+    # Host the browser can reach for presigned downloads (e.g. "localhost:9000")
+    MINIO_PUBLIC_ENDPOINT: Optional[str] = Field(default=None)
     
     # Bucket Names
     BUCKET_TENDER_DOCS: str = "tender-documents"
@@ -100,11 +105,75 @@ class Settings(BaseSettings):
     ALLOWED_UPLOAD_EXTENSIONS: List[str] = Field(
         default=[".pdf", ".docx", ".doc", ".png", ".jpg", ".jpeg", ".gif"]
     )
+    # Full parsed text lives in the page store; the DB keeps a preview
+    DOCUMENT_TEXT_PREVIEW_CHARS: int = Field(default=200_000)
+    DOWNLOAD_CHUNK_SIZE: int = Field(default=256 * 1024)
+    DOWNLOAD_PRESIGNED_EXPIRE_MINUTES: int = Field(default=15)
+
+    # =========================================================================
+    # OCR (scanned PDFs)
+    # =========================================================================
+    OCR_ENABLED: bool = Field(default=True)
+    OCR_LANG: str = Field(default="chi_tra+eng")
+    OCR_DPI: int = Field(default=300)
+    OCR_WORKERS: int = Field(default=2)
+    OCR_MIN_TEXT_CHARS: int = Field(default=20)
+    OCR_TESSERACT_CMD: str = Field(default="tesseract")
+    OCR_CACHE_DIR: str = Field(default="/tmp/aipg-ocr-cache")
+
+    # =========================================================================
+    # PDF Conversion (LibreOffice pool)
+    # =========================================================================
+    PDF_CONVERTER_WORKERS: int = Field(default=2)
+    PDF_CONVERTER_TIMEOUT_SECONDS: int = Field(default=120)
+    PDF_CONVERTER_QUEUE_TIMEOUT_SECONDS: int = Field(default=300)
+    PDF_CONVERTER_STARTUP_TIMEOUT_SECONDS: int = Field(default=60)
+    # Restart a warm instance after this many conversions
+    PDF_CONVERTER_MAX_CONVERSIONS: int = Field(default=200)
+    PDF_CONVERTER_HEALTH_INTERVAL_SECONDS: int = Field(default=30)
+    # Each process keeps its slot profiles in a pid-<pid> subdirectory
+    PDF_CONVERTER_PROFILE_DIR: str = Field(default="/tmp/aipg-lo-profiles")
+    # Interpreter with python3-uno; warm mode is disabled if it can't import uno
+    PDF_CONVERTER_UNO_PYTHON: str = Field(default="/usr/bin/python3")
+
+    # =========================================================================
+    # Export Jobs
+    # =========================================================================
+    EXPORT_MAX_CONCURRENT_JOBS: int = Field(default=2)
+    # Each process heartbeats its queued/running jobs; a job whose heartbeat
+    # is older than EXPORT_STALE_JOB_SECONDS lost its process and is failed
+    EXPORT_HEARTBEAT_INTERVAL_SECONDS: int = Field(default=30)
+    EXPORT_STALE_JOB_SECONDS: int = Field(default=300)
+    # Reuse the previous artifact when sections, template and options match
+    EXPORT_CACHE_ENABLED: bool = Field(default=True)
+    # Rendered per-section DOCX XML, keyed by section version + styles
+    EXPORT_FRAGMENT_CACHE_DIR: str = Field(default="/tmp/aipg-export-fragments")
+    EXPORT_FRAGMENT_CACHE_ITEMS: int = Field(default=2000)
+    # Convert DOCX exports on the LibreOffice pool just to count their pages
+    # (a full conversion per export); off, the layout estimate is reported.
+    # PDF exports always report their exact count.
+    EXPORT_EXACT_PAGE_COUNT: bool = Field(default=False)
+    # Parallel MinIO downloads of images embedded in section content
+    EXPORT_IMAGE_FETCH_CONCURRENCY: int = Field(default=8)
+    # "xobject": one shared watermark drawing; "stamp": text on every page
+    EXPORT_WATERMARK_MODE: str = Field(default="xobject")
     
     # =========================================================================
     # Concurrent Editing
     # =========================================================================
+    # Database-only locks, used while Redis is unavailable
     SECTION_LOCK_TIMEOUT_MINUTES: int = Field(default=5)
+    # Redis locks expire unless renewed by a WebSocket heartbeat within this
+    SECTION_LOCK_TTL_SECONDS: int = Field(default=90)
+    SECTION_LOCK_SWEEP_INTERVAL_SECONDS: int = Field(default=5)
+    # Keep every Nth section version in full; the rest become deltas once
+    # superseded, so rebuilding one applies at most N - 1 of them
+    SECTION_VERSION_SNAPSHOT_INTERVAL: int = Field(default=10)
+    # Serialized section trees are cached in Redis; writes invalidate them,
+    # the TTL only bounds staleness if an invalidation is lost
+    SECTION_TREE_CACHE_TTL_SECONDS: int = Field(default=600)
+    # Version diffs kept in memory, keyed by version-id pair
+    VERSION_DIFF_CACHE_ITEMS: int = Field(default=256)
     
     # =========================================================================
     # Properties
@@ -18,10 +18,24 @@ async def lifespan(app: FastAPI):
     print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     print(f"   Environment: {settings.APP_ENV}")
     print(f"   Debug: {settings.DEBUG}")
+    from app.services import conversion_pool, export_service, lock_service, realtime_service
+    await conversion_pool.start()
+    # Announces expired section locks; harmless while Redis is down
+    lock_service.start_sweeper()
+    # Heartbeats this process's export jobs and fails ones whose process died
+    export_service.start_heartbeat()
     yield
+    # Shutdown — stop running export jobs, then the LibreOffice pool
+    await export_service.stop_heartbeat()
+    await export_service.shutdown_jobs()
+    await conversion_pool.shutdown()
+    await lock_service.stop_sweeper()
+    await realtime_service.shutdown()
     # Shutdown — close LLM provider connections
     from app.services.llm_providers import close_all_providers
     await close_all_providers()
+    from app.services import ocr_service
+    ocr_service.shutdown()
     print(f"👋 Shutting down {settings.APP_NAME}")
 
 
@@ -87,13 +101,19 @@ async def health_check():
 async def readiness_check():
     """Readiness check - verifies all dependencies are available."""
     # TODO: Add actual database/redis/minio checks
+    from app.services import conversion_pool
+    pdf_converter = conversion_pool.get_pool().health()
+    # Without LibreOffice, PDF exports fall back to DOCX — degraded, not down
+    pdf_ok = pdf_converter["ready"] or not pdf_converter["available"]
     return {
-        "status": "ready",
+        "status": "ready" if pdf_ok else "degraded",
         "checks": {
             "database": True,
             "redis": True,
-            "minio": True
-        }
+            "minio": True,
+            "pdf_converter": pdf_converter["ready"],
+        },
+        "pdf_converter": pdf_converter,
     }
 
 
@@ -111,7 +131,7 @@ async def root():
 # =============================================================================
 # API Routes
 # =============================================================================
-from app.api.v1.endpoints import auth, projects, sections, ai, personas, usage, documents, exports, structure, requirements, section_templates
+from app.api.v1.endpoints import auth, projects, sections, ai, personas, usage, documents, exports, structure, requirements, section_templates, realtime
 
 app.include_router(
     auth.router,
@@ -168,6 +188,11 @@ app.include_router(
     prefix=f"{settings.API_V1_PREFIX}/section-templates",
     tags=["Section Templates"],
 )
+app.include_router(
+    realtime.router,
+    prefix=f"{settings.API_V1_PREFIX}/realtime",
+    tags=["Realtime"],
+)
 
 
 if __name__ == "__main__":
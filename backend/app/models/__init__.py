@@ -1,5 +1,5 @@
 from app.models.user import User
-from app.models.project import Project, ProjectMember
+from app.models.project import Project, ProjectAsset, ProjectMember
 from app.models.section import Section, SectionVersion
 from app.models.ai_persona import AiPersona
 from app.models.usage_log import UsageLog
@@ -7,11 +7,13 @@ from app.models.document import Document, DocumentEmbedding
 from app.models.export_template import Template, ExportHistory
 from app.models.requirement import ProjectRequirement, SectionRequirementLink
 from app.models.section_template import SectionTemplate, TemplateVersion, TemplateUsageLog
+from app.models.progress import ChapterProgress, ProjectProgress
 
 __all__ = [
-    "User", "Project", "ProjectMember", "Section", "SectionVersion",
+    "User", "Project", "ProjectMember", "ProjectAsset", "Section", "SectionVersion",
     "AiPersona", "UsageLog", "Document", "DocumentEmbedding",
     "Template", "ExportHistory",
     "ProjectRequirement", "SectionRequirementLink",
     "SectionTemplate", "TemplateVersion", "TemplateUsageLog",
+    "ChapterProgress", "ProjectProgress",
 ]
@@ -69,8 +69,14 @@ class ExportHistory(Base):
     )
     include_toc: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="true")
     include_cover: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="true")
+    # queued → running → completed | failed
     status: Mapped[str] = mapped_column(String(20), nullable=False, server_default="pending")
+    stage: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Hash of everything that affects the output; equal keys share an artifact
+    cache_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    options: Mapped[dict | None] = mapped_column(JSONB, server_default="{}")
     export_time_ms: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
     created_by: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
@@ -78,3 +84,10 @@ class ExportHistory(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Touched periodically while a process holds the job
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
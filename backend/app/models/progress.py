@@ -0,0 +1,52 @@
+"""
+SQLAlchemy models for progress roll-ups.
+
+Both tables are maintained by database triggers (see the "Progress
+counters" section of init_db.sql); the application only reads them.
+"""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class ChapterProgress(Base):
+    """Counters of one top-level chapter, summed over its whole subtree."""
+
+    __tablename__ = "chapter_progress"
+
+    chapter_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    sections_total: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    not_started: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    writing: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    review: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    approved: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    locked: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    estimated_pages: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    content_chars: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    tokens_used: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    requirement_links: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ProjectProgress(Base):
+    __tablename__ = "project_progress"
+
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True
+    )
+    requirements_total: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    requirements_covered: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
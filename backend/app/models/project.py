@@ -1,5 +1,5 @@
 """
-SQLAlchemy models for projects and project members.
+SQLAlchemy models for projects, project members, and project assets.
 """
 
 import uuid
@@ -10,7 +10,7 @@ from sqlalchemy import (
     Boolean, Date, DateTime, Enum, ForeignKey, Integer, Numeric,
     String, Text, UniqueConstraint, func,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.session import Base
@@ -45,6 +45,8 @@ class Project(Base):
     budget_alert_threshold: Mapped[Decimal] = mapped_column(
         Numeric(3, 2), nullable=False, server_default="0.80"
     )
+    # Bumped by every update_project; the ETag for If-Match
+    row_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
     created_by: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
@@ -83,3 +85,43 @@ class ProjectMember(Base):
     joined_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+
+
+class ProjectAsset(Base):
+    """Images and attachments uploaded to a project (bucket: project-assets).
+
+    Section content references images as ``![alt](asset:<id>)``.
+    """
+    __tablename__ = "project_assets"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    file_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    file_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    mime_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    asset_type: Mapped[str] = mapped_column(
+        Enum(
+            "Image", "Chart", "Table", "Diagram", "Attachment",
+            name="asset_type",
+            create_type=False,
+        ),
+        nullable=False,
+        server_default="Image",
+    )
+    caption: Mapped[str | None] = mapped_column(Text, nullable=True)
+    alt_text: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    asset_tag: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    metadata_: Mapped[dict | None] = mapped_column(
+        "metadata", JSONB, server_default="{}"
+    )
+    uploaded_by: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -6,10 +6,10 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
-    Boolean, DateTime, Enum, ForeignKey, Integer, String, Text,
-    UniqueConstraint, func,
+    BigInteger, Boolean, Computed, DateTime, Enum, ForeignKey, Integer, LargeBinary, String,
+    Text, UniqueConstraint, func,
 )
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.session import Base
@@ -18,7 +18,10 @@ from app.db.session import Base
 class Section(Base):
     __tablename__ = "sections"
     __table_args__ = (
-        UniqueConstraint("project_id", "chapter_number"),
+        # Deferrable so renumbering can rewrite all numbers in one UPDATE
+        UniqueConstraint(
+            "project_id", "chapter_number", deferrable=True, initially="IMMEDIATE"
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -30,6 +33,9 @@ class Section(Base):
     parent_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("sections.id", ondelete="CASCADE"), nullable=True
     )
+    # Materialized path: ancestor ids (dashless hex) joined by ".", ending
+    # with this section's own id.  Maintained by refresh_section_paths().
+    path: Mapped[str | None] = mapped_column(Text(collation="C"), nullable=True)
     chapter_number: Mapped[str] = mapped_column(String(20), nullable=False)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     requirement_text: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -62,6 +68,12 @@ class Section(Base):
     lock_expires_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Progress inputs, maintained by triggers (init_db.sql)
+    content_chars: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    tokens_used: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    requirement_links: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Bumped by every edit of the fields above; the ETag for If-Match
+    row_version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -83,8 +95,18 @@ class SectionVersion(Base):
         UUID(as_uuid=True), ForeignKey("sections.id", ondelete="CASCADE"), nullable=False
     )
     version_number: Mapped[int] = mapped_column(Integer, nullable=False)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # NULL once compacted to ``delta`` — see version_store
+    content: Mapped[str | None] = mapped_column(Text, nullable=True)
     content_html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    delta: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # CJK-bigram index of ``content`` (init_db.sql), only queried in SQL
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("section_search_vector(content)", persisted=True),
+        nullable=True, deferred=True,
+    )
+    storage: Mapped[str] = mapped_column(
+        String(10), nullable=False, default="full", server_default="full"
+    )  # full, delta, snapshot
     source_type: Mapped[str] = mapped_column(
         Enum(
             "Human", "GPT4", "GPT4o", "GPT4oMini",
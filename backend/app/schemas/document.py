@@ -57,5 +57,18 @@ class ProcessResponse(BaseModel):
     document_id: uuid.UUID
     status: str
     content_length: int = 0
+    page_count: int = 0
+    ocr_pages: int = 0
     chunk_count: int = 0
     message: str = ""
+
+
+class DocumentPage(BaseModel):
+    page_number: int
+    text: str
+
+
+class DocumentPagesResponse(BaseModel):
+    document_id: uuid.UUID
+    page_count: int
+    pages: list[DocumentPage]
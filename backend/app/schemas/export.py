@@ -17,12 +17,16 @@ from pydantic import BaseModel
 class ExportRequest(BaseModel):
     project_id: uuid.UUID
     section_ids: list[uuid.UUID] | None = None
+    # Export one chapter with everything below it
+    chapter_id: uuid.UUID | None = None
     format: str = "docx"  # docx or pdf
     template_id: uuid.UUID | None = None
     include_toc: bool = True
     include_cover: bool = True
     company_name: str = ""
     watermark: str | None = None
+    # PDF only: convert top-level chapters in parallel, then merge
+    split_chapters: bool = False
 
 
 class ExportResponse(BaseModel):
@@ -35,6 +39,9 @@ class ExportResponse(BaseModel):
     section_count: int = 0
     export_time_ms: int = 0
     status: str = "completed"
+    stage: str | None = None
+    progress: int = 0
+    cached: bool = False
     download_url: str = ""
 
 
@@ -47,9 +54,13 @@ class ExportHistoryResponse(BaseModel):
     page_count: int
     section_count: int
     status: str
+    stage: str | None = None
+    progress: int = 0
+    error_message: str | None = None
     export_time_ms: int
     created_by: uuid.UUID
     created_at: datetime
+    completed_at: datetime | None = None
 
     model_config = {"from_attributes": True}
 
@@ -44,6 +44,7 @@ class ProjectResponse(BaseModel):
     used_tokens: int
     budget_alert_threshold: Decimal
     created_by: uuid.UUID
+    row_version: int
     created_at: datetime
     updated_at: datetime
 
@@ -87,3 +88,32 @@ class BudgetResponse(BaseModel):
     remaining: int
     usage_percent: float
     alert_threshold: float
+
+
+# ---------------------------------------------------------------------------
+# Progress
+# ---------------------------------------------------------------------------
+
+class ProgressCounts(BaseModel):
+    sections_total: int = 0
+    # Sections per section_status
+    status_counts: dict[str, int] = {}
+    estimated_pages: int = 0
+    # Characters in the sections' current versions
+    content_chars: int = 0
+    tokens_used: int = 0
+    requirement_links: int = 0
+
+
+class ChapterProgressResponse(ProgressCounts):
+    chapter_id: uuid.UUID
+    chapter_number: str
+    title: str
+
+
+class ProjectProgressResponse(ProgressCounts):
+    project_id: uuid.UUID
+    requirements_total: int = 0
+    requirements_covered: int = 0
+    coverage_percent: float = 0.0
+    chapters: list[ChapterProgressResponse] = []
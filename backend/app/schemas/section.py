@@ -59,6 +59,7 @@ class SectionResponse(BaseModel):
     locked_by: uuid.UUID | None = None
     locked_at: datetime | None = None
     lock_expires_at: datetime | None = None
+    row_version: int
     created_at: datetime
     updated_at: datetime
 
@@ -78,6 +79,23 @@ class ReorderRequest(BaseModel):
     items: list[ReorderItem]
 
 
+class SectionBulkItem(BaseModel):
+    """Changes to one section.  Only the fields sent are applied;
+    ``parent_id: null`` moves the section to the top level and
+    ``assigned_to: null`` unassigns it."""
+    id: uuid.UUID
+    sort_order: int | None = None
+    parent_id: uuid.UUID | None = None
+    depth_level: int | None = None
+    status: str | None = None
+    assigned_to: uuid.UUID | None = None
+
+
+class SectionBulkRequest(BaseModel):
+    project_id: uuid.UUID
+    items: list[SectionBulkItem]
+
+
 # ---------------------------------------------------------------------------
 # Section Version
 # ---------------------------------------------------------------------------
@@ -90,6 +108,8 @@ class SectionVersionCreate(BaseModel):
     prompt_used: str | None = None
     generation_params: dict | None = None
     is_final: bool = False
+    # The version the writer started from; the base for three-way merges
+    is_continuation_of: uuid.UUID | None = None
 
 
 class SectionVersionResponse(BaseModel):
@@ -108,6 +128,107 @@ class SectionVersionResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class SectionVersionSummary(BaseModel):
+    """Version metadata without its text, for history listings."""
+    id: uuid.UUID
+    section_id: uuid.UUID
+    version_number: int
+    source_type: str
+    created_by: uuid.UUID
+    persona_id: uuid.UUID | None = None
+    is_continuation_of: uuid.UUID | None = None
+    is_final: bool
+    chars: int | None = None
+    created_at: datetime
+
+
+class SectionVersionPage(BaseModel):
+    items: list[SectionVersionSummary]
+    total: int
+
+
+class VersionDiffOp(BaseModel):
+    op: str  # equal, insert, delete
+    text: str
+
+
+class VersionDiffResponse(BaseModel):
+    from_version_id: uuid.UUID
+    to_version_id: uuid.UUID
+    ops: list[VersionDiffOp]
+    inserted_chars: int
+    deleted_chars: int
+
+
+class VersionMergeRequest(BaseModel):
+    ours_version_id: uuid.UUID
+    theirs_version_id: uuid.UUID
+    # Defaults to the version "theirs" (else "ours") continued from
+    base_version_id: uuid.UUID | None = None
+    # Save a conflict-free result as a new current version
+    save: bool = False
+
+
+class VersionMergeChunk(BaseModel):
+    kind: str  # resolved, conflict
+    text: str = ""
+    base: str = ""
+    ours: str = ""
+    theirs: str = ""
+
+
+class VersionMergeResponse(BaseModel):
+    base_version_id: uuid.UUID
+    conflicts: int
+    chunks: list[VersionMergeChunk]
+    # Set when the merge was clean and ``save`` was requested
+    saved_version: SectionVersionResponse | None = None
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+class SectionSearchHit(BaseModel):
+    section_id: uuid.UUID
+    project_id: uuid.UUID
+    project_name: str
+    chapter_number: str
+    title: str
+    version_id: uuid.UUID
+    rank: float
+    snippet: str
+    # [start, end) offsets of matched text within ``snippet``
+    highlights: list[tuple[int, int]] = []
+
+
+class SectionSearchPage(BaseModel):
+    query: str
+    items: list[SectionSearchHit]
+    total: int
+
+
+# ---------------------------------------------------------------------------
+# Page budget
+# ---------------------------------------------------------------------------
+
+class SectionPageBudget(BaseModel):
+    section_id: uuid.UUID
+    chapter_number: str
+    title: str
+    depth_level: int
+    estimated_pages: int | None = None  # planned budget
+    layout_pages: float  # layout estimate of the current version
+    over_budget: bool
+
+
+class PageBudgetResponse(BaseModel):
+    project_id: uuid.UUID
+    budget_pages: int
+    layout_pages: float
+    sections: list[SectionPageBudget]
+
+
 # ---------------------------------------------------------------------------
 # Lock
 # ---------------------------------------------------------------------------
@@ -0,0 +1,434 @@
+"""
+Conversion pool — warm LibreOffice instances for DOCX → PDF.
+
+Each slot owns an isolated user profile, so concurrent conversions never
+share LibreOffice state.  When the system Python has ``uno`` (python3-uno),
+a slot keeps ``soffice`` running in listener mode and converts through a
+small bridge process (``scripts/uno_bridge.py``), so an export pays only for the
+conversion itself.  Otherwise each conversion runs a one-shot
+``soffice --convert-to`` against the slot's pre-initialized profile.
+
+Either way conversions are queued, time-limited and killed on timeout, and
+a crashed or hung instance is restarted — with a fresh profile if it keeps
+failing.
+
+Profiles live under a per-process directory and listener ports come from
+the OS, so several workers on one host each run their own pool.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BRIDGE_SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "uno_bridge.py"
+_SOFFICE_FLAGS = (
+    "--headless",
+    "--invisible",
+    "--nocrashreport",
+    "--nodefault",
+    "--nofirststartwizard",
+    "--nologo",
+    "--norestore",
+)
+_PING_TIMEOUT_SECONDS = 5
+
+
+class ConversionError(Exception):
+    """A conversion failed or timed out; the message is shown to the user."""
+
+
+class _SlotCrashed(ConversionError):
+    """The LibreOffice instance itself is gone or hung — restart the slot."""
+
+
+def _soffice_path() -> str | None:
+    return shutil.which("libreoffice") or shutil.which("soffice")
+
+
+def _free_port() -> int:
+    """A loopback port nothing is listening on, chosen by the OS."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _kill(proc: asyncio.subprocess.Process | None) -> None:
+    if proc is None or proc.returncode is not None:
+        return
+    try:
+        # Processes start in their own session; take soffice.bin with them
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+@dataclass
+class _Slot:
+    index: int
+    profile_dir: Path
+    port: int = 0  # of the warm listener, picked at each start
+    warm: bool = False
+    healthy: bool = False
+    busy: bool = False
+    soffice: asyncio.subprocess.Process | None = None
+    bridge: asyncio.subprocess.Process | None = None
+    conversions: int = 0  # since the last (re)start
+    total_conversions: int = 0
+    failures: int = 0  # consecutive
+    restarts: int = 0
+
+    def status(self) -> dict:
+        return {
+            "index": self.index,
+            "mode": "warm" if self.warm else "cold",
+            "healthy": self.healthy,
+            "busy": self.busy,
+            "conversions": self.total_conversions,
+            "failures": self.failures,
+            "restarts": self.restarts,
+        }
+
+
+async def _uno_available() -> bool:
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            settings.PDF_CONVERTER_UNO_PYTHON, "-c", "import uno",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        return await asyncio.wait_for(proc.wait(), timeout=10) == 0
+    except (OSError, asyncio.TimeoutError):
+        return False
+
+
+class ConversionPool:
+    def __init__(self, size: int):
+        self.soffice = _soffice_path()
+        self.warm_capable = False
+        # Per process: other workers on this host run their own pools
+        self._profile_root = Path(settings.PDF_CONVERTER_PROFILE_DIR) / f"pid-{os.getpid()}"
+        self._slots = [
+            _Slot(index=i, profile_dir=self._profile_root / f"slot-{i}")
+            for i in range(max(1, size))
+        ]
+        self._idle: asyncio.Queue[_Slot] = asyncio.Queue()
+        self._tasks: set[asyncio.Task] = set()
+        self._health_task: asyncio.Task | None = None
+        self._started = False
+
+    @property
+    def available(self) -> bool:
+        return self.soffice is not None
+
+    # -- lifecycle ----------------------------------------------------------
+
+    async def start(self) -> None:
+        """Boot every slot in the background; returns immediately."""
+        if self._started:
+            return
+        self._started = True
+        if not self.available:
+            logger.warning("LibreOffice not found — PDF export will fall back to DOCX")
+            return
+        self.warm_capable = await _uno_available()
+        for slot in self._slots:
+            self._spawn(self._boot(slot))
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(
+            *self._tasks,
+            *([self._health_task] if self._health_task else []),
+            return_exceptions=True,
+        )
+        for slot in self._slots:
+            await self._stop_slot(slot)
+        await asyncio.to_thread(shutil.rmtree, self._profile_root, True)
+        self._started = False
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _boot(self, slot: _Slot) -> None:
+        """(Re)start a slot and hand it back to the idle queue."""
+        reset = slot.failures >= 2
+        try:
+            await self._start_slot(slot, reset_profile=reset)
+        finally:
+            self._idle.put_nowait(slot)
+
+    async def _start_slot(self, slot: _Slot, reset_profile: bool = False) -> None:
+        await self._stop_slot(slot)
+        if reset_profile:
+            # A corrupted profile is the usual cause of repeated crashes
+            logger.warning(f"LibreOffice slot {slot.index}: resetting profile")
+            shutil.rmtree(slot.profile_dir, ignore_errors=True)
+        slot.profile_dir.mkdir(parents=True, exist_ok=True)
+        slot.conversions = 0
+
+        if self.warm_capable:
+            try:
+                await self._start_warm(slot)
+                slot.warm = True
+                slot.healthy = True
+                return
+            except Exception as e:
+                logger.warning(f"LibreOffice slot {slot.index}: warm start failed ({e}), using cold mode")
+                await self._stop_slot(slot)
+
+        slot.warm = False
+        slot.healthy = await self._init_profile(slot)
+
+    async def _start_warm(self, slot: _Slot) -> None:
+        slot.port = _free_port()
+        slot.soffice = await asyncio.create_subprocess_exec(
+            self.soffice,
+            *_SOFFICE_FLAGS,
+            f"-env:UserInstallation={slot.profile_dir.as_uri()}",
+            f"--accept=socket,host=127.0.0.1,port={slot.port};urp;StarOffice.ComponentContext",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        slot.bridge = await asyncio.create_subprocess_exec(
+            settings.PDF_CONVERTER_UNO_PYTHON,
+            str(_BRIDGE_SCRIPT),
+            str(slot.port),
+            str(settings.PDF_CONVERTER_STARTUP_TIMEOUT_SECONDS),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        reply = await self._read_reply(slot, settings.PDF_CONVERTER_STARTUP_TIMEOUT_SECONDS + 5)
+        if not reply.get("ready"):
+            raise _SlotCrashed(reply.get("error") or "UNO bridge not ready")
+
+    async def _init_profile(self, slot: _Slot) -> bool:
+        """Create the slot's profile up front so conversions skip first-run setup."""
+        proc = await asyncio.create_subprocess_exec(
+            self.soffice,
+            *_SOFFICE_FLAGS,
+            "--terminate_after_init",
+            f"-env:UserInstallation={slot.profile_dir.as_uri()}",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=settings.PDF_CONVERTER_STARTUP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            _kill(proc)
+            await proc.wait()
+            return False
+        return proc.returncode == 0
+
+    async def _stop_slot(self, slot: _Slot) -> None:
+        slot.healthy = False
+        for proc in (slot.bridge, slot.soffice):
+            _kill(proc)
+            if proc is not None:
+                try:
+                    await asyncio.wait_for(proc.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+        slot.bridge = None
+        slot.soffice = None
+
+    # -- bridge protocol ----------------------------------------------------
+
+    async def _read_reply(self, slot: _Slot, timeout: float) -> dict:
+        try:
+            line = await asyncio.wait_for(slot.bridge.stdout.readline(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise _SlotCrashed(f"PDF 轉換逾時（超過 {int(timeout)} 秒）")
+        if not line:
+            raise _SlotCrashed("LibreOffice 連線中斷")
+        return json.loads(line)
+
+    async def _request(self, slot: _Slot, payload: dict, timeout: float) -> dict:
+        if slot.bridge is None or slot.bridge.returncode is not None:
+            raise _SlotCrashed("LibreOffice 連線中斷")
+        try:
+            slot.bridge.stdin.write((json.dumps(payload) + "\n").encode("utf-8"))
+            await slot.bridge.stdin.drain()
+        except OSError:
+            raise _SlotCrashed("LibreOffice 連線中斷")
+        return await self._read_reply(slot, timeout)
+
+    async def _ping(self, slot: _Slot) -> bool:
+        if not slot.warm:
+            return slot.healthy
+        if slot.soffice is None or slot.soffice.returncode is not None:
+            return False
+        try:
+            reply = await self._request(slot, {"op": "ping"}, _PING_TIMEOUT_SECONDS)
+        except ConversionError:
+            return False
+        return bool(reply.get("ok"))
+
+    # -- conversion ---------------------------------------------------------
+
+    async def _convert_warm(self, slot: _Slot, src: str, dst: str) -> None:
+        reply = await self._request(
+            slot,
+            {"op": "convert", "src": src, "dst": dst},
+            settings.PDF_CONVERTER_TIMEOUT_SECONDS,
+        )
+        if not reply.get("ok"):
+            # Tell a bad document apart from a dead instance
+            if not await self._ping(slot):
+                raise _SlotCrashed(f"LibreOffice 異常終止: {reply.get('error')}")
+            raise ConversionError(f"PDF 轉換失敗: {reply.get('error')}")
+
+    async def _convert_cold(self, slot: _Slot, src: str, outdir: str) -> None:
+        proc = await asyncio.create_subprocess_exec(
+            self.soffice,
+            *_SOFFICE_FLAGS,
+            f"-env:UserInstallation={slot.profile_dir.as_uri()}",
+            "--convert-to", "pdf",
+            "--outdir", outdir,
+            src,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=settings.PDF_CONVERTER_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise _SlotCrashed(
+                f"PDF 轉換逾時（超過 {settings.PDF_CONVERTER_TIMEOUT_SECONDS} 秒）"
+            )
+        finally:
+            _kill(proc)
+
+    async def convert(self, docx_bytes: bytes) -> bytes | None:
+        """Bytes in, bytes out; see ``convert_file``."""
+        if not self.available:
+            return None
+        with tempfile.TemporaryDirectory() as tmpdir:
+            src = os.path.join(tmpdir, "source.docx")
+            dst = os.path.join(tmpdir, "output.pdf")
+            await asyncio.to_thread(Path(src).write_bytes, docx_bytes)
+            await self.convert_file(src, dst)
+            return await asyncio.to_thread(Path(dst).read_bytes)
+
+    async def convert_file(self, src: str, dst: str) -> bool:
+        """Convert the DOCX at ``src`` into a PDF at ``dst`` on the next free
+        slot, without holding either file in memory.  Returns False if
+        LibreOffice is missing."""
+        if not self.available:
+            return False
+        if not self._started:
+            await self.start()
+
+        try:
+            slot = await asyncio.wait_for(
+                self._idle.get(), timeout=settings.PDF_CONVERTER_QUEUE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            raise ConversionError("PDF 轉換佇列已滿，請稍後再試")
+
+        slot.busy = True
+        restart = False
+        try:
+            with tempfile.TemporaryDirectory() as outdir:
+                # --convert-to names the output after the input file
+                out = os.path.join(outdir, Path(src).stem + ".pdf")
+                if slot.warm:
+                    await self._convert_warm(slot, src, out)
+                else:
+                    await self._convert_cold(slot, src, outdir)
+
+                if not os.path.exists(out):
+                    raise _SlotCrashed("LibreOffice 未產生 PDF")
+                await asyncio.to_thread(shutil.move, out, dst)
+
+            slot.failures = 0
+            slot.conversions += 1
+            slot.total_conversions += 1
+            # Recycle long-lived instances to cap LibreOffice's memory growth
+            restart = slot.warm and slot.conversions >= settings.PDF_CONVERTER_MAX_CONVERSIONS
+            return True
+        except _SlotCrashed as e:
+            slot.failures += 1
+            restart = True
+            logger.warning(f"LibreOffice slot {slot.index}: {e}")
+            raise
+        except BaseException:
+            # Cancelled mid-conversion: the instance may still be busy
+            restart = True
+            raise
+        finally:
+            slot.busy = False
+            if restart:
+                slot.restarts += 1
+                self._spawn(self._boot(slot))
+            else:
+                self._idle.put_nowait(slot)
+
+    # -- health -------------------------------------------------------------
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.PDF_CONVERTER_HEALTH_INTERVAL_SECONDS)
+            for _ in range(self._idle.qsize()):
+                try:
+                    slot = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if await self._ping(slot):
+                    self._idle.put_nowait(slot)
+                else:
+                    logger.warning(f"LibreOffice slot {slot.index} failed health check, restarting")
+                    slot.failures += 1
+                    slot.restarts += 1
+                    self._spawn(self._boot(slot))
+
+    def health(self) -> dict:
+        slots = [slot.status() for slot in self._slots]
+        return {
+            "available": self.available,
+            "mode": "warm" if self.warm_capable else "cold",
+            "ready": self.available and any(s["healthy"] for s in slots),
+            "idle": self._idle.qsize(),
+            "slots": slots,
+        }
+
+
+_pool: ConversionPool | None = None
+
+
+def get_pool() -> ConversionPool:
+    global _pool
+    if _pool is None:
+        _pool = ConversionPool(settings.PDF_CONVERTER_WORKERS)
+    return _pool
+
+
+async def start() -> None:
+    await get_pool().start()
+
+
+async def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
@@ -2,9 +2,15 @@
 Document service — upload to MinIO, CRUD, trigger parsing & embedding.
 """
 
+import asyncio
 import io
+import logging
+import os
+import tempfile
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Iterator
 
 from fastapi import HTTPException, UploadFile, status
 from minio import Minio
@@ -13,8 +19,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.models.document import Document
-from app.schemas.document import DocumentDetail, DocumentResponse, ProcessResponse
-from app.services import parser_service, rag_service
+from app.schemas.document import (
+    DocumentDetail,
+    DocumentPage,
+    DocumentPagesResponse,
+    DocumentResponse,
+    ProcessResponse,
+)
+from app.services import ocr_service, page_store, parser_service, rag_service
+from app.services.parser_service import ParsedRecord
+
+logger = logging.getLogger(__name__)
 
 
 def _get_minio() -> Minio:
@@ -123,15 +138,24 @@ async def delete_document(
         client.remove_object(settings.BUCKET_TENDER_DOCS, doc.file_path)
     except Exception:
         pass  # file may already be gone
+    page_store.delete_pages(doc)
 
     await db.delete(doc)
     await db.commit()
 
 
 # ---------------------------------------------------------------------------
-# Download (returns file bytes + metadata)
+# Download
 # ---------------------------------------------------------------------------
 
+async def get_document_object(
+    doc_id: uuid.UUID, db: AsyncSession
+) -> tuple[str, str, str]:
+    """Return (object_name, filename, file_type) for streaming downloads."""
+    doc = await _get_doc_or_404(doc_id, db)
+    return doc.file_path, doc.original_filename, doc.file_type
+
+
 async def download_document(
     doc_id: uuid.UUID, db: AsyncSession
 ) -> tuple[bytes, str, str]:
@@ -144,63 +168,205 @@ async def download_document(
     return data, doc.original_filename, doc.file_type
 
 
+# ---------------------------------------------------------------------------
+# Page access
+# ---------------------------------------------------------------------------
+
+async def open_pages(
+    doc_id: uuid.UUID, db: AsyncSession
+) -> page_store.PagedDocument | None:
+    """Lazy page view of a processed document, or None if not yet processed."""
+    doc = await _get_doc_or_404(doc_id, db)
+    if not doc.is_parsed:
+        # Also hides pages of an earlier parse once a re-parse has failed
+        return None
+    return await page_store.PagedDocument.open(doc)
+
+
+async def get_pages(
+    doc_id: uuid.UUID, start: int, end: int | None, db: AsyncSession
+) -> DocumentPagesResponse:
+    paged = await open_pages(doc_id, db)
+    if paged is None:
+        raise HTTPException(status.HTTP_409_CONFLICT, "文件尚未解析，請先執行處理")
+    texts = await paged.get_pages(start, end)
+    return DocumentPagesResponse(
+        document_id=doc_id,
+        page_count=paged.page_count,
+        pages=[
+            DocumentPage(page_number=start + i, text=t)
+            for i, t in enumerate(texts)
+        ],
+    )
+
+
 # ---------------------------------------------------------------------------
 # Process: parse + chunk + embed
 # ---------------------------------------------------------------------------
 
+@dataclass
+class _IngestStats:
+    """Running totals for one streamed ingest; keeps only a bounded preview."""
+    content_length: int = 0
+    preview_parts: list[str] = field(default_factory=list)
+    preview_length: int = 0
+
+    def add(self, text: str) -> None:
+        self.content_length += len(text)
+        room = settings.DOCUMENT_TEXT_PREVIEW_CHARS - self.preview_length
+        if room > 0:
+            part = text[:room]
+            self.preview_parts.append(part)
+            self.preview_length += len(part) + 2
+
+    @property
+    def preview(self) -> str:
+        return "\n\n".join(self.preview_parts)
+
+
+class _ParseError(Exception):
+    """A parser failed mid-stream; ``__cause__`` holds its exception."""
+
+
+def _tap(
+    records: Iterator[ParsedRecord],
+    writer: page_store.PageWriter,
+    stats: _IngestStats,
+) -> Iterator[ParsedRecord]:
+    """Feed the page store and stats as records flow to the chunker.
+    Parser errors come out as ``_ParseError``, so the caller can tell them
+    from failures of the embedding side consuming this generator."""
+    records = iter(records)
+    while True:
+        try:
+            record = next(records)
+        except StopIteration:
+            return
+        except Exception as e:
+            raise _ParseError(str(e)) from e
+        writer.feed(record.page, record.text)
+        stats.add(record.text)
+        yield record
+
+
+def _drain(records: Iterator[ParsedRecord]) -> None:
+    for _ in records:
+        pass
+
+
+async def _mark_failed(
+    doc: Document, error: BaseException, db: AsyncSession
+) -> ProcessResponse:
+    """Leave a document whose parser failed unparsed, with no partial pages."""
+    logger.warning(f"Parsing document {doc.id} failed: {error}")
+    await db.refresh(doc)
+    doc.is_parsed = False
+    doc.parsed_at = None
+    doc.content_text = None
+    doc.chunk_count = 0
+    await db.commit()
+    return ProcessResponse(
+        document_id=doc.id,
+        status="failed",
+        message=f"文件解析失敗: {error}",
+    )
+
+
 async def process_document(
     doc_id: uuid.UUID, db: AsyncSession
 ) -> ProcessResponse:
+    """Parse → chunk → embed in a single streamed pass.
+
+    The source is downloaded to a temp file and parsed record by record;
+    each record is written to the page store and fed to the chunker, and
+    chunks are embedded in batches, so memory stays bounded by the batch
+    size rather than the document size.
+    """
     doc = await _get_doc_or_404(doc_id, db)
 
-    # Download from MinIO
-    client = _get_minio()
-    response = client.get_object(settings.BUCKET_TENDER_DOCS, doc.file_path)
-    data = response.read()
-    response.close()
-    response.release_conn()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Download from MinIO to disk so parsers can stream from the file
+        local_path = os.path.join(tmpdir, f"source.{doc.file_type}")
+        client = _get_minio()
+        await asyncio.to_thread(
+            client.fget_object, settings.BUCKET_TENDER_DOCS, doc.file_path, local_path
+        )
 
-    # Parse text
-    content = parser_service.parse_file(data, doc.file_type)
-    if not content.strip():
+        ocr_pages = 0
+        if doc.file_type == "pdf":
+            # PDF page text is small; OCR needs the whole page list up front
+            try:
+                pages = await asyncio.to_thread(parser_service.parse_pdf_pages, local_path)
+            except Exception as e:
+                # Corrupt or encrypted PDF
+                return await _mark_failed(doc, e, db)
+            pages, ocr_pages = await ocr_service.ocr_scanned_pages(local_path, pages)
+            records = (
+                ParsedRecord(text=text, kind="page", page=page_no)
+                for page_no, text in enumerate(pages, start=1)
+            )
+        else:
+            records = parser_service.iter_records(local_path, doc.file_type)
+
+        writer = page_store.PageWriter()
+        stats = _IngestStats()
+        tapped = _tap(records, writer, stats)
+
+        # Chunk + embed
+        embed_error: Exception | None = None
+        try:
+            try:
+                chunk_count = await rag_service.index_records(
+                    document_id=doc_id,
+                    records=tapped,
+                    source_type="TenderDocument",
+                    db=db,
+                )
+            except _ParseError:
+                raise
+            except Exception as e:
+                # Embedding failed (e.g. no API key) — finish parsing anyway
+                embed_error = e
+                chunk_count = 0
+                await db.rollback()
+                await asyncio.to_thread(_drain, tapped)
+                await db.refresh(doc)
+        except _ParseError as e:
+            await db.rollback()
+            return await _mark_failed(doc, e.__cause__, db)
+
+    if not stats.preview.strip():
         return ProcessResponse(
             document_id=doc_id,
             status="empty",
             message="文件內容為空，無法解析",
         )
 
-    doc.content_text = content
+    page_count = await writer.save(doc)
+    doc.content_text = stats.preview
     doc.is_parsed = True
     doc.parsed_at = datetime.now(timezone.utc)
+    doc.chunk_count = chunk_count
+    await db.commit()
+    await db.refresh(doc)
 
-    # Chunk + embed
-    try:
-        chunk_count = await rag_service.index_document(
-            document_id=doc_id,
-            content=content,
-            source_type="TenderDocument",
-            db=db,
-        )
-        doc.chunk_count = chunk_count
-    except Exception as e:
-        # Parsing succeeded but embedding failed (e.g. no API key)
-        doc.chunk_count = 0
-        await db.commit()
-        await db.refresh(doc)
+    if embed_error is not None:
         return ProcessResponse(
             document_id=doc_id,
             status="parsed",
-            content_length=len(content),
+            content_length=stats.content_length,
+            page_count=page_count,
+            ocr_pages=ocr_pages,
             chunk_count=0,
-            message=f"文件已解析但向量化失敗: {e}",
+            message=f"文件已解析但向量化失敗: {embed_error}",
         )
 
-    await db.commit()
-    await db.refresh(doc)
     return ProcessResponse(
         document_id=doc_id,
         status="indexed",
-        content_length=len(content),
+        content_length=stats.content_length,
+        page_count=page_count,
+        ocr_pages=ocr_pages,
         chunk_count=doc.chunk_count,
         message="文件已解析並建立向量索引",
     )
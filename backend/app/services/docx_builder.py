@@ -6,14 +6,27 @@ available on the host (common on Linux), the document will still render
 correctly on Windows/macOS where the fonts exist.
 """
 
+import hashlib
 import io
+import json
+import logging
 from datetime import date
 
 from docx import Document
 from docx.enum.section import WD_ORIENT
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.image.exceptions import UnrecognizedImageError
 from docx.oxml.ns import qn
+from docx.oxml import parse_xml
+from docx.oxml.table import CT_Tbl
 from docx.shared import Cm, Inches, Mm, Pt, RGBColor
+from lxml import etree
+
+from app.services import fragment_cache, markdown_renderer as md
+from app.services.layout_estimator import LIST_INDENT_PT, LayoutEstimator, SectionSpan
+
+logger = logging.getLogger(__name__)
 
 
 DEFAULT_STYLES = {
@@ -55,6 +68,44 @@ DEFAULT_STYLES = {
 }
 
 
+BODY_STYLE_NAME = "Proposal Body"
+LIST_STYLE_NAME = "Proposal List"
+TABLE_STYLE_NAME = "Proposal Table"
+
+# Printable area of the A4 page set in _apply_default_styles
+_TEXT_WIDTH = Mm(210) - 2 * Cm(3.17)
+_TEXT_HEIGHT = Mm(297) - 2 * Cm(2.54)
+
+_ALIGNMENTS = {
+    "left": WD_ALIGN_PARAGRAPH.LEFT,
+    "center": WD_ALIGN_PARAGRAPH.CENTER,
+    "right": WD_ALIGN_PARAGRAPH.RIGHT,
+    "justify": WD_ALIGN_PARAGRAPH.JUSTIFY,
+}
+
+# Theme font attributes take precedence over explicit names — drop them
+_THEME_FONT_ATTRS = tuple(
+    qn(f"w:{a}") for a in ("asciiTheme", "hAnsiTheme", "eastAsiaTheme", "cstheme")
+)
+
+_W_B = qn("w:b")
+_W_HANGING = qn("w:hanging")
+_W_IND = qn("w:ind")
+_W_JC = qn("w:jc")
+_W_LEFT = qn("w:left")
+_W_P = qn("w:p")
+_W_PPR = qn("w:pPr")
+_W_PSTYLE = qn("w:pStyle")
+_W_R = qn("w:r")
+_W_SECT_PR = qn("w:sectPr")
+_W_RPR = qn("w:rPr")
+_W_T = qn("w:t")
+_W_TAB = qn("w:tab")
+_W_TBL_HEADER = qn("w:tblHeader")
+_W_VAL = qn("w:val")
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
 class DocxBuilder:
     def __init__(self, template_path: str | None = None, style_config: dict | None = None):
         if template_path:
@@ -62,8 +113,23 @@ class DocxBuilder:
         else:
             self.doc = Document()
         self.styles = {**DEFAULT_STYLES, **(style_config or {})}
+        self._template_path = template_path
+        self._style_hash: str | None = None
         self._apply_default_styles()
-        self._page_count_estimate = 0
+        self._compile_styles()
+        # Shadows every add_* call so page counts come without a render
+        self.layout = LayoutEstimator(self.styles)
+
+    @property
+    def style_hash(self) -> str:
+        """Identifies everything besides content that shapes section XML."""
+        if self._style_hash is None:
+            raw = json.dumps(
+                [self._template_path, self.styles],
+                sort_keys=True, ensure_ascii=False, default=str,
+            )
+            self._style_hash = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+        return self._style_hash
 
     def _apply_default_styles(self) -> None:
         """Set sensible defaults for A4, margins, etc."""
@@ -75,6 +141,64 @@ class DocxBuilder:
             section.left_margin = Cm(3.17)
             section.right_margin = Cm(3.17)
 
+    def _compile_styles(self) -> None:
+        """Write style_config into named styles once, so section paragraphs
+        only carry a style reference instead of per-run formatting."""
+        styles = self.doc.styles
+        self._heading_style_ids = {}
+        for level in (1, 2, 3):
+            heading = styles[f"Heading {level}"]
+            self._apply_style(heading, self.styles.get(f"heading{level}", {}))
+            self._heading_style_ids[level] = heading.style_id
+
+        self._grid_style_id = styles["Table Grid"].style_id
+
+        body_cfg = self.styles.get("body", {})
+        list_cfg = {k: v for k, v in body_cfg.items() if k != "first_line_indent"}
+        self._body_style_id = self._paragraph_style(BODY_STYLE_NAME, body_cfg)
+        self._list_style_id = self._paragraph_style(LIST_STYLE_NAME, list_cfg)
+        self._table_style_id = self._paragraph_style(
+            TABLE_STYLE_NAME, {**self.styles.get("table", {}), "line_spacing": 1.0}
+        )
+
+    def _paragraph_style(self, name: str, cfg: dict) -> str:
+        styles = self.doc.styles
+        if name in {s.name for s in styles}:
+            style = styles[name]
+        else:
+            style = styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = styles["Normal"]
+            style.quick_style = True
+        self._apply_style(style, cfg)
+        return style.style_id
+
+    @staticmethod
+    def _apply_style(style, cfg: dict) -> None:
+        font = style.font
+        font_name = cfg.get("font_name", "標楷體")
+        font.name = font_name
+        rfonts = style.element.get_or_add_rPr().get_or_add_rFonts()
+        rfonts.set(qn("w:eastAsia"), font_name)
+        for attr in _THEME_FONT_ATTRS:
+            rfonts.attrib.pop(attr, None)
+        font.size = Pt(cfg.get("font_size", 12))
+        if cfg.get("bold") is not None:
+            font.bold = bool(cfg["bold"])
+        if cfg.get("color"):
+            font.color.rgb = RGBColor.from_string(cfg["color"])
+
+        pf = style.paragraph_format
+        if cfg.get("space_before") is not None:
+            pf.space_before = Pt(cfg["space_before"])
+        if cfg.get("space_after") is not None:
+            pf.space_after = Pt(cfg["space_after"])
+        if cfg.get("line_spacing"):
+            pf.line_spacing = cfg["line_spacing"]
+        if cfg.get("first_line_indent"):
+            pf.first_line_indent = Pt(cfg["first_line_indent"])
+        if cfg.get("alignment") in _ALIGNMENTS:
+            pf.alignment = _ALIGNMENTS[cfg["alignment"]]
+
     def _set_run_font(self, run, cfg: dict) -> None:
         font = run.font
         font_name = cfg.get("font_name", "標楷體")
@@ -97,6 +221,7 @@ class DocxBuilder:
         company_name: str = "",
         tender_number: str = "",
         cover_date: str | None = None,
+        page_break: bool = True,
     ) -> None:
         # Add vertical space
         for _ in range(6):
@@ -140,8 +265,9 @@ class DocxBuilder:
         run = p.add_run(display_date)
         self._set_run_font(run, self.styles.get("body", {}))
 
-        self.doc.add_page_break()
-        self._page_count_estimate += 1
+        if page_break:
+            self.doc.add_page_break()
+            self.layout.add_cover()
 
     # -----------------------------------------------------------------
     # Table of contents (TOC field — Word will update on open)
@@ -176,41 +302,165 @@ class DocxBuilder:
         run5._element.append(fldChar3)
 
         self.doc.add_page_break()
-        self._page_count_estimate += 1
+        self.layout.add_toc()
 
     # -----------------------------------------------------------------
     # Section content
     # -----------------------------------------------------------------
 
-    def add_section(self, title: str, content: str, level: int = 1) -> None:
-        heading_key = f"heading{min(level, 3)}"
-        style_name = f"Heading {min(level, 3)}"
-
-        heading = self.doc.add_heading(title, level=min(level, 3))
-        for run in heading.runs:
-            cfg = self.styles.get(heading_key, {})
-            self._set_run_font(run, cfg)
-
-        if content:
-            for paragraph_text in content.split("\n"):
-                text = paragraph_text.strip()
-                if not text:
-                    continue
-                p = self.doc.add_paragraph()
-                run = p.add_run(text)
-                body_cfg = self.styles.get("body", {})
-                self._set_run_font(run, body_cfg)
-                pf = p.paragraph_format
-                if body_cfg.get("line_spacing"):
-                    pf.line_spacing = body_cfg["line_spacing"]
-                if body_cfg.get("first_line_indent"):
-                    pf.first_line_indent = Pt(body_cfg["first_line_indent"])
-
-        # Rough estimate: 1 page per ~2000 chars
-        self._page_count_estimate += max(1, len(content) // 2000) if content else 0
+    def add_section(
+        self, title: str, content: str, level: int = 1, images: dict[str, bytes] | None = None
+    ) -> None:
+        """Render Markdown-ish content block by block as it is parsed.
+
+        ``images`` maps asset ids referenced as ``![alt](asset:<id>)`` to
+        their bytes; missing ones become a placeholder line.
+        """
+        self._add_heading(title, level)
+        self.layout.start_section(title, level)
+        for block in md.parse_blocks(content or ""):
+            if isinstance(block, md.Paragraph):
+                self._insert(self._paragraph(self._body_style_id, block.runs))
+                self.layout.add_block(block, level)
+            elif isinstance(block, md.ListItem):
+                self._add_list_item(block)
+                self.layout.add_block(block, level)
+            elif isinstance(block, md.Heading):
+                self._add_heading(block.text, level + block.level)
+                self.layout.add_block(block, level)
+            elif isinstance(block, md.Table):
+                self._append_table(block.rows, header=block.header)
+                self.layout.add_block(block, level)
+            elif isinstance(block, md.Image):
+                self._add_image(block, (images or {}).get(block.asset_id))
+        self.layout.end_section()
+
+    def _add_heading(self, text: str, level: int) -> None:
+        # Same XML as doc.add_heading without its per-call style lookup;
+        # Heading N styles carry the configured fonts (see _compile_styles)
+        style_id = self._heading_style_ids[min(max(level, 1), 3)]
+        self._insert(self._paragraph(style_id, [(text, False)]))
+
+    def append_paragraphs(self, texts, style_id: str | None = None) -> None:
+        """Fast path: append one styled paragraph per text as raw XML.
+
+        Skips python-docx's proxy objects entirely — each paragraph is a
+        ``<w:p>`` with a ``pStyle`` reference and a single run.
+        """
+        style_id = style_id or self._body_style_id
+        for text in texts:
+            self._insert(self._paragraph(style_id, [(text, False)]))
+
+    def _insert(self, element) -> None:
+        body = self.doc.element.body
+        # sectPr is always the last body child; body.sectPr scans them all
+        if len(body) and body[-1].tag == _W_SECT_PR:
+            body[-1].addprevious(element)
+        else:
+            body.append(element)
+
+    def _paragraph(self, style_id: str, runs: md.Runs):
+        p = self.doc.element.body.makeelement(_W_P, {})
+        ppr = etree.SubElement(p, _W_PPR)
+        etree.SubElement(ppr, _W_PSTYLE, {_W_VAL: style_id})
+        for text, bold in runs:
+            self._append_run(p, text, bold)
+        return p
+
+    @staticmethod
+    def _append_run(p, text: str, bold: bool = False) -> None:
+        r = etree.SubElement(p, _W_R)
+        if bold:
+            etree.SubElement(etree.SubElement(r, _W_RPR), _W_B)
+        for i, part in enumerate(text.split("\t")):
+            if i:
+                etree.SubElement(r, _W_TAB)
+            if part:
+                t = etree.SubElement(r, _W_T)
+                t.text = part
+                if part != part.strip():
+                    t.set(_XML_SPACE, "preserve")
+
+    def _add_list_item(self, item: md.ListItem) -> None:
+        # Literal markers with a hanging indent — no numbering definitions,
+        # so every list starts where the writer numbered it
+        p = self._paragraph(self._list_style_id, [(f"{item.marker}\t", False), *item.runs])
+        indent = int(LIST_INDENT_PT * 20)  # twips
+        etree.SubElement(p[0], _W_IND, {
+            _W_LEFT: str(indent * (item.depth + 1)),
+            _W_HANGING: str(indent),
+        })
+        self._insert(p)
+
+    def _add_image(self, block: md.Image, data: bytes | None) -> None:
+        if data is not None:
+            p = self.doc.add_paragraph()
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            try:
+                shape = p.add_run().add_picture(io.BytesIO(data))
+            except (UnrecognizedImageError, ValueError) as e:
+                logger.warning(f"Image asset {block.asset_id} could not be embedded: {e}")
+                p._element.getparent().remove(p._element)
+                data = None
+        if data is None:
+            missing = md.Paragraph(runs=[(f"［圖片無法載入：{block.alt or block.asset_id}］", False)])
+            self._insert(self._paragraph(self._body_style_id, missing.runs))
+            self.layout.add_block(missing)
+            return
+
+        # Fit into the printable area, keeping the aspect ratio
+        scale = min(1.0, _TEXT_WIDTH / shape.width, 0.9 * _TEXT_HEIGHT / shape.height)
+        if scale < 1.0:
+            shape.width = int(shape.width * scale)
+            shape.height = int(shape.height * scale)
+        if block.alt:
+            caption = self._paragraph(self._table_style_id, [(block.alt, False)])
+            etree.SubElement(caption[0], _W_JC, {_W_VAL: "center"})
+            self._insert(caption)
+        self.layout.add_image(shape.height.pt, caption=block.alt)
+
+    def _body_content_len(self) -> int:
+        body = self.doc.element.body
+        return len(body) - (1 if len(body) and body[-1].tag == _W_SECT_PR else 0)
+
+    def add_section_cached(
+        self,
+        title: str,
+        content: str,
+        level: int = 1,
+        version_id=None,
+        images: dict[str, bytes] | None = None,
+    ) -> bool:
+        """``add_section`` that reuses the rendered XML of a section version
+        built before with the same styles.  Returns True on a cache hit."""
+        if (version_id is None and content) or md.has_images(content):
+            # No immutable identity for this content — nothing safe to key
+            # on — or embedded images, whose relationship ids can't be spliced
+            self.add_section(title, content, level, images)
+            return False
+
+        key = fragment_cache.fragment_key(version_id, title, level, self.style_hash)
+        fragment = fragment_cache.get(key)
+        if fragment is not None:
+            self._splice(fragment.xml)
+            self.layout.add_section(title, md.parse_blocks(content or ""), level)
+            return True
+
+        start = self._body_content_len()
+        self.add_section(title, content, level)
+        body = self.doc.element.body
+        elements = body[start:self._body_content_len()]
+        xml = b"<fragment>" + b"".join(etree.tostring(el) for el in elements) + b"</fragment>"
+        fragment_cache.put(key, fragment_cache.Fragment(xml=xml))
+        return False
+
+    def _splice(self, xml: bytes) -> None:
+        for el in list(parse_xml(xml)):
+            self._insert(el)
 
     def add_page_break(self) -> None:
         self.doc.add_page_break()
+        self.layout.page_break()
 
     # -----------------------------------------------------------------
     # Header / Footer
@@ -266,25 +516,29 @@ class DocxBuilder:
         cols = len(headers) if headers else (len(data[0]) if data else 0)
         if cols == 0:
             return
-
-        table = self.doc.add_table(rows=0, cols=cols)
-        table.style = "Table Grid"
-
-        if headers:
-            row = table.add_row()
-            for i, h in enumerate(headers):
-                cell = row.cells[i]
-                cell.text = h
-                for p in cell.paragraphs:
-                    for run in p.runs:
-                        run.font.bold = True
-                        run.font.size = Pt(self.styles.get("table", {}).get("font_size", 10))
-
-        for row_data in data:
-            row = table.add_row()
-            for i, val in enumerate(row_data):
-                if i < cols:
-                    row.cells[i].text = str(val)
+        rows = ([list(headers)] if headers else []) + [
+            [str(v) for v in row[:cols]] for row in data
+        ]
+        self._append_table(rows, header=bool(headers))
+        self.layout.add_table(rows)
+
+    def _append_table(self, rows: list[list[str]], header: bool = False) -> None:
+        """Create the whole grid in one call, then fill cells as raw XML
+        instead of going through python-docx's Table/row.cells proxies."""
+        cols = max(len(r) for r in rows)
+        tbl = CT_Tbl.new_tbl(len(rows), cols, _TEXT_WIDTH)
+        tbl.tblPr.style = self._grid_style_id
+        for r, (tr, values) in enumerate(zip(tbl.tr_lst, rows)):
+            bold = header and r == 0
+            if bold:
+                # Repeat the header row on every page the table spans
+                etree.SubElement(tr.get_or_add_trPr(), _W_TBL_HEADER)
+            for tc, value in zip(tr.tc_lst, values):
+                p = tc.p_lst[0]
+                p.get_or_add_pPr().style = self._table_style_id
+                if value:
+                    self._append_run(p, value, bold)
+        self._insert(tbl)
 
     # -----------------------------------------------------------------
     # Output
@@ -300,4 +554,9 @@ class DocxBuilder:
         self.doc.save(output_path)
 
     def get_page_count(self) -> int:
-        return max(1, self._page_count_estimate)
+        """Estimated page count; a converted PDF's count is authoritative."""
+        return self.layout.estimate().page_count
+
+    def get_section_spans(self) -> list[SectionSpan]:
+        """Estimated page span of each section, in the order added."""
+        return self.layout.estimate().sections
@@ -1,27 +1,48 @@
 """
 Export service — assemble sections into DOCX/PDF, upload to MinIO.
+
+Exports run as background jobs (queued → running → completed | failed) with
+per-stage progress on the export_history row.  Identical requests reuse the
+last completed artifact instead of rebuilding it.
 """
 
-import io
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
 import time
 import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException, status
 from minio import Minio
-from sqlalchemy import select
+from minio.error import S3Error
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.db.session import async_session_factory
 from app.models.export_template import ExportHistory, Template
-from app.models.project import Project
-from app.models.section import Section, SectionVersion
+from app.models.project import Project, ProjectAsset
+from app.models.section import Section
 from app.schemas.export import (
     ExportHistoryResponse,
     ExportRequest,
     ExportResponse,
 )
 from app.services.docx_builder import DocxBuilder
-from app.services import pdf_converter
+from app.services import (
+    conversion_pool,
+    markdown_renderer,
+    pdf_converter,
+    section_service,
+    storage_service,
+)
+
+logger = logging.getLogger(__name__)
 
 
 def _get_minio() -> Minio:
@@ -34,32 +55,83 @@ def _get_minio() -> Minio:
 
 
 # ---------------------------------------------------------------------------
-# Export project
+# Inputs + cache key
 # ---------------------------------------------------------------------------
 
-async def export_project(
-    request: ExportRequest,
-    user_id: uuid.UUID,
-    db: AsyncSession,
-) -> ExportResponse:
-    start = time.monotonic()
+# Bump when the builder output changes so old artifacts stop matching
+EXPORT_CACHE_VERSION = 4
 
+# Request fields that change the generated file
+_OUTPUT_OPTIONS = {
+    "format", "include_toc", "include_cover", "company_name", "watermark", "split_chapters",
+}
+
+
+@dataclass
+class _ExportInputs:
+    project: Project
+    sections: list[Section]
+    style_config: dict | None
+    cache_key: str
+    # Current version content per section, aligned with ``sections``
+    contents: list[str] | None = None
+
+
+def _cache_key(
+    project: Project,
+    sections: list[Section],
+    request: ExportRequest,
+    style_config: dict | None,
+) -> str:
+    # Versions are immutable, so current_version_id stands in for content
+    payload = {
+        "v": EXPORT_CACHE_VERSION,
+        "project": [project.name, project.tender_number],
+        "sections": [
+            [str(s.id), str(s.current_version_id), s.chapter_number, s.title, s.depth_level]
+            for s in sections
+        ],
+        "template": str(request.template_id) if request.template_id else None,
+        "style": style_config,
+        "options": request.model_dump(mode="json", include=_OUTPUT_OPTIONS),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _load_inputs(
+    request: ExportRequest, db: AsyncSession, with_content: bool = False
+) -> _ExportInputs:
     # Get project
     result = await db.execute(select(Project).where(Project.id == request.project_id))
     project = result.scalar_one_or_none()
     if project is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "專案不存在")
 
-    # Get sections
-    q = (
-        select(Section)
-        .where(Section.project_id == request.project_id)
-        .order_by(Section.sort_order)
-    )
-    if request.section_ids:
-        q = q.where(Section.id.in_(request.section_ids))
-    result = await db.execute(q)
-    sections = result.scalars().all()
+    chapter = None
+    if request.chapter_id:
+        result = await db.execute(
+            select(Section).where(
+                Section.id == request.chapter_id, Section.project_id == request.project_id
+            )
+        )
+        chapter = result.scalar_one_or_none()
+        if chapter is None:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "章節不存在")
+
+    # Get sections — with their current content in the same query when building
+    contents: list[str] | None = None
+    if with_content:
+        sections, contents = [], []
+        async for section, content in section_service.iter_current_contents(
+            request.project_id, db, section_ids=request.section_ids, subtree_of=chapter
+        ):
+            sections.append(section)
+            contents.append(content)
+    else:
+        sections = await section_service.get_project_sections(
+            request.project_id, db, section_ids=request.section_ids, subtree_of=chapter
+        )
 
     if not sections:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "沒有可匯出的章節")
@@ -74,8 +146,268 @@ async def export_project(
         if tmpl and tmpl.style_config:
             style_config = tmpl.style_config
 
-    # Build DOCX
+    return _ExportInputs(
+        project=project,
+        sections=sections,
+        style_config=style_config,
+        cache_key=_cache_key(project, sections, request, style_config),
+        contents=contents,
+    )
+
+
+async def _find_cached(
+    project_id: uuid.UUID,
+    cache_key: str,
+    db: AsyncSession,
+    exclude_id: uuid.UUID | None = None,
+) -> ExportHistory | None:
+    if not settings.EXPORT_CACHE_ENABLED:
+        return None
+    q = (
+        select(ExportHistory)
+        .where(
+            ExportHistory.project_id == project_id,
+            ExportHistory.cache_key == cache_key,
+            ExportHistory.status == "completed",
+            ExportHistory.file_path != "",
+        )
+        .order_by(ExportHistory.created_at.desc())
+        .limit(1)
+    )
+    if exclude_id is not None:
+        q = q.where(ExportHistory.id != exclude_id)
+    result = await db.execute(q)
+    return result.scalar_one_or_none()
+
+
+def _reuse_artifact(history: ExportHistory, cached: ExportHistory) -> None:
+    history.file_path = cached.file_path
+    history.file_name = cached.file_name
+    history.file_format = cached.file_format
+    history.file_size = cached.file_size
+    history.page_count = cached.page_count
+    history.status = "completed"
+    history.stage = "cached"
+    history.progress = 100
+    history.completed_at = datetime.now(timezone.utc)
+
+
+def _file_name(project: Project, file_format: str) -> str:
+    return f"{project.name}_建議書.{file_format}"
+
+
+def _to_response(history: ExportHistory) -> ExportResponse:
+    return ExportResponse(
+        id=history.id,
+        success=history.status != "failed",
+        file_name=history.file_name,
+        file_format=history.file_format,
+        file_size=history.file_size or 0,
+        page_count=history.page_count or 0,
+        section_count=history.section_count or 0,
+        export_time_ms=history.export_time_ms or 0,
+        status=history.status,
+        stage=history.stage,
+        progress=history.progress or 0,
+        cached=history.stage == "cached",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Export project
+# ---------------------------------------------------------------------------
+
+async def export_project(
+    request: ExportRequest,
+    user_id: uuid.UUID,
+    db: AsyncSession,
+) -> ExportResponse:
+    """Queue an export job, or answer from the artifact cache.
+
+    The build itself runs in the background; poll ``get_export_status``
+    until the status is ``completed`` or ``failed``.
+    """
+    start = time.monotonic()
+    inputs = await _load_inputs(request, db)
+
+    history = ExportHistory(
+        project_id=request.project_id,
+        file_path="",
+        file_name=_file_name(inputs.project, request.format),
+        file_format=request.format,
+        section_count=len(inputs.sections),
+        template_id=request.template_id,
+        include_toc=request.include_toc,
+        include_cover=request.include_cover,
+        status="queued",
+        stage="queued",
+        progress=0,
+        cache_key=inputs.cache_key,
+        options=request.model_dump(mode="json"),
+        created_by=user_id,
+    )
+
+    cached = await _find_cached(request.project_id, inputs.cache_key, db)
+    if cached is not None:
+        _reuse_artifact(history, cached)
+        history.export_time_ms = int((time.monotonic() - start) * 1000)
+
+    db.add(history)
+    await db.commit()
+    await db.refresh(history)
+
+    if cached is None:
+        _spawn(history.id)
+    return _to_response(history)
+
+
+# ---------------------------------------------------------------------------
+# Background jobs
+# ---------------------------------------------------------------------------
+
+_jobs: set[asyncio.Task] = set()
+_job_ids: set[uuid.UUID] = set()  # exports this process is running or queueing
+_job_slots: asyncio.Semaphore | None = None
+_heartbeat: asyncio.Task | None = None
+
+
+def _get_job_slots() -> asyncio.Semaphore:
+    global _job_slots
+    if _job_slots is None:
+        _job_slots = asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENT_JOBS)
+    return _job_slots
+
+
+def _spawn(export_id: uuid.UUID) -> None:
+    task = asyncio.create_task(run_export_job(export_id))
+    _jobs.add(task)
+    _job_ids.add(export_id)
+    task.add_done_callback(_jobs.discard)
+    task.add_done_callback(lambda _: _job_ids.discard(export_id))
+
+
+async def run_export_job(export_id: uuid.UUID) -> None:
+    """Build one queued export in its own session."""
+    async with _get_job_slots():
+        async with async_session_factory() as db:
+            history = await db.get(ExportHistory, export_id)
+            if history is None or history.status != "queued":
+                return  # deleted or already handled
+            try:
+                await _build_export(history, db)
+            except Exception as e:
+                logger.exception(f"Export {export_id} failed")
+                await db.rollback()
+                history = await db.get(ExportHistory, export_id)
+                if history is None:
+                    return
+                history.status = "failed"
+                history.stage = "failed"
+                history.error_message = str(getattr(e, "detail", None) or e)
+                await db.commit()
+
+
+async def _set_stage(
+    history: ExportHistory, db: AsyncSession, stage: str, progress: int
+) -> None:
+    history.status = "running"
+    history.stage = stage
+    history.progress = progress
+    await db.commit()
+
+
+def _add_sections(builder: DocxBuilder, items: list[tuple], images: dict[str, bytes]) -> int:
+    """Add sections, splicing cached fragments; returns the cache hit count."""
+    hits = 0
+    for title, content, level, version_id in items:
+        hits += builder.add_section_cached(
+            title=title, content=content, level=level, version_id=version_id, images=images
+        )
+    return hits
+
+
+def _download_asset(object_name: str) -> bytes:
+    response = _get_minio().get_object(settings.BUCKET_PROJECT_ASSETS, object_name)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+async def _fetch_images(
+    project_id: uuid.UUID, contents: list[str], db: AsyncSession
+) -> dict[str, bytes]:
+    """Download every image asset the sections reference, concurrently.
+    Unknown or unreadable assets are left out and render as placeholders."""
+    wanted = set()
+    for content in contents:
+        wanted |= markdown_renderer.asset_ids(content)
+    if not wanted:
+        return {}
+
+    result = await db.execute(
+        select(ProjectAsset.id, ProjectAsset.file_path).where(
+            ProjectAsset.project_id == project_id,
+            ProjectAsset.id.in_([uuid.UUID(a) for a in wanted]),
+        )
+    )
+    paths = {str(asset_id): path for asset_id, path in result.all()}
+
+    slots = asyncio.Semaphore(settings.EXPORT_IMAGE_FETCH_CONCURRENCY)
+
+    async def fetch(asset_id: str, path: str) -> tuple[str, bytes | None]:
+        async with slots:
+            try:
+                return asset_id, await asyncio.to_thread(_download_asset, path)
+            except S3Error as e:
+                logger.warning(f"Image asset {asset_id} download failed: {e}")
+                return asset_id, None
+
+    fetched = await asyncio.gather(*(fetch(a, p) for a, p in paths.items()))
+    return {asset_id: data for asset_id, data in fetched if data is not None}
+
+
+def _upload(object_name: str, path: str, file_format: str) -> None:
+    # Streams the file in parts instead of reading it into memory
+    _get_minio().fput_object(
+        bucket_name=settings.BUCKET_EXPORTS,
+        object_name=object_name,
+        file_path=path,
+        content_type=storage_service.media_type_for(file_format),
+    )
+
+
+async def _counted_pages(docx_path: str, workdir: str, estimate: int) -> int:
+    """Page count of the DOCX as LibreOffice lays it out, else the estimate."""
+    pdf_path = os.path.join(workdir, "page-count.pdf")
+    try:
+        converted = await pdf_converter.docx_to_pdf_file(docx_path, pdf_path)
+    except conversion_pool.ConversionError as e:
+        logger.warning(f"Page count conversion failed, using estimate: {e}")
+        return estimate
+    if not converted:
+        return estimate
+    return await asyncio.to_thread(pdf_converter.get_pdf_page_count, pdf_path)
+
+
+def _new_builder(project: Project, style_config: dict | None) -> DocxBuilder:
     builder = DocxBuilder(style_config=style_config)
+    builder.set_header(project.name)
+    return builder
+
+
+async def _build_document(
+    history: ExportHistory,
+    db: AsyncSession,
+    request: ExportRequest,
+    inputs: _ExportInputs,
+    items: list[tuple],
+    images: dict[str, bytes],
+) -> DocxBuilder:
+    """The whole proposal as one DOCX."""
+    project = inputs.project
+    builder = _new_builder(project, inputs.style_config)
 
     # Cover page
     if request.include_cover:
@@ -89,121 +421,344 @@ async def export_project(
     if request.include_toc:
         builder.add_table_of_contents()
 
-    # Header / Footer
-    builder.set_header(project.name)
     builder.set_footer(include_page_number=True)
 
-    # Sections
-    for section in sections:
-        content = ""
-        # Try to get current version content
-        if section.current_version_id:
-            ver_result = await db.execute(
-                select(SectionVersion).where(
-                    SectionVersion.id == section.current_version_id
-                )
+    # python-docx work runs off the event loop, in batches so progress moves;
+    # only sections whose version changed since the last export are rendered
+    batch_size = max(1, len(items) // 20)
+    reused = 0
+    for done in range(0, len(items), batch_size):
+        batch = items[done:done + batch_size]
+        reused += await asyncio.to_thread(_add_sections, builder, batch, images)
+        built = done + len(batch)
+        await _set_stage(history, db, "building", 10 + 50 * built // len(items))
+    logger.info(f"Export {history.id}: reused {reused}/{len(items)} section fragments")
+    return builder
+
+
+# ---------------------------------------------------------------------------
+# Chapter-split PDF
+# ---------------------------------------------------------------------------
+
+def _split_chapters(items: list[tuple]) -> list[list[tuple]]:
+    """Group section items at each top-level (heading 1) section."""
+    chapters: list[list[tuple]] = []
+    for item in items:
+        if not chapters or item[2] == 1:
+            chapters.append([])
+        chapters[-1].append(item)
+    return chapters
+
+
+async def _convert_part(docx_path: str) -> str:
+    """Convert one part next to its DOCX; a crashed instance gets one retry
+    on another slot."""
+    pdf_path = os.path.splitext(docx_path)[0] + ".pdf"
+    for attempt in (1, 2):
+        try:
+            converted = await pdf_converter.docx_to_pdf_file(docx_path, pdf_path)
+        except conversion_pool.ConversionError as e:
+            if attempt == 2:
+                raise
+            logger.warning(f"Part conversion failed, retrying: {e}")
+            continue
+        if not converted:
+            raise conversion_pool.ConversionError("LibreOffice 無法使用")
+        return pdf_path
+
+
+def _assemble_chapters(
+    cover_pdf: str | None,
+    chapter_pdfs: list[str],
+    chapters: list[list[tuple]],
+    include_toc: bool,
+    workdir: str,
+) -> str:
+    """Merge cover, generated TOC and chapters with continuous page numbers.
+    Returns the path of the merged PDF."""
+    located = []
+    for pdf_path, chapter in zip(chapter_pdfs, chapters):
+        pages, entries = pdf_converter.read_outline(pdf_path)
+        entries = [e for e in entries if e[0] <= 3]
+        if not entries:
+            entries = pdf_converter.find_headings(
+                pdf_path, [(min(level, 3), title) for title, _, level, _ in chapter]
             )
-            version = ver_result.scalar_one_or_none()
-            if version:
-                content = version.content or ""
+        located.append((pages, entries))
 
-        level = section.depth_level + 1  # depth_level 0 → heading 1
-        builder.add_section(
-            title=f"{section.chapter_number} {section.title}",
-            content=content,
-            level=level,
+    front = pdf_converter.get_pdf_page_count(cover_pdf) if cover_pdf else 0
+    if include_toc:
+        front += pdf_converter.toc_page_count(sum(len(e) for _, e in located))
+
+    outline = []
+    offset = front
+    for pages, entries in located:
+        outline.extend((level, title, offset + page) for level, title, page in entries)
+        offset += pages
+
+    parts = [cover_pdf] if cover_pdf else []
+    if include_toc:
+        toc_pdf = os.path.join(workdir, "toc.pdf")
+        pdf_converter.render_toc(outline, toc_pdf)
+        parts.append(toc_pdf)
+    parts.extend(chapter_pdfs)
+
+    merged = os.path.join(workdir, "merged.pdf")
+    pdf_converter.merge_pdfs(parts, merged)
+    pdf_converter.number_pages(merged, outline)
+    return merged
+
+
+async def _build_split_pdf(
+    history: ExportHistory,
+    db: AsyncSession,
+    request: ExportRequest,
+    inputs: _ExportInputs,
+    items: list[tuple],
+    images: dict[str, bytes],
+    workdir: str,
+) -> str:
+    """Render each top-level chapter as its own DOCX and convert them in
+    parallel on the pool.  The TOC and page numbers are generated after
+    conversion, from the chapters' real page counts.  Returns the path of
+    the merged PDF."""
+    project = inputs.project
+    chapters = _split_chapters(items)
+    tasks: list[asyncio.Task] = []
+    try:
+        if request.include_cover:
+            cover = _new_builder(project, inputs.style_config)
+            cover.add_cover_page(
+                project_name=project.name,
+                company_name=request.company_name,
+                tender_number=project.tender_number or "",
+                page_break=False,
+            )
+            cover_docx = os.path.join(workdir, "cover.docx")
+            await asyncio.to_thread(cover.save, cover_docx)
+            tasks.append(asyncio.create_task(_convert_part(cover_docx)))
+
+        reused = 0
+        for i, chapter in enumerate(chapters, start=1):
+            builder = _new_builder(project, inputs.style_config)
+            reused += await asyncio.to_thread(_add_sections, builder, chapter, images)
+            docx_path = os.path.join(workdir, f"chapter-{i:03d}.docx")
+            await asyncio.to_thread(builder.save, docx_path)
+            # Converts while the next chapter is being built
+            tasks.append(asyncio.create_task(_convert_part(docx_path)))
+            await _set_stage(history, db, "building", 10 + 50 * i // len(chapters))
+        logger.info(
+            f"Export {history.id}: {len(chapters)} chapters, "
+            f"reused {reused}/{len(items)} section fragments"
         )
 
-    docx_bytes = builder.save_to_bytes()
+        await _set_stage(history, db, "converting", 65)
+        pdfs = list(await asyncio.gather(*tasks))
+    finally:
+        # One failed part fails the export; stop converting the rest
+        for task in tasks:
+            task.cancel()
+
+    cover_pdf = pdfs.pop(0) if request.include_cover else None
+    await _set_stage(history, db, "merging", 80)
+    return await asyncio.to_thread(
+        _assemble_chapters, cover_pdf, pdfs, chapters, request.include_toc, workdir
+    )
+
 
-    # Convert to PDF if requested
-    final_bytes = docx_bytes
-    file_format = "docx"
-    page_count = builder.get_page_count()
+async def _build_export(history: ExportHistory, db: AsyncSession) -> None:
+    start = time.monotonic()
+    request = ExportRequest.model_validate(history.options)
+
+    await _set_stage(history, db, "loading", 5)
+    inputs = await _load_inputs(request, db, with_content=True)
+    project, sections = inputs.project, inputs.sections
+    history.cache_key = inputs.cache_key
+    history.section_count = len(sections)
+
+    # Content may have changed since the job was queued — check again
+    cached = await _find_cached(project.id, inputs.cache_key, db, exclude_id=history.id)
+    if cached is not None:
+        _reuse_artifact(history, cached)
+        history.export_time_ms = int((time.monotonic() - start) * 1000)
+        await db.commit()
+        return
 
-    if request.format == "pdf":
-        pdf_bytes = await pdf_converter.docx_to_pdf(docx_bytes)
-        if pdf_bytes:
+    # Sections
+    items: list[tuple] = []
+    for section, content in zip(sections, inputs.contents):
+        level = section.depth_level + 1  # depth_level 0 → heading 1
+        items.append((
+            f"{section.chapter_number} {section.title}",
+            content,
+            level,
+            section.current_version_id,
+        ))
+
+    images = await _fetch_images(project.id, inputs.contents, db)
+
+    # Intermediate and final files live on disk; only python-docx's tree
+    # is held in memory
+    with tempfile.TemporaryDirectory(prefix="aipg-export-") as workdir:
+        docx_path = os.path.join(workdir, "export.docx")
+        pdf_path = None
+        page_count = 0
+        if (
+            request.format == "pdf"
+            and request.split_chapters
+            and items
+            and conversion_pool.get_pool().available
+        ):
+            pdf_path = await _build_split_pdf(
+                history, db, request, inputs, items, images, workdir
+            )
+        else:
+            builder = await _build_document(history, db, request, inputs, items, images)
+            await asyncio.to_thread(builder.save, docx_path)
+            page_count = await asyncio.to_thread(builder.get_page_count)
+            del builder
+
+            # Convert to PDF if requested
+            if request.format == "pdf":
+                await _set_stage(history, db, "converting", 65)
+                pdf_path = os.path.join(workdir, "export.pdf")
+                if not await pdf_converter.docx_to_pdf_file(docx_path, pdf_path):
+                    pdf_path = None
+
+        final_path = docx_path
+        file_format = "docx"
+        if pdf_path:
             if request.watermark:
-                pdf_bytes = pdf_converter.add_watermark(pdf_bytes, request.watermark)
-            final_bytes = pdf_bytes
+                await _set_stage(history, db, "watermarking", 85)
+                await asyncio.to_thread(
+                    pdf_converter.add_watermark,
+                    pdf_path, request.watermark, settings.EXPORT_WATERMARK_MODE,
+                )
+            final_path = pdf_path
             file_format = "pdf"
-            page_count = pdf_converter.get_pdf_page_count(pdf_bytes)
-        else:
-            # LibreOffice not available, fall back to DOCX
-            file_format = "docx"
+            page_count = await asyncio.to_thread(pdf_converter.get_pdf_page_count, pdf_path)
+        elif request.format == "pdf":
+            # LibreOffice not available, fall back to DOCX — and don't let
+            # the fallback answer future PDF requests from the cache
+            history.cache_key = None
+        elif settings.EXPORT_EXACT_PAGE_COUNT and conversion_pool.get_pool().available:
+            # Tender page caps need the real number, not the layout estimate
+            await _set_stage(history, db, "counting", 80)
+            page_count = await _counted_pages(docx_path, workdir, page_count)
+
+        # Upload to MinIO
+        await _set_stage(history, db, "uploading", 95)
+        file_name = _file_name(project, file_format)
+        object_name = f"exports/{project.id}/{history.id}/{file_name}"
+        await asyncio.to_thread(_upload, object_name, final_path, file_format)
+        file_size = os.path.getsize(final_path)
+
+    history.file_path = object_name
+    history.file_name = file_name
+    history.file_format = file_format
+    history.file_size = file_size
+    history.page_count = page_count
+    history.status = "completed"
+    history.stage = "completed"
+    history.progress = 100
+    history.export_time_ms = int((time.monotonic() - start) * 1000)
+    history.completed_at = datetime.now(timezone.utc)
+    await db.commit()
 
-    # Upload to MinIO
-    ext = file_format
-    file_name = f"{project.name}_建議書.{ext}"
-    object_name = f"exports/{request.project_id}/{uuid.uuid4()}/{file_name}"
 
-    client = _get_minio()
-    client.put_object(
-        bucket_name=settings.BUCKET_EXPORTS,
-        object_name=object_name,
-        data=io.BytesIO(final_bytes),
-        length=len(final_bytes),
-        content_type="application/pdf" if ext == "pdf" else (
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        ),
-    )
+async def recover_stale_jobs() -> int:
+    """Fail queued/running jobs whose process is gone.
+
+    Jobs live in the event loop of the process that created them, so once
+    it exits nothing will finish them.  A job counts as abandoned when its
+    heartbeat (or, before the first one, its creation) is older than
+    ``EXPORT_STALE_JOB_SECONDS``; jobs of other live workers keep beating.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.EXPORT_STALE_JOB_SECONDS)
+    async with async_session_factory() as db:
+        result = await db.execute(
+            update(ExportHistory)
+            .where(
+                ExportHistory.status.in_(("queued", "running")),
+                func.coalesce(ExportHistory.heartbeat_at, ExportHistory.created_at) < cutoff,
+                ExportHistory.id.not_in(list(_job_ids)),
+            )
+            .values(
+                status="failed",
+                stage="failed",
+                error_message="匯出工作已中斷，請重新匯出",
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+
+async def _beat() -> None:
+    """Mark this process's jobs as alive."""
+    if not _job_ids:
+        return
+    async with async_session_factory() as db:
+        await db.execute(
+            update(ExportHistory)
+            .where(ExportHistory.id.in_(list(_job_ids)))
+            .values(heartbeat_at=func.now())
+        )
+        await db.commit()
 
-    elapsed_ms = int((time.monotonic() - start) * 1000)
 
-    # Save export history
-    history = ExportHistory(
-        project_id=request.project_id,
-        file_path=object_name,
-        file_name=file_name,
-        file_format=file_format,
-        file_size=len(final_bytes),
-        page_count=page_count,
-        section_count=len(sections),
-        template_id=request.template_id,
-        include_toc=request.include_toc,
-        include_cover=request.include_cover,
-        status="completed",
-        export_time_ms=elapsed_ms,
-        created_by=user_id,
-    )
-    db.add(history)
-    await db.commit()
-    await db.refresh(history)
+async def _heartbeat_loop() -> None:
+    while True:
+        try:
+            await _beat()
+            stale = await recover_stale_jobs()
+            if stale:
+                logger.warning(f"Marked {stale} abandoned export job(s) as failed")
+        except Exception:
+            logger.exception("Export heartbeat failed")
+        await asyncio.sleep(settings.EXPORT_HEARTBEAT_INTERVAL_SECONDS)
 
-    return ExportResponse(
-        id=history.id,
-        success=True,
-        file_name=file_name,
-        file_format=file_format,
-        file_size=len(final_bytes),
-        page_count=page_count,
-        section_count=len(sections),
-        export_time_ms=elapsed_ms,
-        status="completed",
-    )
+
+def start_heartbeat() -> None:
+    global _heartbeat
+    if _heartbeat is None:
+        _heartbeat = asyncio.create_task(_heartbeat_loop())
+
+
+async def stop_heartbeat() -> None:
+    global _heartbeat
+    if _heartbeat is not None:
+        _heartbeat.cancel()
+        try:
+            await _heartbeat
+        except asyncio.CancelledError:
+            pass
+        _heartbeat = None
+
+
+async def shutdown_jobs() -> None:
+    for task in list(_jobs):
+        task.cancel()
+    if _jobs:
+        await asyncio.gather(*_jobs, return_exceptions=True)
 
 
 # ---------------------------------------------------------------------------
 # Download
 # ---------------------------------------------------------------------------
 
-async def download_export(
+async def get_export_object(
     export_id: uuid.UUID, db: AsyncSession
-) -> tuple[bytes, str, str]:
+) -> tuple[str, str, str]:
+    """Return (object_name, file_name, file_format) for streaming downloads."""
     result = await db.execute(
         select(ExportHistory).where(ExportHistory.id == export_id)
     )
     history = result.scalar_one_or_none()
     if history is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "匯出記錄不存在")
-
-    client = _get_minio()
-    response = client.get_object(settings.BUCKET_EXPORTS, history.file_path)
-    data = response.read()
-    response.close()
-    response.release_conn()
-    return data, history.file_name, history.file_format
+    if history.status != "completed":
+        raise HTTPException(status.HTTP_409_CONFLICT, "匯出尚未完成")
+    return history.file_path, history.file_name, history.file_format
 
 
 # ---------------------------------------------------------------------------
@@ -230,13 +785,25 @@ async def delete_export(
     history = result.scalar_one_or_none()
     if history is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "匯出記錄不存在")
-
-    # Remove from MinIO
-    try:
-        client = _get_minio()
-        client.remove_object(settings.BUCKET_EXPORTS, history.file_path)
-    except Exception:
-        pass
+    if history.status in ("queued", "running"):
+        raise HTTPException(status.HTTP_409_CONFLICT, "匯出進行中，無法刪除")
+
+    # Remove from MinIO unless a cached export still shares the file
+    if history.file_path:
+        refs = await db.scalar(
+            select(func.count())
+            .select_from(ExportHistory)
+            .where(
+                ExportHistory.file_path == history.file_path,
+                ExportHistory.id != history.id,
+            )
+        )
+        if not refs:
+            try:
+                client = _get_minio()
+                client.remove_object(settings.BUCKET_EXPORTS, history.file_path)
+            except Exception:
+                pass
 
     await db.delete(history)
     await db.commit()
@@ -0,0 +1,85 @@
+"""
+Fragment cache — rendered DOCX body XML per section, reused across exports.
+
+A fragment is the run of ``<w:p>``/``<w:tbl>`` elements that
+``DocxBuilder.add_section`` appends for one section.  Section versions are
+immutable, so ``(version id, title, level, style hash)`` fully determines
+the XML; unchanged sections are spliced in instead of re-rendered.
+
+Fragments live in a small in-process LRU backed by files on disk, so they
+survive restarts and are shared by concurrent export jobs.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when add_section's output changes so stale fragments stop matching
+FRAGMENT_FORMAT_VERSION = 4
+
+
+@dataclass
+class Fragment:
+    xml: bytes  # <fragment> wrapping the serialized body elements
+
+
+_memory: "OrderedDict[str, Fragment]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def fragment_key(version_id, title: str, level: int, style_hash: str) -> str:
+    raw = f"{FRAGMENT_FORMAT_VERSION}|{version_id or 'empty'}|{level}|{style_hash}|{title}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> Path:
+    return Path(settings.EXPORT_FRAGMENT_CACHE_DIR) / key[:2] / f"{key}.xml"
+
+
+def _remember(key: str, fragment: Fragment) -> None:
+    with _lock:
+        _memory[key] = fragment
+        _memory.move_to_end(key)
+        while len(_memory) > settings.EXPORT_FRAGMENT_CACHE_ITEMS:
+            _memory.popitem(last=False)
+
+
+def get(key: str) -> Fragment | None:
+    with _lock:
+        fragment = _memory.get(key)
+        if fragment is not None:
+            _memory.move_to_end(key)
+            return fragment
+
+    path = _path(key)
+    try:
+        fragment = Fragment(xml=path.read_bytes())
+    except OSError:
+        return None
+    _remember(key, fragment)
+    return fragment
+
+
+def put(key: str, fragment: Fragment) -> None:
+    _remember(key, fragment)
+    path = _path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(fragment.xml)
+        tmp.replace(path)
+    except OSError as e:
+        logger.warning(f"Fragment cache write failed: {e}")
+
+
+def clear_memory() -> None:
+    with _lock:
+        _memory.clear()
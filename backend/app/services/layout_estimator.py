@@ -0,0 +1,273 @@
+"""
+Layout estimator — predict how many pages a proposal takes without rendering.
+
+Flows paragraphs onto A4 pages line by line using font metrics only:
+CJK glyphs are one em wide, everything else about half an em, and a line is
+``font_size × line factor × line_spacing`` tall.  Headings keep with the
+next line, space before is dropped at the top of a page, and tables wrap
+per cell; section content is measured block by block as
+``markdown_renderer`` parses it.  No fonts or renderers are loaded, so
+estimating a section costs about as much as reading its text — cheap
+enough to run on every save.
+
+The result is an estimate; when a PDF exists its page count is authoritative.
+"""
+
+import math
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+
+from app.services import markdown_renderer as md
+
+# A4 with DocxBuilder's margins, in points
+PAGE_WIDTH_PT = 210 / 25.4 * 72
+PAGE_HEIGHT_PT = 297 / 25.4 * 72
+MARGIN_X_PT = 3.17 / 2.54 * 72
+MARGIN_Y_PT = 2.54 / 2.54 * 72
+TEXT_WIDTH_PT = PAGE_WIDTH_PT - 2 * MARGIN_X_PT
+TEXT_HEIGHT_PT = PAGE_HEIGHT_PT - 2 * MARGIN_Y_PT
+
+# Single line height as a multiple of font size
+_LINE_FACTORS = {"微軟正黑體": 1.32, "Microsoft JhengHei": 1.32}
+_DEFAULT_LINE_FACTOR = 1.2
+_NARROW_EM = 0.5
+
+# Space before that the default template gives Heading 1-3
+_TEMPLATE_HEADING_SPACE_BEFORE = {1: 24.0, 2: 10.0, 3: 10.0}
+
+# Table cells: left + right padding, and rule/padding per row
+_CELL_PADDING_X_PT = 10.8
+_ROW_EXTRA_PT = 1.0
+
+# One TOC line (TOC 1-3 styles: single spacing, small space after)
+_TOC_ENTRY_PT = 12 * _DEFAULT_LINE_FACTOR + 5
+
+# List items: left indent per nesting level
+LIST_INDENT_PT = 18.0
+
+# Image whose size is unknown (estimating without the file), plus caption
+_DEFAULT_IMAGE_PT = 200.0
+
+
+# Full-width in CJK fonts: Hangul Jamo, CJK blocks, kana, Hangul, compat
+# ideographs, vertical/full-width forms, supplementary ideographs, and the
+# quotes/dashes/ellipsis CJK fonts draw full width
+_WIDE = re.compile(
+    "[\u1100-\u115f\u2e80-\ua4cf\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f"
+    "\uff00-\uff60\uffe0-\uffe6\U00020000-\U0003fffd"
+    "\u2018\u2019\u201c\u201d\u2014\u2026\u3000-\u303f]"
+)
+
+
+def text_width_em(text: str) -> float:
+    """Width of ``text`` in ems: full-width glyphs count 1, the rest 0.5."""
+    if text.isascii():
+        return len(text) * _NARROW_EM
+    wide = len(_WIDE.findall(text))
+    return wide + (len(text) - wide) * _NARROW_EM
+
+
+@dataclass(frozen=True)
+class _ParaMetrics:
+    font_size: float
+    line_height: float
+    space_before: float
+    space_after: float
+    first_line_indent: float
+
+    @classmethod
+    def from_config(cls, cfg: dict, default_space_before: float = 0.0) -> "_ParaMetrics":
+        size = float(cfg.get("font_size", 12))
+        factor = _LINE_FACTORS.get(cfg.get("font_name", ""), _DEFAULT_LINE_FACTOR)
+        space_before = cfg.get("space_before")
+        return cls(
+            font_size=size,
+            line_height=size * factor * float(cfg.get("line_spacing") or 1.0),
+            space_before=float(default_space_before if space_before is None else space_before),
+            space_after=float(cfg.get("space_after") or 0),
+            first_line_indent=float(cfg.get("first_line_indent") or 0),
+        )
+
+    def line_count(self, text: str, width: float = TEXT_WIDTH_PT) -> int:
+        used = text_width_em(text) * self.font_size + self.first_line_indent
+        return max(1, math.ceil(used / width))
+
+
+@dataclass
+class SectionSpan:
+    title: str
+    level: int
+    start_page: int  # 1-based, page of the heading
+    end_page: int  # page of the last line
+    pages: float  # height consumed, in pages
+
+
+@dataclass
+class LayoutEstimate:
+    page_count: int
+    sections: list[SectionSpan]
+
+
+class LayoutEstimator:
+    """Mirrors DocxBuilder call by call and keeps a running page position."""
+
+    def __init__(self, styles: dict):
+        self.body = _ParaMetrics.from_config(styles.get("body", {}))
+        self.list_item = replace(self.body, first_line_indent=0.0)
+        self.table = _ParaMetrics.from_config({**styles.get("table", {}), "line_spacing": 1.0})
+        self.headings = {
+            level: _ParaMetrics.from_config(
+                styles.get(f"heading{level}", {}), _TEMPLATE_HEADING_SPACE_BEFORE[level]
+            )
+            for level in (1, 2, 3)
+        }
+        self._page = 1
+        self._y = 0.0  # height used on the current page
+        self._toc_page: int | None = None
+        self._toc_entries = 0
+        self._section: tuple[str, int, float] | None = None  # title, level, start
+        self.sections: list[SectionSpan] = []
+
+    # -----------------------------------------------------------------
+    # Flow
+    # -----------------------------------------------------------------
+
+    def page_break(self) -> None:
+        self._page += 1
+        self._y = 0.0
+
+    def _position(self) -> float:
+        return (self._page - 1) * TEXT_HEIGHT_PT + self._y
+
+    def _place(self, metrics: _ParaMetrics, lines: int, line_height: float | None = None,
+               keep_with_next: float = 0.0) -> float:
+        """Flow ``lines`` lines of one paragraph, splitting across pages.
+        Returns the position of its first line."""
+        line_height = line_height or metrics.line_height
+        before = metrics.space_before if self._y > 0 else 0.0
+        if self._y > 0 and self._y + before + line_height + keep_with_next > TEXT_HEIGHT_PT:
+            self.page_break()
+            before = 0.0
+        self._y += before
+        top = self._position()
+
+        while True:
+            room = int((TEXT_HEIGHT_PT - self._y) // line_height)
+            if lines <= room:
+                self._y += lines * line_height
+                break
+            lines -= max(room, 0)
+            self.page_break()
+            if line_height > TEXT_HEIGHT_PT:
+                # Taller than a page (huge font) — one line per page
+                lines -= 1
+                if lines <= 0:
+                    break
+        # Space after is truncated at the bottom of a page
+        self._y = min(self._y + metrics.space_after, TEXT_HEIGHT_PT)
+        return top
+
+    def add_table(self, rows: list[list[str]]) -> None:
+        cols = max((len(r) for r in rows), default=0)
+        if not cols:
+            return
+        cell_width = max(TEXT_WIDTH_PT / cols - _CELL_PADDING_X_PT, self.table.font_size)
+        metrics = self.table
+        for row in rows:
+            lines = max(
+                (metrics.line_count(str(cell), cell_width) for cell in row), default=1
+            )
+            # Rows don't split across pages by default; flow them as a block
+            height = lines * metrics.line_height + _ROW_EXTRA_PT
+            if self._y > 0 and self._y + height > TEXT_HEIGHT_PT:
+                self.page_break()
+            self._place(metrics, 1, line_height=height)
+
+    def add_cover(self) -> None:
+        self.page_break()
+
+    def add_toc(self) -> None:
+        # Entries are only known at the end; reserve one page for now
+        self._toc_page = self._page
+        self.page_break()
+
+    def add_heading(self, text: str, level: int) -> float:
+        heading = self.headings[min(max(level, 1), 3)]
+        first_body = self.body.space_before + self.body.line_height
+        self._toc_entries += 1
+        return self._place(heading, heading.line_count(text), keep_with_next=first_body)
+
+    def add_image(self, height_pt: float | None = None, caption: str = "") -> None:
+        height = min(height_pt or _DEFAULT_IMAGE_PT, TEXT_HEIGHT_PT)
+        if self._y > 0 and self._y + height > TEXT_HEIGHT_PT:
+            self.page_break()
+        self._place(self.list_item, 1, line_height=height)
+        if caption:
+            self._place(self.table, self.table.line_count(caption))
+
+    def add_block(self, block: md.Block, section_level: int = 1) -> None:
+        if isinstance(block, md.Paragraph):
+            self._place(self.body, self.body.line_count(block.text))
+        elif isinstance(block, md.ListItem):
+            width = TEXT_WIDTH_PT - LIST_INDENT_PT * (block.depth + 1)
+            text = f"{block.marker} {block.text}"
+            self._place(self.list_item, self.list_item.line_count(text, width))
+        elif isinstance(block, md.Heading):
+            self.add_heading(block.text, section_level + block.level)
+        elif isinstance(block, md.Table):
+            self.add_table(block.rows)
+        elif isinstance(block, md.Image):
+            self.add_image(caption=block.alt)
+
+    def start_section(self, title: str, level: int = 1) -> None:
+        # The heading may move to a new page; measure from where it lands
+        start = self.add_heading(title, level)
+        self._section = (title, level, start)
+
+    def end_section(self) -> SectionSpan:
+        title, level, start = self._section
+        self._section = None
+        span = SectionSpan(
+            title=title,
+            level=level,
+            start_page=int(start // TEXT_HEIGHT_PT) + 1,
+            end_page=self._page,
+            pages=round((self._position() - start) / TEXT_HEIGHT_PT, 2),
+        )
+        self.sections.append(span)
+        return span
+
+    def add_section(self, title: str, blocks: Iterable[md.Block], level: int = 1) -> SectionSpan:
+        self.start_section(title, level)
+        for block in blocks:
+            self.add_block(block, level)
+        return self.end_section()
+
+    # -----------------------------------------------------------------
+    # Result
+    # -----------------------------------------------------------------
+
+    def _toc_extra_pages(self) -> int:
+        if self._toc_page is None:
+            return 0
+        title = self.headings[1].line_height
+        needed = math.ceil((title + self._toc_entries * _TOC_ENTRY_PT) / TEXT_HEIGHT_PT)
+        return max(needed, 1) - 1
+
+    def estimate(self) -> LayoutEstimate:
+        extra = self._toc_extra_pages()
+        sections = self.sections
+        if extra:
+            sections = [
+                replace(s, start_page=s.start_page + extra, end_page=s.end_page + extra)
+                if s.start_page > self._toc_page else s
+                for s in sections
+            ]
+        return LayoutEstimate(page_count=max(1, self._page + extra), sections=sections)
+
+
+def estimate_section(content: str, styles: dict, title: str = "", level: int = 1) -> SectionSpan:
+    """Pages one section takes on its own, starting at the top of a page."""
+    estimator = LayoutEstimator(styles)
+    return estimator.add_section(title, md.parse_blocks(content or ""), level)
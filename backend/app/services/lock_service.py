@@ -0,0 +1,321 @@
+"""
+Lock service — section edit locks in Redis with a TTL.
+
+A lock is one key per section holding ``{user_id, user_name, project_id,
+locked_at}``, set with a PX TTL only when free.  Editors keep it alive
+with heartbeats over the project WebSocket; if the heartbeats stop the key
+simply expires.
+Every lock is also a member of one sorted set scored by its expiry, which
+the sweeper uses to find expired locks and announce them — Redis itself
+does not report expirations.
+
+Check-and-set steps run as Lua scripts so a renew, release or sweep never
+races another client.  Redis errors propagate; ``section_service`` falls
+back to the database columns when Redis is unavailable.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from redis.exceptions import RedisError
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.session import async_session_factory
+from app.models.section import Section
+from app.services import realtime_service, tree_cache
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "section-lock:"
+_EXPIRY_KEY = "section-locks:expiry"
+_SWEEP_BATCH = 100
+
+# KEYS: lock, expiry set.  ARGV: value, ttl ms, expires at ms, user id.
+# Returns {1, value} when taken or renewed, {0, holder value} otherwise.
+_ACQUIRE = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    local holder = cjson.decode(current)
+    if holder.user_id ~= ARGV[4] then
+        return {0, current}
+    end
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    redis.call('ZADD', KEYS[2], ARGV[3], holder.member)
+    return {1, current}
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], cjson.decode(ARGV[1]).member)
+return {1, ARGV[1]}
+"""
+
+# KEYS: lock, expiry set.  ARGV: ttl ms, expires at ms, user id.
+_RENEW = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return 0
+end
+local holder = cjson.decode(current)
+if holder.user_id ~= ARGV[3] then
+    return 0
+end
+redis.call('PEXPIRE', KEYS[1], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[2], holder.member)
+return 1
+"""
+
+# KEYS: lock, expiry set.  ARGV: user id, force ("1" for admins).
+# Returns the released holder's value, or {0, holder value} if refused.
+_RELEASE = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return {1, false}
+end
+local holder = cjson.decode(current)
+if holder.user_id ~= ARGV[1] and ARGV[2] ~= '1' then
+    return {0, current}
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], holder.member)
+return {1, current}
+"""
+
+# KEYS: expiry set.  ARGV: now ms, batch size, lock key prefix.
+# Removes and returns members whose lock key is gone.
+_SWEEP = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+local expired = {}
+for _, member in ipairs(due) do
+    local section_id = string.match(member, '^([^|]+)')
+    if redis.call('EXISTS', ARGV[3] .. section_id) == 0 then
+        redis.call('ZREM', KEYS[1], member)
+        table.insert(expired, member)
+    end
+end
+return expired
+"""
+
+
+class LockHeld(Exception):
+    """The section is locked by someone else."""
+
+    def __init__(self, holder: "LockInfo"):
+        super().__init__(f"Section {holder.section_id} is locked by {holder.user_id}")
+        self.holder = holder
+
+
+@dataclass
+class LockInfo:
+    section_id: uuid.UUID
+    project_id: uuid.UUID
+    user_id: uuid.UUID
+    user_name: str
+    locked_at: datetime
+    expires_at: datetime
+
+    def to_event(self) -> dict:
+        return {
+            "section_id": str(self.section_id),
+            "user_id": str(self.user_id),
+            "user_name": self.user_name,
+            "locked_at": self.locked_at.isoformat(),
+            "expires_at": self.expires_at.isoformat(),
+        }
+
+
+def _key(section_id: uuid.UUID) -> str:
+    return f"{_KEY_PREFIX}{section_id}"
+
+
+def _ttl_ms() -> int:
+    return settings.SECTION_LOCK_TTL_SECONDS * 1000
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _from_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc)
+
+
+def _parse(raw: str, expires_ms: int) -> LockInfo:
+    value = json.loads(raw)
+    return LockInfo(
+        section_id=uuid.UUID(value["section_id"]),
+        project_id=uuid.UUID(value["project_id"]),
+        user_id=uuid.UUID(value["user_id"]),
+        user_name=value["user_name"],
+        locked_at=_from_ms(value["locked_at"]),
+        expires_at=_from_ms(expires_ms),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Locks
+# ---------------------------------------------------------------------------
+
+async def acquire(
+    section_id: uuid.UUID, project_id: uuid.UUID, user_id: uuid.UUID, user_name: str
+) -> LockInfo:
+    """Take the lock, or renew it if ``user_id`` already holds it.
+    Raises ``LockHeld`` if another user does."""
+    redis = realtime_service.get_redis()
+    now = _now_ms()
+    expires = now + _ttl_ms()
+    value = json.dumps({
+        "section_id": str(section_id),
+        "project_id": str(project_id),
+        "user_id": str(user_id),
+        "user_name": user_name,
+        "locked_at": now,
+        "member": f"{section_id}|{project_id}|{user_id}",
+    }, ensure_ascii=False)
+    taken, raw = await redis.eval(
+        _ACQUIRE, 2, _key(section_id), _EXPIRY_KEY, value, _ttl_ms(), expires, str(user_id)
+    )
+    if not taken:
+        ttl = await redis.pttl(_key(section_id))
+        raise LockHeld(_parse(raw, now + max(ttl, 0)))
+    return _parse(raw, expires)
+
+
+async def _extend_db_lock(
+    section_id: uuid.UUID, user_id: uuid.UUID, expires_at: datetime
+) -> None:
+    # The cached tree keeps the older expiry; live locks come from the socket
+    async with async_session_factory() as db:
+        await db.execute(
+            update(Section)
+            .where(Section.id == section_id, Section.locked_by == user_id)
+            .values(lock_expires_at=expires_at)
+        )
+        await db.commit()
+
+
+async def renew(section_id: uuid.UUID, user_id: uuid.UUID) -> datetime | None:
+    """Heartbeat: extend ``user_id``'s lock, in Redis and in the DB columns
+    the fallback relies on.  Returns the new expiry, or None if the lock was
+    lost (expired or released)."""
+    expires = _now_ms() + _ttl_ms()
+    renewed = await realtime_service.get_redis().eval(
+        _RENEW, 2, _key(section_id), _EXPIRY_KEY, _ttl_ms(), expires, str(user_id)
+    )
+    if not renewed:
+        return None
+    await _extend_db_lock(section_id, user_id, _from_ms(expires))
+    return _from_ms(expires)
+
+
+async def release(
+    section_id: uuid.UUID, user_id: uuid.UUID, force: bool = False
+) -> LockInfo | None:
+    """Drop the lock; returns the released lock, None if there was none.
+    Raises ``LockHeld`` if another user holds it and ``force`` is false."""
+    released, raw = await realtime_service.get_redis().eval(
+        _RELEASE, 2, _key(section_id), _EXPIRY_KEY, str(user_id), "1" if force else "0"
+    )
+    if not raw:
+        return None
+    info = _parse(raw, _now_ms())
+    if not released:
+        raise LockHeld(info)
+    return info
+
+
+async def holder(section_id: uuid.UUID) -> LockInfo | None:
+    redis = realtime_service.get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        raw, ttl = await pipe.get(_key(section_id)).pttl(_key(section_id)).execute()
+    if raw is None:
+        return None
+    return _parse(raw, _now_ms() + max(ttl, 0))
+
+
+async def project_locks(project_id: uuid.UUID) -> list[LockInfo]:
+    """Live locks in one project, for the WebSocket snapshot."""
+    redis = realtime_service.get_redis()
+    now = _now_ms()
+    members = await redis.zrangebyscore(_EXPIRY_KEY, now, "+inf", withscores=True)
+    wanted = [
+        (member.split("|", 1)[0], int(score)) for member, score in members
+        if member.split("|")[1] == str(project_id)
+    ]
+    if not wanted:
+        return []
+    values = await redis.mget([f"{_KEY_PREFIX}{section_id}" for section_id, _ in wanted])
+    return [_parse(raw, expires) for raw, (_, expires) in zip(values, wanted) if raw]
+
+
+# ---------------------------------------------------------------------------
+# Expiry sweeper
+# ---------------------------------------------------------------------------
+
+async def _clear_db_lock(
+    section_id: uuid.UUID, project_id: uuid.UUID, user_id: uuid.UUID
+) -> None:
+    async with async_session_factory() as db:
+        result = await db.execute(
+            update(Section)
+            .where(Section.id == section_id, Section.locked_by == user_id)
+            .values(locked_by=None, locked_at=None, lock_expires_at=None)
+        )
+        await db.commit()
+    if result.rowcount:
+        await tree_cache.invalidate(project_id)
+
+
+async def sweep_expired() -> int:
+    """Announce locks whose key has expired and clear them in the DB.
+    Safe to run on every instance: each expiry is claimed exactly once."""
+    expired = await realtime_service.get_redis().eval(
+        _SWEEP, 1, _EXPIRY_KEY, _now_ms(), _SWEEP_BATCH, _KEY_PREFIX
+    )
+    for member in expired:
+        section_id, project_id, user_id = (uuid.UUID(p) for p in member.split("|"))
+        await _clear_db_lock(section_id, project_id, user_id)
+        await realtime_service.publish(
+            project_id, "lock_expired", section_id=str(section_id), user_id=str(user_id)
+        )
+    return len(expired)
+
+
+_sweeper: asyncio.Task | None = None
+
+
+async def _sweep_loop() -> None:
+    redis_down = False
+    while True:
+        try:
+            await sweep_expired()
+            redis_down = False
+        except RedisError as e:
+            # Once per outage, not every interval
+            if not redis_down:
+                logger.warning(f"Lock sweep paused, Redis unavailable: {e}")
+            redis_down = True
+        except Exception:
+            logger.exception("Lock sweep failed")
+        await asyncio.sleep(settings.SECTION_LOCK_SWEEP_INTERVAL_SECONDS)
+
+
+def start_sweeper() -> None:
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = asyncio.create_task(_sweep_loop())
+
+
+async def stop_sweeper() -> None:
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        try:
+            await _sweeper
+        except asyncio.CancelledError:
+            pass
+        _sweeper = None
@@ -0,0 +1,164 @@
+"""
+Markdown renderer — turn section content into blocks for DocxBuilder.
+
+LLM output is Markdown-ish.  ``parse_blocks`` reads it line by line in a
+single pass and yields one block per DOCX element: headings, paragraphs,
+list items, pipe tables, and images referenced by project asset id::
+
+    ![系統架構圖](asset:9b2f0c1e-5d4a-4c3b-8e7f-0a1b2c3d4e5f)
+
+Plain text is unchanged by this — every non-empty line is still one
+paragraph.  Only ``**bold**`` is recognised inline.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+Runs = list[tuple[str, bool]]  # (text, bold)
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*$")
+_IMAGE = re.compile(
+    r"^!\[([^\]]*)\]\(asset:([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}"
+    r"-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})\)$"
+)
+_BULLET = re.compile(r"^[-*+]\s+(.+)$")
+_ORDERED = re.compile(r"^(\d{1,3}[.)])\s+(.+)$")
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+_RULE = re.compile(r"^(\*{3,}|-{3,}|_{3,})$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_ASSET_REF = re.compile(
+    r"!\[[^\]]*\]\(asset:([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}"
+    r"-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})\)"
+)
+
+# Spaces of indentation per list nesting level, and the deepest level kept
+_LIST_INDENT = 2
+_MAX_LIST_DEPTH = 2
+
+
+@dataclass
+class Heading:
+    level: int  # 1 for "#", relative to the section heading
+    text: str
+
+
+@dataclass
+class Paragraph:
+    runs: Runs
+
+    @property
+    def text(self) -> str:
+        return "".join(t for t, _ in self.runs)
+
+
+@dataclass
+class ListItem:
+    runs: Runs
+    marker: str  # "•" or the literal "1." / "2)"
+    depth: int
+
+    @property
+    def text(self) -> str:
+        return "".join(t for t, _ in self.runs)
+
+
+@dataclass
+class Table:
+    rows: list[list[str]]
+    header: bool  # first row is a header row
+
+
+@dataclass
+class Image:
+    asset_id: str  # lower-case UUID string
+    alt: str
+
+
+Block = Heading | Paragraph | ListItem | Table | Image
+
+
+def parse_inline(text: str) -> Runs:
+    """Split ``**bold**`` spans out of a line."""
+    if "**" not in text:
+        return [(text, False)]
+    runs: Runs = []
+    pos = 0
+    for m in _BOLD.finditer(text):
+        if m.start() > pos:
+            runs.append((text[pos:m.start()], False))
+        runs.append((m.group(1), True))
+        pos = m.end()
+    if pos < len(text):
+        runs.append((text[pos:], False))
+    return runs
+
+
+def _strip_bold(text: str) -> str:
+    return _BOLD.sub(r"\1", text)
+
+
+def _table_cells(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [_strip_bold(cell.strip()) for cell in line.split("|")]
+
+
+def _build_table(lines: list[str]) -> Table:
+    header = len(lines) > 1 and bool(_TABLE_SEPARATOR.match(lines[1]))
+    rows = [_table_cells(line) for i, line in enumerate(lines) if not (header and i == 1)]
+    cols = max(len(r) for r in rows)
+    return Table(rows=[r + [""] * (cols - len(r)) for r in rows], header=header)
+
+
+def parse_blocks(content: str) -> Iterator[Block]:
+    """Yield blocks in document order; consecutive ``|`` lines form a table."""
+    table: list[str] = []
+    for raw in content.split("\n"):
+        line = raw.strip()
+        if table and not line.startswith("|"):
+            yield _build_table(table)
+            table = []
+        if not line:
+            continue
+        if line.startswith("|"):
+            table.append(line)
+            continue
+        if _RULE.match(line):
+            continue
+
+        m = _HEADING.match(line)
+        if m:
+            yield Heading(level=len(m.group(1)), text=_strip_bold(m.group(2)))
+            continue
+        m = _IMAGE.match(line)
+        if m:
+            yield Image(asset_id=m.group(2).lower(), alt=m.group(1).strip())
+            continue
+
+        indent = len(raw) - len(raw.lstrip(" "))
+        depth = min(indent // _LIST_INDENT, _MAX_LIST_DEPTH)
+        m = _BULLET.match(line)
+        if m:
+            yield ListItem(runs=parse_inline(m.group(1)), marker="•", depth=depth)
+            continue
+        m = _ORDERED.match(line)
+        if m:
+            yield ListItem(runs=parse_inline(m.group(2)), marker=m.group(1), depth=depth)
+            continue
+
+        yield Paragraph(runs=parse_inline(line))
+    if table:
+        yield _build_table(table)
+
+
+def asset_ids(content: str) -> set[str]:
+    """Lower-case ids of every image asset the content references."""
+    return {m.lower() for m in _ASSET_REF.findall(content or "")}
+
+
+def has_images(content: str) -> bool:
+    return "asset:" in (content or "") and bool(_ASSET_REF.search(content))
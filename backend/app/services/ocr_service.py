@@ -0,0 +1,184 @@
+"""
+OCR service — recover text from scanned (image-only) PDF pages locally.
+
+Image-only pages are detected per page, rasterized with PyMuPDF and sent to
+Tesseract in a process pool.  Results are cached on disk by a hash of the
+page's content stream and embedded images, so re-uploading the same tender
+never OCRs a page twice.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from app.core.config import settings
+from app.services.parser_service import Source, open_pdf
+
+logger = logging.getLogger(__name__)
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def is_available() -> bool:
+    if not settings.OCR_ENABLED:
+        return False
+    try:
+        import pytesseract  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which(settings.OCR_TESSERACT_CMD) is not None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.OCR_WORKERS)
+    return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# ---------------------------------------------------------------------------
+# Worker (runs in a child process — must stay top-level and picklable)
+# ---------------------------------------------------------------------------
+
+def _ocr_png(png: bytes, lang: str, tesseract_cmd: str) -> str:
+    import pytesseract
+    from PIL import Image
+
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    with Image.open(io.BytesIO(png)) as img:
+        return pytesseract.image_to_string(img, lang=lang)
+
+
+# ---------------------------------------------------------------------------
+# Page detection + cache
+# ---------------------------------------------------------------------------
+
+def _needs_ocr(page: fitz.Page, text: str) -> bool:
+    return (
+        len(text.strip()) < settings.OCR_MIN_TEXT_CHARS
+        and bool(page.get_images(full=False))
+    )
+
+
+def _page_hash(doc: fitz.Document, page: fitz.Page) -> str:
+    h = hashlib.sha256()
+    h.update(f"{settings.OCR_LANG}:{settings.OCR_DPI}".encode())
+    h.update(page.read_contents())
+    for img in page.get_images(full=False):
+        h.update(doc.xref_stream_raw(img[0]) or b"")
+    return h.hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return Path(settings.OCR_CACHE_DIR) / key[:2] / f"{key}.txt"
+
+
+def _cache_get(key: str) -> str | None:
+    path = _cache_path(key)
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    return None
+
+
+def _cache_put(key: str, text: str) -> None:
+    path = _cache_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
+    except OSError as e:
+        logger.warning(f"OCR cache write failed: {e}")
+
+
+def _scan(doc: fitz.Document, pages: list[str]) -> tuple[dict[int, str], dict[int, str]]:
+    """Return (cached texts by page index, cache keys of pages still to OCR)."""
+    cached: dict[int, str] = {}
+    todo: dict[int, str] = {}
+    for i, text in enumerate(pages):
+        page = doc[i]
+        if not _needs_ocr(page, text):
+            continue
+        key = _page_hash(doc, page)
+        hit = _cache_get(key)
+        if hit is not None:
+            cached[i] = hit
+        else:
+            todo[i] = key
+    return cached, todo
+
+
+def _rasterize(doc: fitz.Document, index: int) -> bytes:
+    pix = doc[index].get_pixmap(dpi=settings.OCR_DPI, colorspace=fitz.csGRAY)
+    return pix.tobytes("png")
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+async def ocr_scanned_pages(data: Source, pages: list[str]) -> tuple[list[str], int]:
+    """Fill in text for image-only pages of a PDF.
+
+    ``pages`` is the per-page output of ``parser_service.parse_pdf_pages``.
+    Returns the updated page list and how many pages got text from OCR;
+    pages whose OCR failed or found nothing are not counted.
+    """
+    if not pages or not is_available():
+        return pages, 0
+
+    doc = open_pdf(data)
+    recognized = 0
+    try:
+        cached, todo = await asyncio.to_thread(_scan, doc, pages)
+        result = list(pages)
+        for i, text in cached.items():
+            result[i] = text
+            if text.strip():
+                recognized += 1
+
+        if todo:
+            loop = asyncio.get_running_loop()
+            pool = _get_pool()
+            # Keep at most two rasterized pages per worker in memory
+            in_flight = asyncio.Semaphore(settings.OCR_WORKERS * 2)
+            raster_lock = asyncio.Lock()  # fitz documents are not thread-safe
+
+            async def _ocr_one(index: int, key: str) -> None:
+                nonlocal recognized
+                async with in_flight:
+                    async with raster_lock:
+                        png = await asyncio.to_thread(_rasterize, doc, index)
+                    text = await loop.run_in_executor(
+                        pool, _ocr_png, png, settings.OCR_LANG, settings.OCR_TESSERACT_CMD
+                    )
+                result[index] = text
+                if text.strip():
+                    recognized += 1
+                await asyncio.to_thread(_cache_put, key, text)
+
+            outcomes = await asyncio.gather(
+                *(_ocr_one(i, key) for i, key in todo.items()),
+                return_exceptions=True,
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    logger.error(f"OCR page failed: {outcome}")
+    finally:
+        doc.close()
+
+    return result, recognized
@@ -0,0 +1,266 @@
+"""
+Page store — per-page parsed text kept in MinIO next to the source document.
+
+Each page is zlib-compressed and written back to back into ``pages.bin``;
+``pages.json`` records the byte offset of every page.  Reading a page range
+costs one ranged GET, so callers only pull the pages they actually need.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import re
+import tempfile
+import zlib
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable
+
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.models.document import Document
+from app.services.storage_service import get_minio
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _prefix(doc: Document) -> str:
+    return f"{doc.project_id}/{doc.id}/.pages"
+
+
+def _data_object(doc: Document) -> str:
+    return f"{_prefix(doc)}/pages.bin"
+
+
+def _index_object(doc: Document) -> str:
+    return f"{_prefix(doc)}/pages.json"
+
+
+@dataclass
+class PageIndex:
+    # offsets[i]..offsets[i+1] is the compressed byte span of page i+1
+    offsets: list[int] = field(default_factory=lambda: [0])
+    char_counts: list[int] = field(default_factory=list)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.char_counts)
+
+    def to_json(self) -> bytes:
+        return json.dumps({
+            "version": INDEX_FORMAT_VERSION,
+            "offsets": self.offsets,
+            "chars": self.char_counts,
+        }).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "PageIndex":
+        data = json.loads(raw)
+        return cls(offsets=data["offsets"], char_counts=data["chars"])
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+class PageWriter:
+    """Compress pages one at a time into a spooled temp file, then upload."""
+
+    def __init__(self) -> None:
+        self.index = PageIndex()
+        self._buf = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        self._page_no: int | None = None
+        self._page_parts: list[str] = []
+
+    def add_page(self, text: str) -> None:
+        blob = zlib.compress(text.encode("utf-8"), 6)
+        self._buf.write(blob)
+        self.index.offsets.append(self.index.offsets[-1] + len(blob))
+        self.index.char_counts.append(len(text))
+
+    def add_pages(self, pages: Iterable[str]) -> None:
+        for page in pages:
+            self.add_page(page)
+
+    def feed(self, page_no: int, text: str) -> None:
+        """Accept streamed parser records; a page is written once the
+        stream moves past it."""
+        if self._page_no is not None and page_no != self._page_no:
+            self._flush_page()
+        self._page_no = page_no
+        self._page_parts.append(text)
+
+    def _flush_page(self) -> None:
+        if self._page_no is not None:
+            self.add_page("\n\n".join(self._page_parts))
+        self._page_parts = []
+        self._page_no = None
+
+    def _upload(self, doc: Document) -> None:
+        client = get_minio()
+        size = self.index.offsets[-1]
+        self._buf.seek(0)
+        client.put_object(
+            bucket_name=settings.BUCKET_TENDER_DOCS,
+            object_name=_data_object(doc),
+            data=self._buf,
+            length=size,
+            content_type="application/octet-stream",
+        )
+        raw_index = self.index.to_json()
+        client.put_object(
+            bucket_name=settings.BUCKET_TENDER_DOCS,
+            object_name=_index_object(doc),
+            data=io.BytesIO(raw_index),
+            length=len(raw_index),
+            content_type="application/json",
+        )
+
+    async def save(self, doc: Document) -> int:
+        self._flush_page()
+        try:
+            await asyncio.to_thread(self._upload, doc)
+        finally:
+            self._buf.close()
+        return self.index.page_count
+
+
+async def save_pages(doc: Document, pages: Iterable[str]) -> int:
+    writer = PageWriter()
+    writer.add_pages(pages)
+    return await writer.save(doc)
+
+
+def delete_pages(doc: Document) -> None:
+    client = get_minio()
+    for name in (_data_object(doc), _index_object(doc)):
+        try:
+            client.remove_object(settings.BUCKET_TENDER_DOCS, name)
+        except Exception:
+            pass  # artifact may never have been written
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+class PagedDocument:
+    """Lazy, page-addressable view of a parsed document.
+
+    Page numbers are 1-based and ranges are inclusive, matching how tender
+    documents cite pages.
+    """
+
+    def __init__(self, doc: Document, index: PageIndex):
+        self._doc = doc
+        self.index = index
+
+    def __len__(self) -> int:
+        return self.index.page_count
+
+    @property
+    def page_count(self) -> int:
+        return self.index.page_count
+
+    @classmethod
+    async def open(cls, doc: Document) -> "PagedDocument | None":
+        """Load the page index, or None if the document has no page artifact.
+        Storage failures other than a missing object propagate."""
+        def _read_index() -> bytes:
+            response = get_minio().get_object(
+                settings.BUCKET_TENDER_DOCS, _index_object(doc)
+            )
+            try:
+                return response.read()
+            finally:
+                response.close()
+                response.release_conn()
+
+        try:
+            raw = await asyncio.to_thread(_read_index)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise
+        return cls(doc, PageIndex.from_json(raw))
+
+    def _clamp(self, start: int, end: int | None) -> tuple[int, int]:
+        end = self.page_count if end is None else min(end, self.page_count)
+        return max(1, start), end
+
+    async def get_pages(self, start: int = 1, end: int | None = None) -> list[str]:
+        start, end = self._clamp(start, end)
+        if start > end:
+            return []
+
+        offsets = self.index.offsets
+        first_byte = offsets[start - 1]
+        length = offsets[end] - first_byte
+
+        def _read_span() -> bytes:
+            response = get_minio().get_object(
+                settings.BUCKET_TENDER_DOCS,
+                _data_object(self._doc),
+                offset=first_byte,
+                length=length,
+            )
+            try:
+                return response.read()
+            finally:
+                response.close()
+                response.release_conn()
+
+        blob = await asyncio.to_thread(_read_span)
+        pages = []
+        for page_no in range(start, end + 1):
+            lo = offsets[page_no - 1] - first_byte
+            hi = offsets[page_no] - first_byte
+            pages.append(zlib.decompress(blob[lo:hi]).decode("utf-8"))
+        return pages
+
+    async def get_page(self, page_number: int) -> str:
+        pages = await self.get_pages(page_number, page_number)
+        return pages[0] if pages else ""
+
+    async def iter_pages(
+        self, start: int = 1, end: int | None = None, batch_size: int = 20
+    ) -> AsyncIterator[tuple[int, str]]:
+        """Yield ``(page_number, text)`` fetching ``batch_size`` pages per GET."""
+        start, end = self._clamp(start, end)
+        for batch_start in range(start, end + 1, batch_size):
+            batch_end = min(batch_start + batch_size - 1, end)
+            pages = await self.get_pages(batch_start, batch_end)
+            for offset, text in enumerate(pages):
+                yield batch_start + offset, text
+
+    async def text(self, start: int = 1, end: int | None = None) -> str:
+        return "\n\n".join(await self.get_pages(start, end))
+
+    async def locate(
+        self, snippets: list[str], probe_chars: int = 40
+    ) -> list[int | None]:
+        """Find the page each snippet first appears on.
+
+        Whitespace is ignored on both sides because PDF extraction inserts
+        line breaks mid-sentence.  Stops reading as soon as every snippet
+        has been placed.
+        """
+        probes = [_WHITESPACE_RE.sub("", s or "")[:probe_chars] for s in snippets]
+        found: list[int | None] = [None] * len(probes)
+        pending = {i for i, p in enumerate(probes) if p}
+        if not pending:
+            return found
+
+        async for page_no, text in self.iter_pages():
+            compact = _WHITESPACE_RE.sub("", text)
+            for i in list(pending):
+                if probes[i] in compact:
+                    found[i] = page_no
+                    pending.discard(i)
+            if not pending:
+                break
+        return found
@@ -1,13 +1,35 @@
 """
 Document parser — extract text from PDF, DOCX, XLSX files.
+
+The ``iter_*_records`` generators stream structured records so large files
+can be chunked and embedded without ever holding the full text; the
+``parse_*`` helpers join those records for callers that want one string.
 """
 
 import io
-import tempfile
+import zipfile
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import BinaryIO, Iterator
 
 import fitz  # PyMuPDF
-from docx import Document as DocxDocument
+from lxml import etree
+
+# A source is raw bytes, a filesystem path, or a seekable binary file
+Source = bytes | str | Path | BinaryIO
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+@dataclass
+class ParsedRecord:
+    """One unit of parsed content, in document order."""
+    text: str
+    kind: str  # "page" | "paragraph" | "table_row" | "sheet" | "row"
+    page: int = 1
+    sheet: str | None = None
+    row: int | None = None
+    cells: list[str] = field(default_factory=list)
 
 
 def detect_file_type(filename: str) -> str:
@@ -22,53 +44,213 @@ def detect_file_type(filename: str) -> str:
     return mapping.get(ext, "unknown")
 
 
-def parse_pdf(data: bytes) -> str:
-    doc = fitz.open(stream=data, filetype="pdf")
+def _as_file(source: Source) -> str | BinaryIO:
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    if isinstance(source, Path):
+        return str(source)
+    return source
+
+
+# ---------------------------------------------------------------------------
+# PDF
+# ---------------------------------------------------------------------------
+
+def open_pdf(source: Source) -> fitz.Document:
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    if isinstance(source, (str, Path)):
+        return fitz.open(str(source))
+    return fitz.open(stream=source.read(), filetype="pdf")
+
+
+def parse_pdf_pages(data: Source) -> list[str]:
+    doc = open_pdf(data)
     pages = []
     for page in doc:
         pages.append(page.get_text())
     doc.close()
-    return "\n\n".join(pages)
-
-
-def parse_docx(data: bytes) -> str:
-    doc = DocxDocument(io.BytesIO(data))
-    paragraphs = []
-    for para in doc.paragraphs:
-        text = para.text.strip()
-        if text:
-            paragraphs.append(text)
-    # Also extract tables
-    for table in doc.tables:
-        for row in table.rows:
-            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-            if cells:
-                paragraphs.append(" | ".join(cells))
-    return "\n\n".join(paragraphs)
-
-
-def parse_xlsx(data: bytes) -> str:
+    return pages
+
+
+def parse_pdf(data: Source) -> str:
+    return "\n\n".join(parse_pdf_pages(data))
+
+
+def iter_pdf_records(data: Source) -> Iterator[ParsedRecord]:
+    doc = open_pdf(data)
+    try:
+        for page_no, page in enumerate(doc, start=1):
+            yield ParsedRecord(text=page.get_text(), kind="page", page=page_no)
+    finally:
+        doc.close()
+
+
+# ---------------------------------------------------------------------------
+# DOCX — streamed straight from word/document.xml
+# ---------------------------------------------------------------------------
+
+def iter_docx_records(data: Source) -> Iterator[ParsedRecord]:
+    """Yield paragraphs and table rows in document order.
+
+    Parses ``word/document.xml`` with ``iterparse`` and clears elements as
+    soon as they are emitted, so memory stays flat however long the file is.
+    Page numbers follow Word's rendered page breaks when present.
+    """
+    with zipfile.ZipFile(_as_file(data)) as zf, zf.open("word/document.xml") as xml:
+        page = 1
+        after_hard_break = False
+        table_depth = 0
+        row_cells: list[str] = []
+        cell_parts: list[str] = []
+        para_parts: list[str] = []
+        row_index = 0
+
+        for event, elem in etree.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == f"{_W}tbl":
+                    table_depth += 1
+                    if table_depth == 1:
+                        row_index = 0
+                elif tag == f"{_W}tr" and table_depth == 1:
+                    row_cells = []
+                elif tag == f"{_W}tc" and table_depth == 1:
+                    cell_parts = []
+                elif tag == f"{_W}p":
+                    para_parts = []
+                continue
+
+            if tag == f"{_W}t":
+                if elem.text:
+                    para_parts.append(elem.text)
+                    after_hard_break = False
+            elif tag == f"{_W}tab":
+                para_parts.append("\t")
+            elif tag == f"{_W}br":
+                if elem.get(f"{_W}type") == "page":
+                    page += 1
+                    after_hard_break = True
+            elif tag == f"{_W}lastRenderedPageBreak":
+                # Word also renders a break right after an explicit one
+                if not after_hard_break:
+                    page += 1
+                after_hard_break = False
+            elif tag == f"{_W}p":
+                text = "".join(para_parts).strip()
+                if table_depth == 0:
+                    if text:
+                        yield ParsedRecord(text=text, kind="paragraph", page=page)
+                    elem.clear()
+                elif text:
+                    cell_parts.append(text)
+            elif tag == f"{_W}tc" and table_depth == 1:
+                row_cells.append(" ".join(cell_parts))
+            elif tag == f"{_W}tr" and table_depth == 1:
+                row_index += 1
+                cells = [c for c in row_cells if c]
+                if cells:
+                    yield ParsedRecord(
+                        text=" | ".join(cells),
+                        kind="table_row",
+                        page=page,
+                        row=row_index,
+                        cells=cells,
+                    )
+                elem.clear()
+            elif tag == f"{_W}tbl":
+                table_depth -= 1
+                if table_depth == 0:
+                    elem.clear()
+
+            # Drop already-processed siblings of top-level body children
+            if table_depth == 0 and tag in (f"{_W}p", f"{_W}tbl"):
+                parent = elem.getparent()
+                if parent is not None and parent.tag == f"{_W}body":
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+
+def parse_docx(data: Source) -> str:
+    return "\n\n".join(r.text for r in iter_docx_records(data))
+
+
+# ---------------------------------------------------------------------------
+# XLSX
+# ---------------------------------------------------------------------------
+
+def iter_xlsx_records(data: Source) -> Iterator[ParsedRecord]:
+    """Yield a ``sheet`` marker per worksheet, then one record per row.
+
+    Each worksheet is reported as its own page.
+    """
     try:
         from openpyxl import load_workbook
     except ImportError:
-        return "[openpyxl not installed — cannot parse xlsx]"
-
-    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
-    sections = []
-    for sheet in wb.sheetnames:
-        ws = wb[sheet]
-        rows = []
-        for row in ws.iter_rows(values_only=True):
-            cells = [str(c) if c is not None else "" for c in row]
-            if any(cells):
-                rows.append(" | ".join(cells))
-        if rows:
-            sections.append(f"[{sheet}]\n" + "\n".join(rows))
-    wb.close()
+        yield ParsedRecord(text="[openpyxl not installed — cannot parse xlsx]", kind="paragraph")
+        return
+
+    wb = load_workbook(_as_file(data), read_only=True, data_only=True)
+    try:
+        for page_no, sheet in enumerate(wb.sheetnames, start=1):
+            ws = wb[sheet]
+            announced = False
+            for row_no, row in enumerate(ws.iter_rows(values_only=True), start=1):
+                cells = [str(c) if c is not None else "" for c in row]
+                if not any(cells):
+                    continue
+                if not announced:
+                    yield ParsedRecord(text=f"[{sheet}]", kind="sheet", page=page_no, sheet=sheet)
+                    announced = True
+                yield ParsedRecord(
+                    text=" | ".join(cells),
+                    kind="row",
+                    page=page_no,
+                    sheet=sheet,
+                    row=row_no,
+                    cells=cells,
+                )
+    finally:
+        wb.close()
+
+
+def parse_xlsx(data: Source) -> str:
+    sections: list[str] = []
+    current: list[str] = []
+    for record in iter_xlsx_records(data):
+        if record.kind == "sheet" and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(record.text)
+    if current:
+        sections.append("\n".join(current))
     return "\n\n".join(sections)
 
 
-def parse_file(data: bytes, file_type: str) -> str:
+# ---------------------------------------------------------------------------
+# Dispatch
+# ---------------------------------------------------------------------------
+
+def iter_records(data: Source, file_type: str) -> Iterator[ParsedRecord]:
+    if file_type == "pdf":
+        return iter_pdf_records(data)
+    elif file_type in ("docx", "doc"):
+        return iter_docx_records(data)
+    elif file_type in ("xlsx", "xls"):
+        return iter_xlsx_records(data)
+    return iter(())
+
+
+def parse_file_pages(data: Source, file_type: str) -> list[str]:
+    """Parse into pages. Only PDFs carry real page boundaries; other
+    formats come back as a single page."""
+    if file_type == "pdf":
+        return parse_pdf_pages(data)
+    text = parse_file(data, file_type)
+    return [text] if text else []
+
+
+def parse_file(data: Source, file_type: str) -> str:
     if file_type == "pdf":
         return parse_pdf(data)
     elif file_type in ("docx", "doc"):
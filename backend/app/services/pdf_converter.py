@@ -1,80 +1,271 @@
 """
-PDF converter — DOCX → PDF via LibreOffice headless, plus merge / watermark.
+PDF converter — DOCX → PDF via LibreOffice headless, plus merge / watermark,
+outline, generated TOC and page numbering for chapter-split exports.
+
+Post-processing works on files, not bytes: documents are opened from disk,
+changes to existing files are saved incrementally, and full rewrites use
+garbage collection and deflate, so a large export never sits in memory as
+several full copies.
 """
 
-import asyncio
 import os
-import shutil
-import tempfile
-from pathlib import Path
+import re
 
 import fitz  # PyMuPDF
 
+from app.services import conversion_pool
+
+WATERMARK_MODES = ("xobject", "stamp")
+
+_CJK_FONT = "china-t"
+_LATIN_FONT = "helv"
+
+_REF = re.compile(r"\d+ 0 R")
+
 
 async def docx_to_pdf(docx_bytes: bytes) -> bytes | None:
-    """Convert DOCX bytes to PDF bytes using LibreOffice headless.
-    Returns None if LibreOffice is not available.
+    """Convert DOCX bytes to PDF bytes on the warm LibreOffice pool.
+    Returns None if LibreOffice is not available; raises
+    ``conversion_pool.ConversionError`` if the conversion fails or times out.
     """
-    lo_path = shutil.which("libreoffice") or shutil.which("soffice")
-    if lo_path is None:
-        return None
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        docx_path = os.path.join(tmpdir, "input.docx")
-        with open(docx_path, "wb") as f:
-            f.write(docx_bytes)
-
-        proc = await asyncio.create_subprocess_exec(
-            lo_path,
-            "--headless",
-            "--convert-to", "pdf",
-            "--outdir", tmpdir,
-            docx_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        await proc.communicate()
+    return await conversion_pool.get_pool().convert(docx_bytes)
 
-        pdf_path = os.path.join(tmpdir, "input.pdf")
-        if os.path.exists(pdf_path):
-            with open(pdf_path, "rb") as f:
-                return f.read()
-    return None
 
+async def docx_to_pdf_file(src: str, dst: str) -> bool:
+    """File-to-file ``docx_to_pdf``; returns False if LibreOffice is not
+    available."""
+    return await conversion_pool.get_pool().convert_file(src, dst)
 
-def merge_pdfs(pdf_bytes_list: list[bytes]) -> bytes:
-    """Merge multiple PDFs into one."""
-    writer = fitz.open()
-    for pdf_bytes in pdf_bytes_list:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        writer.insert_pdf(doc)
+
+def _save_in_place(doc: fitz.Document, path: str) -> None:
+    """Save and close ``doc``, appending only the changed objects to
+    ``path`` when possible."""
+    if doc.can_save_incrementally():
+        doc.save(path, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
         doc.close()
-    out = writer.tobytes()
+        return
+    # Repaired on open — needs a full rewrite
+    tmp = f"{path}.tmp"
+    doc.save(tmp, garbage=3, deflate=True)
+    doc.close()
+    os.replace(tmp, path)
+
+
+def merge_pdfs(paths: list[str], dst: str) -> None:
+    """Merge PDF files into ``dst``; duplicate resources are collapsed."""
+    writer = fitz.open()
+    for path in paths:
+        with fitz.open(path) as doc:
+            writer.insert_pdf(doc)
+    writer.save(dst, garbage=3, deflate=True)
     writer.close()
-    return out
 
 
-def add_watermark(pdf_bytes: bytes, watermark_text: str) -> bytes:
-    """Add diagonal watermark text to every page."""
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    for page in doc:
-        rect = page.rect
-        # Diagonal text across the page
-        point = fitz.Point(rect.width / 4, rect.height / 2)
-        page.insert_text(
-            point,
-            watermark_text,
-            fontsize=48,
-            color=(0.85, 0.85, 0.85),
-            rotate=45,
-        )
-    out = doc.tobytes()
-    doc.close()
-    return out
+def _draw_watermark(page: fitz.Page, text: str) -> None:
+    """Diagonal text across the middle of ``page``."""
+    rect = page.rect
+    fontsize = 48
+    width = fitz.get_text_length(text, fontname=_CJK_FONT, fontsize=fontsize)
+    center = fitz.Point(rect.width / 2, rect.height / 2)
+    page.insert_text(
+        center - (width / 2, -fontsize / 3),
+        text,
+        fontname=_CJK_FONT,
+        fontsize=fontsize,
+        color=(0.85, 0.85, 0.85),
+        morph=(center, fitz.Matrix(-45)),
+    )
+
+
+def _dict_ref(doc: fitz.Document, xref: int, key: str) -> tuple[int, str]:
+    """Where dict ``key`` of object ``xref`` lives: its own object when it is
+    an indirect reference, else a key path inside ``xref``."""
+    kind, value = doc.xref_get_key(xref, key)
+    if kind == "xref":
+        return int(value.split()[0]), ""
+    return xref, key + "/"
+
+
+def _content_refs(doc: fitz.Document, page: fitz.Page) -> list[str]:
+    return _REF.findall(doc.xref_get_key(page.xref, "Contents")[1])
+
+
+def _share_watermark(doc: fitz.Document, stamp: fitz.Document) -> None:
+    """Place the stamp on the first page, then point every other page of
+    the same size at the XObject and content stream that created.
+
+    ``show_pdf_page`` per page would also reuse the XObject, but it rescans
+    all earlier pages each call — quadratic in page count.
+    """
+    first = doc[0]
+    before = {x[0] for x in first.get_xobjects()}
+    first.show_pdf_page(first.rect, stamp, 0, overlay=True)
+    xref, name = next((x[0], x[1]) for x in first.get_xobjects() if x[0] not in before)
+    wm_stream = _content_refs(doc, first)[-1]
+
+    for page in doc.pages(1):
+        if page.rect != first.rect or doc.xref_get_key(page.xref, "Resources")[0] == "null":
+            page.show_pdf_page(page.rect, stamp, 0, overlay=True)
+            continue
+        # Isolate the page's graphics state from the appended stream
+        if not page.is_wrapped:
+            page.wrap_contents()
+        res_xref, res_path = _dict_ref(doc, page.xref, "Resources")
+        xobj_xref, xobj_path = _dict_ref(doc, res_xref, res_path + "XObject")
+        doc.xref_set_key(xobj_xref, xobj_path + name, f"{xref} 0 R")
+        refs = _content_refs(doc, page) + [wm_stream]
+        doc.xref_set_key(page.xref, "Contents", "[" + " ".join(refs) + "]")
+
+
+def add_watermark(path: str, watermark_text: str, mode: str = "xobject") -> None:
+    """Add a diagonal watermark to every page of the PDF at ``path``.
+
+    ``xobject`` draws the watermark once as a Form XObject and references
+    it from every page; ``stamp`` draws the text into each page's content.
+    """
+    doc = fitz.open(path)
+    if mode == "stamp":
+        for page in doc:
+            _draw_watermark(page, watermark_text)
+    elif len(doc):
+        first = doc[0].rect
+        stamp = fitz.open()
+        _draw_watermark(stamp.new_page(width=first.width, height=first.height), watermark_text)
+        _share_watermark(doc, stamp)
+        stamp.close()
+    _save_in_place(doc, path)
 
 
-def get_pdf_page_count(pdf_bytes: bytes) -> int:
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    count = len(doc)
+def get_pdf_page_count(path: str) -> int:
+    with fitz.open(path) as doc:
+        return len(doc)
+
+
+# ---------------------------------------------------------------------------
+# Chapter-split exports
+# ---------------------------------------------------------------------------
+
+# A4 with DocxBuilder's margins, in points
+_A4_WIDTH, _A4_HEIGHT = fitz.paper_size("a4")
+_MARGIN_X = 3.17 / 2.54 * 72
+_MARGIN_Y = 72.0
+
+_TOC_TITLE_SIZE = 16
+_TOC_TITLE_HEIGHT = 48
+_TOC_ENTRY_SIZE = 12
+_TOC_LINE_HEIGHT = 20
+_TOC_LEVEL_INDENT = 24
+_PAGE_NUMBER_SIZE = 9
+
+OutlineEntry = tuple[int, str, int]  # (level, title, 1-based page)
+
+
+def read_outline(path: str) -> tuple[int, list[OutlineEntry]]:
+    """Page count and heading bookmarks (LibreOffice exports one per heading)."""
+    with fitz.open(path) as doc:
+        return len(doc), [(lvl, title, page) for lvl, title, page in doc.get_toc(simple=True)]
+
+
+def find_headings(path: str, headings: list[tuple[int, str]]) -> list[OutlineEntry]:
+    """Fallback when a PDF has no bookmarks: locate each heading's text,
+    searching forward from the previous hit.  Unfound headings take the
+    previous heading's page."""
+    entries = []
+    page_no = 0
+    with fitz.open(path) as doc:
+        for level, title in headings:
+            for candidate in range(page_no, len(doc)):
+                if doc[candidate].search_for(title):
+                    page_no = candidate
+                    break
+            entries.append((level, title, page_no + 1))
+    return entries
+
+
+def _toc_entries_per_page(first: bool) -> int:
+    usable = _A4_HEIGHT - 2 * _MARGIN_Y - (_TOC_TITLE_HEIGHT if first else 0)
+    return int(usable // _TOC_LINE_HEIGHT)
+
+
+def toc_page_count(entry_count: int) -> int:
+    first = _toc_entries_per_page(True)
+    if entry_count <= first:
+        return 1
+    rest = _toc_entries_per_page(False)
+    return 1 + -(-(entry_count - first) // rest)
+
+
+def _text_width(text: str, fontname: str, size: float) -> float:
+    # The built-in CJK font draws every glyph, Latin included, one em wide
+    return fitz.get_text_length(text, fontname=fontname, fontsize=size)
+
+
+def _fit(text: str, size: float, width: float) -> str:
+    if _text_width(text, _CJK_FONT, size) <= width:
+        return text
+    while text and _text_width(text + "…", _CJK_FONT, size) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def render_toc(entries: list[OutlineEntry], dst: str, title: str = "目  錄") -> None:
+    """Table of contents pages with dot leaders and real page numbers.
+    Produces exactly ``toc_page_count(len(entries))`` pages."""
+    doc = fitz.open()
+    right = _A4_WIDTH - _MARGIN_X
+    dot_width = _text_width(".", _LATIN_FONT, _TOC_ENTRY_SIZE)
+
+    page = doc.new_page(width=_A4_WIDTH, height=_A4_HEIGHT)
+    title_width = _text_width(title, _CJK_FONT, _TOC_TITLE_SIZE)
+    page.insert_text(
+        ((_A4_WIDTH - title_width) / 2, _MARGIN_Y + _TOC_TITLE_SIZE),
+        title, fontname=_CJK_FONT, fontsize=_TOC_TITLE_SIZE,
+    )
+    y = _MARGIN_Y + _TOC_TITLE_HEIGHT
+    remaining = _toc_entries_per_page(True)
+
+    for level, text, page_no in entries:
+        if remaining == 0:
+            page = doc.new_page(width=_A4_WIDTH, height=_A4_HEIGHT)
+            y = _MARGIN_Y
+            remaining = _toc_entries_per_page(False)
+        y += _TOC_LINE_HEIGHT
+        remaining -= 1
+
+        number = str(page_no)
+        number_x = right - _text_width(number, _LATIN_FONT, _TOC_ENTRY_SIZE)
+        x = _MARGIN_X + _TOC_LEVEL_INDENT * (min(level, 3) - 1)
+        text = _fit(text, _TOC_ENTRY_SIZE, number_x - x - 4 * dot_width)
+        leader_x = x + _text_width(text, _CJK_FONT, _TOC_ENTRY_SIZE) + dot_width
+        dots = int((number_x - leader_x) // dot_width) - 1
+        page.insert_text((x, y), text, fontname=_CJK_FONT, fontsize=_TOC_ENTRY_SIZE)
+        if dots > 0:
+            page.insert_text(
+                (leader_x, y), "." * dots, fontname=_LATIN_FONT, fontsize=_TOC_ENTRY_SIZE
+            )
+        page.insert_text((number_x, y), number, fontname=_LATIN_FONT, fontsize=_TOC_ENTRY_SIZE)
+
+    doc.save(dst, garbage=3, deflate=True)
     doc.close()
-    return count
+
+
+def number_pages(path: str, outline: list[OutlineEntry] | None = None) -> None:
+    """Stamp continuous page numbers in the footer, and replace the
+    bookmarks with ``outline`` when given."""
+    doc = fitz.open(path)
+    for i, page in enumerate(doc, start=1):
+        number = str(i)
+        width = _text_width(number, _LATIN_FONT, _PAGE_NUMBER_SIZE)
+        rect = page.rect
+        page.insert_text(
+            ((rect.width - width) / 2, rect.height - _MARGIN_Y / 2),
+            number, fontname=_LATIN_FONT, fontsize=_PAGE_NUMBER_SIZE,
+        )
+    if outline is not None:
+        # Bookmark levels may only step down one at a time
+        toc, previous = [], 0
+        for level, title, page in outline:
+            previous = min(level, previous + 1)
+            toc.append([previous, title, page])
+        doc.set_toc(toc)
+    _save_in_place(doc, path)
@@ -1,20 +1,25 @@
 """
-Project service — CRUD, member management, budget check.
+Project service — CRUD, member management, budget check, progress.
 """
 
 import uuid
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import concurrency
+from app.models.progress import ChapterProgress, ProjectProgress
 from app.models.project import Project, ProjectMember
+from app.models.section import Section
 from app.models.user import User
 from app.schemas.project import (
     BudgetResponse,
+    ChapterProgressResponse,
     ProjectCreate,
     ProjectMemberCreate,
     ProjectMemberResponse,
+    ProjectProgressResponse,
     ProjectResponse,
     ProjectUpdate,
 )
@@ -112,14 +117,37 @@ async def get_projects(
 
 
 async def update_project(
-    project_id: uuid.UUID, data: ProjectUpdate, user: User, db: AsyncSession
+    project_id: uuid.UUID,
+    data: ProjectUpdate,
+    user: User,
+    db: AsyncSession,
+    if_match: str | None = None,
 ) -> ProjectResponse:
+    """Apply the fields set in ``data`` in one ``UPDATE … RETURNING``;
+    with ``if_match``, only while the project is at that row version."""
     await _require_project_role(project_id, user, ["Owner", "Manager"], db)
-    project = await _get_project_or_404(project_id, db)
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(project, field, value)
+    expected = concurrency.expected_version(if_match)
+    stmt = (
+        update(Project)
+        .where(Project.id == project_id)
+        .values(
+            **data.model_dump(exclude_unset=True),
+            row_version=Project.row_version + 1,
+            updated_at=func.now(),
+        )
+        .returning(Project)
+        .execution_options(synchronize_session="fetch")
+    )
+    if expected is not None:
+        stmt = stmt.where(Project.row_version == expected)
+    project = (await db.execute(stmt)).scalar_one_or_none()
+    if project is None:
+        await db.rollback()
+        project = await _get_project_or_404(project_id, db)
+        raise concurrency.conflict(
+            "專案已被其他使用者修改", ProjectResponse.model_validate(project), project.row_version
+        )
     await db.commit()
-    await db.refresh(project)
     return ProjectResponse.model_validate(project)
 
 
@@ -247,3 +275,61 @@ async def get_budget(
         usage_percent=usage_pct,
         alert_threshold=float(project.budget_alert_threshold),
     )
+
+
+# ---------------------------------------------------------------------------
+# Progress
+# ---------------------------------------------------------------------------
+
+_STATUS_COLUMNS = {
+    "NotStarted": "not_started",
+    "Writing": "writing",
+    "Review": "review",
+    "Approved": "approved",
+    "Locked": "locked",
+}
+
+
+async def get_progress(
+    project_id: uuid.UUID, db: AsyncSession
+) -> ProjectProgressResponse:
+    """Dashboard roll-ups read from the trigger-maintained counters: one
+    row per top-level chapter plus one for the project, however many
+    sections, versions and usage logs there are."""
+    await _get_project_or_404(project_id, db)
+    result = await db.execute(
+        select(ChapterProgress, Section.chapter_number, Section.title)
+        .join(Section, Section.id == ChapterProgress.chapter_id)
+        .where(ChapterProgress.project_id == project_id)
+        .order_by(Section.sort_order)
+    )
+    chapters = [
+        ChapterProgressResponse(
+            chapter_id=row.chapter_id,
+            chapter_number=chapter_number,
+            title=title,
+            sections_total=row.sections_total,
+            status_counts={s: getattr(row, c) for s, c in _STATUS_COLUMNS.items()},
+            estimated_pages=row.estimated_pages,
+            content_chars=row.content_chars,
+            tokens_used=row.tokens_used,
+            requirement_links=row.requirement_links,
+        )
+        for row, chapter_number, title in result.all()
+    ]
+    counters = await db.get(ProjectProgress, project_id)
+    total = counters.requirements_total if counters else 0
+    covered = counters.requirements_covered if counters else 0
+    return ProjectProgressResponse(
+        project_id=project_id,
+        sections_total=sum(c.sections_total for c in chapters),
+        status_counts={s: sum(c.status_counts[s] for c in chapters) for s in _STATUS_COLUMNS},
+        estimated_pages=sum(c.estimated_pages for c in chapters),
+        content_chars=sum(c.content_chars for c in chapters),
+        tokens_used=sum(c.tokens_used for c in chapters),
+        requirement_links=sum(c.requirement_links for c in chapters),
+        requirements_total=total,
+        requirements_covered=covered,
+        coverage_percent=round(covered / total * 100, 2) if total > 0 else 0.0,
+        chapters=chapters,
+    )
@@ -2,55 +2,79 @@
 RAG service — chunk documents, build vector index, semantic search.
 """
 
+import asyncio
 import uuid
+from itertools import islice
+from typing import Iterable, Iterator
 
-from sqlalchemy import delete, select, text
+from sqlalchemy import delete, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.document import Document, DocumentEmbedding
 from app.services import embedding_service
+from app.services.parser_service import ParsedRecord
+
+# Chunks embedded and inserted per round trip
+EMBED_BATCH_SIZE = 100
 
 
 # ---------------------------------------------------------------------------
 # Chunking
 # ---------------------------------------------------------------------------
 
-def chunk_document(
-    content: str,
+def iter_chunks(
+    paragraphs: Iterable[tuple[int | None, str]],
     chunk_size: int = 500,
     overlap: int = 50,
-) -> list[str]:
-    if not content:
-        return []
+) -> Iterator[tuple[int | None, str]]:
+    """Streaming chunker over ``(page, text)`` pairs.
 
-    # Split by paragraphs first, then merge into chunks
-    paragraphs = [p.strip() for p in content.split("\n") if p.strip()]
-
-    chunks: list[str] = []
+    Yields ``(page, chunk)`` as soon as each chunk is full; a chunk never
+    spans two pages so every chunk can cite its source page.
+    """
     current: list[str] = []
     current_len = 0
+    current_page: int | None = None
 
-    for para in paragraphs:
-        para_len = len(para)
-        if current_len + para_len > chunk_size and current:
-            chunks.append("\n".join(current))
-            # Keep overlap: take last few paragraphs
-            overlap_text = "\n".join(current)
-            if len(overlap_text) > overlap:
-                # Start next chunk with tail of current
-                tail = overlap_text[-overlap:]
-                current = [tail]
-                current_len = len(tail)
-            else:
+    for page, block in paragraphs:
+        for para in block.split("\n"):
+            para = para.strip()
+            if not para:
+                continue
+            if page != current_page and current:
+                yield current_page, "\n".join(current)
                 current = []
                 current_len = 0
-        current.append(para)
-        current_len += para_len
+            current_page = page
+
+            para_len = len(para)
+            if current_len + para_len > chunk_size and current:
+                yield current_page, "\n".join(current)
+                # Keep overlap: take last few paragraphs
+                overlap_text = "\n".join(current)
+                if len(overlap_text) > overlap:
+                    # Start next chunk with tail of current
+                    tail = overlap_text[-overlap:]
+                    current = [tail]
+                    current_len = len(tail)
+                else:
+                    current = []
+                    current_len = 0
+            current.append(para)
+            current_len += para_len
 
     if current:
-        chunks.append("\n".join(current))
+        yield current_page, "\n".join(current)
+
 
-    return chunks
+def chunk_document(
+    content: str,
+    chunk_size: int = 500,
+    overlap: int = 50,
+) -> list[str]:
+    if not content:
+        return []
+    return [c for _, c in iter_chunks([(None, content)], chunk_size, overlap)]
 
 
 # ---------------------------------------------------------------------------
@@ -65,6 +89,64 @@ async def index_document(
     chunk_size: int = 500,
     overlap: int = 50,
 ) -> int:
+    return await _index_chunks(
+        document_id,
+        iter_chunks([(None, content)], chunk_size, overlap),
+        source_type,
+        db,
+    )
+
+
+async def index_pages(
+    document_id: uuid.UUID,
+    pages: list[str],
+    source_type: str,
+    db: AsyncSession,
+    chunk_size: int = 500,
+    overlap: int = 50,
+) -> int:
+    """Index page by page so every chunk can cite the page it came from."""
+    return await _index_chunks(
+        document_id,
+        iter_chunks(enumerate(pages, start=1), chunk_size, overlap),
+        source_type,
+        db,
+    )
+
+
+async def index_records(
+    document_id: uuid.UUID,
+    records: Iterable[ParsedRecord],
+    source_type: str,
+    db: AsyncSession,
+    chunk_size: int = 500,
+    overlap: int = 50,
+) -> int:
+    """Index a parser record stream without materializing the document."""
+    return await _index_chunks(
+        document_id,
+        iter_chunks(((r.page, r.text) for r in records), chunk_size, overlap),
+        source_type,
+        db,
+    )
+
+
+def _take(it: Iterator, n: int) -> list:
+    return list(islice(it, n))
+
+
+async def _index_chunks(
+    document_id: uuid.UUID,
+    chunks: Iterator[tuple[int | None, str]],
+    source_type: str,
+    db: AsyncSession,
+) -> int:
+    """Embed and insert chunks one batch at a time.
+
+    Parsing happens lazily inside ``chunks``; batches are pulled in a worker
+    thread so a large spreadsheet does not stall the event loop, and rows go
+    in through a Core insert so the session never accumulates ORM objects.
+    """
     # Remove old embeddings for this document
     await db.execute(
         delete(DocumentEmbedding).where(
@@ -74,27 +156,33 @@ async def index_document(
     )
     await db.flush()
 
-    chunks = chunk_document(content, chunk_size, overlap)
-    if not chunks:
-        return 0
-
-    # Generate embeddings
-    embeddings = await embedding_service.embed_chunks(chunks)
-
-    # Insert into document_embeddings
-    for i, (chunk_text, emb_vector) in enumerate(zip(chunks, embeddings)):
-        entry = DocumentEmbedding(
-            source_type=source_type,
-            source_id=document_id,
-            chunk_index=i,
-            chunk_text=chunk_text,
-            embedding=emb_vector,
-            metadata_={"token_count": len(chunk_text)},
-        )
-        db.add(entry)
+    total = 0
+    while True:
+        batch = await asyncio.to_thread(_take, chunks, EMBED_BATCH_SIZE)
+        if not batch:
+            break
+
+        # Generate embeddings
+        embeddings = await embedding_service.embed_chunks([c for _, c in batch])
+
+        rows = []
+        for (page_no, chunk_text), emb_vector in zip(batch, embeddings):
+            metadata = {"token_count": len(chunk_text)}
+            if page_no is not None:
+                metadata["page"] = page_no
+            rows.append({
+                "source_type": source_type,
+                "source_id": document_id,
+                "chunk_index": total,
+                "chunk_text": chunk_text,
+                "embedding": emb_vector,
+                "metadata_": metadata,
+            })
+            total += 1
+        await db.execute(insert(DocumentEmbedding), rows)
 
     await db.commit()
-    return len(chunks)
+    return total
 
 
 # ---------------------------------------------------------------------------
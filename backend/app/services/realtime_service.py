@@ -0,0 +1,267 @@
+"""
+Realtime service — project event channels over Redis pub/sub and WebSockets.
+
+Services ``publish`` events (lock acquired/released/expired, version
+created, status changed, …) to ``project-events:<project_id>``.  Each app
+instance keeps a single pattern subscription and fans messages out to the
+WebSockets connected to it, so any number of editors costs one Redis
+connection per instance.
+
+A socket first receives a ``snapshot`` of the project's live locks, then
+events as they happen.  Clients send ``{"type": "heartbeat", "section_id":
+…}`` every few seconds while editing to keep their lock alive; a client
+that falls too far behind is sent a fresh snapshot instead of the backlog.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator
+
+from fastapi import WebSocket, WebSocketDisconnect
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.security import decode_token
+from app.db.session import async_session_factory
+from app.models.project import ProjectMember
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_CHANNEL_PREFIX = "project-events:"
+_QUEUE_SIZE = 256
+_RECONNECT_DELAY_SECONDS = 2
+
+# Close codes in the 4000 range are application-defined
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+
+_redis: Redis | None = None
+
+
+def get_redis() -> Redis:
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+            health_check_interval=30,
+        )
+    return _redis
+
+
+async def publish(project_id: uuid.UUID, event_type: str, **data) -> None:
+    """Send an event to everyone watching the project.  Best effort: a
+    Redis outage must not fail the write that triggered it."""
+    payload = json.dumps(
+        {
+            "type": event_type,
+            "project_id": str(project_id),
+            "at": datetime.now(timezone.utc).isoformat(),
+            **data,
+        },
+        ensure_ascii=False,
+        default=str,
+    )
+    try:
+        await get_redis().publish(f"{_CHANNEL_PREFIX}{project_id}", payload)
+    except RedisError as e:
+        logger.warning(f"Realtime publish {event_type} failed: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Fan-out hub
+# ---------------------------------------------------------------------------
+
+class _Hub:
+    """One pattern subscription per process, fanned out to local queues.
+
+    ``None`` on a queue means the subscriber missed events and should
+    resynchronize.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+        self._task: asyncio.Task | None = None
+
+    def _deliver(self, project_id: str, message: str | None) -> None:
+        for queue in self._subscribers.get(project_id, ()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too slow to keep up — drop the backlog, ask for a resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{_CHANNEL_PREFIX}*")
+                # Events may have been missed while disconnected
+                for project_id in list(self._subscribers):
+                    self._deliver(project_id, None)
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    project_id = message["channel"][len(_CHANNEL_PREFIX):]
+                    self._deliver(project_id, message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Realtime subscription lost, reconnecting: {e}")
+                await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    @asynccontextmanager
+    async def subscribe(self, project_id: uuid.UUID) -> AsyncIterator[asyncio.Queue]:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        key = str(project_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        self._subscribers[key].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[key].discard(queue)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_hub = _Hub()
+
+
+async def shutdown() -> None:
+    global _redis
+    await _hub.stop()
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+# ---------------------------------------------------------------------------
+# WebSocket sessions
+# ---------------------------------------------------------------------------
+
+async def authenticate(token: str) -> User | None:
+    """Resolve an access token passed as a query parameter — browsers
+    cannot set headers on a WebSocket handshake."""
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access":
+        return None
+    async with async_session_factory() as db:
+        result = await db.execute(select(User).where(User.id == payload.get("sub")))
+        user = result.scalar_one_or_none()
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+async def can_watch(project_id: uuid.UUID, user: User) -> bool:
+    """Admins see every project; others only those they are members of."""
+    if user.role == "Admin":
+        return True
+    async with async_session_factory() as db:
+        result = await db.execute(
+            select(ProjectMember.project_id).where(
+                ProjectMember.project_id == project_id,
+                ProjectMember.user_id == user.id,
+            )
+        )
+        return result.first() is not None
+
+
+async def _snapshot(project_id: uuid.UUID) -> str:
+    from app.services import lock_service
+
+    locks = await lock_service.project_locks(project_id)
+    return json.dumps({
+        "type": "snapshot",
+        "project_id": str(project_id),
+        "locks": [lock.to_event() for lock in locks],
+    }, ensure_ascii=False)
+
+
+async def _handle(websocket: WebSocket, user: User, message: dict) -> None:
+    from app.services import lock_service
+
+    kind = message.get("type")
+    if kind == "heartbeat":
+        try:
+            section_id = uuid.UUID(str(message.get("section_id")))
+        except ValueError:
+            return
+        try:
+            expires_at = await lock_service.renew(section_id, user.id)
+        except RedisError as e:
+            # Reported as lost: the editor re-locks through the API, which
+            # falls back to the DB while Redis is down
+            logger.warning(f"Lock heartbeat for {section_id} failed: {e}")
+            expires_at = None
+        await websocket.send_json({
+            "type": "heartbeat_ack" if expires_at else "lock_lost",
+            "section_id": str(section_id),
+            "expires_at": expires_at.isoformat() if expires_at else None,
+        })
+    elif kind == "ping":
+        await websocket.send_json({"type": "pong"})
+
+
+async def serve(websocket: WebSocket, project_id: uuid.UUID, user: User) -> None:
+    """Run an accepted project socket until the client goes away.
+
+    Locks are not released on disconnect — a reconnecting editor keeps its
+    lock as long as it resumes heartbeats before the TTL runs out.
+    """
+    async with _hub.subscribe(project_id) as queue:
+        # Subscribed before the snapshot, so nothing falls in between
+        await websocket.send_text(await _snapshot(project_id))
+
+        async def forward() -> None:
+            while True:
+                message = await queue.get()
+                await websocket.send_text(
+                    message if message is not None else await _snapshot(project_id)
+                )
+
+        async def receive() -> None:
+            while True:
+                try:
+                    message = await websocket.receive_json()
+                except ValueError:
+                    await websocket.send_json({"type": "error", "message": "invalid JSON"})
+                    continue
+                if not isinstance(message, dict):
+                    await websocket.send_json({"type": "error", "message": "expected an object"})
+                    continue
+                await _handle(websocket, user, message)
+
+        tasks = [asyncio.create_task(forward()), asyncio.create_task(receive())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is not None and not isinstance(error, WebSocketDisconnect):
+                    logger.warning(f"Project socket {project_id} closed: {error}")
+        finally:
+            for task in tasks:
+                task.cancel()
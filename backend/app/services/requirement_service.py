@@ -13,7 +13,7 @@ from app.models.requirement import ProjectRequirement, SectionRequirementLink
 from app.models.section import Section
 from app.models.user import User
 from app.schemas.requirement import ExtractedRequirement
-from app.services import document_service, parser_service
+from app.services import document_service, page_store, parser_service
 from app.services import requirement_analyzer_service
 
 logger = logging.getLogger(__name__)
@@ -38,8 +38,11 @@ async def analyze_and_save(
     if doc is None:
         raise ValueError("文件不存在")
 
-    # 2. Get parsed text (prefer cached; otherwise download + parse)
-    if doc.content_text and doc.is_parsed:
+    # 2. Get parsed text (prefer the page store; otherwise download + parse)
+    paged = await page_store.PagedDocument.open(doc) if doc.is_parsed else None
+    if paged is not None:
+        text = await paged.text()
+    elif doc.content_text and doc.is_parsed:
         text = doc.content_text
     else:
         data, _, file_type = await document_service.download_document(
@@ -72,6 +75,13 @@ async def analyze_and_save(
         await requirement_analyzer_service.analyze_document(text, existing_sections)
     )
 
+    # 4b. Cite source pages the model did not fill in
+    if paged is not None and paged.page_count > 1:
+        missing = [r for r in requirements if r.source_page is None and r.source_text]
+        pages = await paged.locate([r.source_text for r in missing])
+        for req, page_no in zip(missing, pages):
+            req.source_page = page_no
+
     # 5. Persist requirements
     saved: list[ProjectRequirement] = []
     for req in requirements:
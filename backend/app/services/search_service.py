@@ -0,0 +1,151 @@
+"""
+Search service — full-text search over current section content.
+
+Every materialized version carries ``search_vector`` (init_db.sql), a
+tsvector of CJK bigrams and lowercase ASCII words; queries are tokenized
+here by the same rules.  A CJK phrase must appear verbatim (its bigrams
+chained with ``<->``), query words must all match, and a single CJK
+character matches any bigram it starts.  Only each section's current
+version is searched, across every project the user is a member of.
+"""
+
+import re
+import uuid
+
+from sqlalchemy import cast, func, literal, select
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.project import Project, ProjectMember
+from app.models.section import Section, SectionVersion
+from app.models.user import User
+from app.schemas.section import SectionSearchHit, SectionSearchPage
+from app.services.version_diff import CJK
+
+_RUN = re.compile(rf"[{CJK}]+|[a-z0-9]+")
+
+# Characters of context kept around the first match
+_SNIPPET_CHARS = 160
+
+
+# ---------------------------------------------------------------------------
+# Query parsing
+# ---------------------------------------------------------------------------
+
+def query_runs(query: str) -> list[str]:
+    """CJK runs and ASCII words of a query, lowercased."""
+    return _RUN.findall(query.lower())
+
+
+def to_tsquery(runs: list[str]) -> str:
+    """tsquery text for ``runs``; terms only hold CJK or [a-z0-9], so
+    they need no escaping."""
+    parts = []
+    for run in runs:
+        if run[0].isascii():
+            parts.append(f"'{run}'")
+        elif len(run) == 1:
+            parts.append(f"'{run}':*")
+        else:
+            bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+            parts.append("(" + " <-> ".join(f"'{b}'" for b in bigrams) + ")")
+    return " & ".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Highlighting
+# ---------------------------------------------------------------------------
+
+def _pattern(runs: list[str]) -> re.Pattern:
+    alternatives = []
+    for run in sorted(set(runs), key=len, reverse=True):
+        if run[0].isascii():
+            # Whole words only, as indexed
+            alternatives.append(rf"(?<![a-z0-9]){re.escape(run)}(?![a-z0-9])")
+        else:
+            alternatives.append(re.escape(run))
+    return re.compile("|".join(alternatives), re.I)
+
+
+def highlight(content: str, pattern: re.Pattern) -> tuple[str, list[tuple[int, int]]]:
+    """Snippet of ``content`` around its first match, and the match
+    offsets within the snippet."""
+    first = pattern.search(content)
+    start = 0 if first is None else max(0, first.start() - _SNIPPET_CHARS // 4)
+    end = min(len(content), start + _SNIPPET_CHARS)
+    snippet = content[start:end]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(content) else ""
+    offsets = [
+        (m.start() + len(prefix), m.end() + len(prefix)) for m in pattern.finditer(snippet)
+    ]
+    return prefix + snippet + suffix, offsets
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+async def search_sections(
+    query: str,
+    user: User,
+    db: AsyncSession,
+    project_id: uuid.UUID | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> SectionSearchPage:
+    runs = query_runs(query)
+    if not runs:
+        return SectionSearchPage(query=query, items=[], total=0)
+
+    tsquery = cast(literal(to_tsquery(runs)), TSQUERY)
+    conditions = [SectionVersion.search_vector.bool_op("@@")(tsquery)]
+    if project_id is not None:
+        conditions.append(Section.project_id == project_id)
+    if user.role != "Admin":
+        conditions.append(Section.project_id.in_(
+            select(ProjectMember.project_id).where(ProjectMember.user_id == user.id)
+        ))
+
+    matches = (
+        select(Section.id)
+        .join(SectionVersion, SectionVersion.id == Section.current_version_id)
+        .where(*conditions)
+    )
+    total = (await db.execute(
+        select(func.count()).select_from(matches.subquery())
+    )).scalar_one()
+    if total == 0 or offset >= total:
+        return SectionSearchPage(query=query, items=[], total=total)
+
+    rank = func.ts_rank_cd(SectionVersion.search_vector, tsquery)
+    result = await db.execute(
+        select(
+            Section.id, Section.project_id, Project.name, Section.chapter_number,
+            Section.title, SectionVersion.id, SectionVersion.content, rank,
+        )
+        .join(SectionVersion, SectionVersion.id == Section.current_version_id)
+        .join(Project, Project.id == Section.project_id)
+        .where(*conditions)
+        .order_by(rank.desc(), Section.updated_at.desc(), Section.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+    pattern = _pattern(runs)
+    items = []
+    for (section_id, pid, project_name, chapter_number, title,
+         version_id, content, score) in result.all():
+        snippet, highlights = highlight(content or "", pattern)
+        items.append(SectionSearchHit(
+            section_id=section_id,
+            project_id=pid,
+            project_name=project_name,
+            chapter_number=chapter_number,
+            title=title,
+            version_id=version_id,
+            rank=score,
+            snippet=snippet,
+            highlights=highlights,
+        ))
+    return SectionSearchPage(query=query, items=items, total=total)
@@ -2,27 +2,56 @@
 Section service — CRUD, tree query, locking, version management.
 """
 
+import asyncio
+import logging
 import uuid
 from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import AsyncIterator
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from sqlalchemy import Boolean, and_, case, cast, column, func, or_, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
+from app.core import concurrency
 from app.core.config import settings
 from app.models.section import Section, SectionVersion
 from app.models.user import User
 from app.schemas.section import (
+    PageBudgetResponse,
     ReorderRequest,
+    SectionBulkRequest,
     SectionCreate,
     SectionLockResponse,
+    SectionPageBudget,
     SectionResponse,
     SectionTree,
     SectionUpdate,
     SectionVersionCreate,
+    SectionVersionPage,
     SectionVersionResponse,
+    SectionVersionSummary,
     SetCurrentVersionRequest,
+    VersionDiffOp,
+    VersionDiffResponse,
+    VersionMergeChunk,
+    VersionMergeRequest,
+    VersionMergeResponse,
 )
+from app.services import (
+    layout_estimator,
+    lock_service,
+    realtime_service,
+    tree_cache,
+    version_diff,
+    version_store,
+)
+from app.services.docx_builder import DEFAULT_STYLES
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -39,12 +68,35 @@ async def _get_section_or_404(
     return section
 
 
+def layout_metadata(section: Section, content: str) -> dict:
+    """Version metadata with the section's estimated page span, computed
+    with the default export styles."""
+    span = layout_estimator.estimate_section(
+        content,
+        DEFAULT_STYLES,
+        title=f"{section.chapter_number} {section.title}",
+        level=section.depth_level + 1,
+    )
+    return {"layout": {"pages": span.pages, "chars": len(content)}}
+
+
 def _is_lock_active(section: Section) -> bool:
     if section.locked_by is None or section.lock_expires_at is None:
         return False
     return section.lock_expires_at > datetime.now(timezone.utc)
 
 
+async def _lock_holder(section: Section) -> uuid.UUID | None:
+    """Who holds the section's edit lock — from Redis, or from the DB
+    columns while Redis is unavailable."""
+    try:
+        lock = await lock_service.holder(section.id)
+        return lock.user_id if lock else None
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, checking lock of {section.id} in the DB: {e}")
+    return section.locked_by if _is_lock_active(section) else None
+
+
 # ---------------------------------------------------------------------------
 # Section CRUD
 # ---------------------------------------------------------------------------
@@ -66,8 +118,12 @@ async def create_section(
         docx_template_tag=data.docx_template_tag,
     )
     db.add(section)
+    await db.flush()
+    await refresh_paths(section.project_id, db)
     await db.commit()
     await db.refresh(section)
+    await tree_cache.invalidate(section.project_id)
+    await realtime_service.publish(section.project_id, "section_created", section_id=section.id)
     return SectionResponse.model_validate(section)
 
 
@@ -81,6 +137,7 @@ async def get_section(
 async def get_sections_tree(
     project_id: uuid.UUID, db: AsyncSession
 ) -> list[SectionTree]:
+    """Build the project's section tree from the database."""
     result = await db.execute(
         select(Section)
         .where(Section.project_id == project_id)
@@ -103,19 +160,117 @@ async def get_sections_tree(
     return roots
 
 
-async def update_section(
-    section_id: uuid.UUID, data: SectionUpdate, user: User, db: AsyncSession
-) -> SectionResponse:
-    section = await _get_section_or_404(section_id, db)
+_tree_json = TypeAdapter(list[SectionTree])
+
+
+async def get_sections_tree_json(
+    project_id: uuid.UUID, db: AsyncSession, if_none_match: str | None = None
+) -> tuple[str, bytes | None]:
+    """``(etag, body)`` of the project's serialized section tree, served
+    from ``tree_cache`` when possible.  The body is None when
+    ``if_none_match`` already names the current tree."""
+    generation = await tree_cache.generation(project_id)
+    if generation is not None:
+        cached = await tree_cache.load(project_id, generation, if_none_match)
+        if cached is not None:
+            return cached
+
+    body = _tree_json.dump_json(await get_sections_tree(project_id, db))
+    etag = tree_cache.etag_for(body)
+    if generation is not None:
+        await tree_cache.store(project_id, generation, body, etag)
+    if tree_cache.etag_matches(if_none_match, etag):
+        return etag, None
+    return etag, body
 
-    # If locked by someone else, reject
-    if _is_lock_active(section) and section.locked_by != user.id:
-        raise HTTPException(status.HTTP_423_LOCKED, "章節已被其他使用者鎖定")
 
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(section, field, value)
+async def update_section(
+    section_id: uuid.UUID,
+    data: SectionUpdate,
+    user: User,
+    db: AsyncSession,
+    if_match: str | None = None,
+) -> SectionResponse:
+    """Apply the fields set in ``data`` in one ``UPDATE … RETURNING``.
+
+    With ``if_match`` the update only applies while the section is still
+    at that row version; a concurrent edit makes it 409.  The previous
+    status comes from a locking CTE, for the status_changed event.
+
+    A changed ``sort_order`` moves the section, so the project is
+    renumbered as for ``reorder_sections``.  A ``chapter_number`` or
+    ``depth_level`` the user changed is a manual override and survives
+    the renumbering.
+    """
+    expected = concurrency.expected_version(if_match)
+    conditions = []
+    db_lock = False
+    try:
+        lock = await lock_service.holder(section_id)
+        if lock is not None and lock.user_id != user.id:
+            raise HTTPException(status.HTTP_423_LOCKED, "章節已被其他使用者鎖定")
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, checking lock of {section_id} in the DB: {e}")
+        db_lock = True
+        conditions.append(_lock_available(user.id, datetime.now(timezone.utc)))
+    if expected is not None:
+        conditions.append(Section.row_version == expected)
+
+    old = (
+        select(
+            Section.id, Section.status, Section.sort_order,
+            Section.chapter_number, Section.depth_level,
+        )
+        .where(Section.id == section_id)
+        .with_for_update()
+        .cte("old")
+    )
+    stmt = (
+        update(Section)
+        .where(Section.id == old.c.id, *conditions)
+        .values(
+            **data.model_dump(exclude_unset=True),
+            row_version=Section.row_version + 1,
+            updated_at=func.now(),
+        )
+        .returning(Section, old.c.status, old.c.sort_order, old.c.chapter_number, old.c.depth_level)
+        .execution_options(synchronize_session="fetch")
+    )
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
+        # Missing, locked in the DB, or changed since the client read it
+        await db.rollback()
+        section = await _get_section_or_404(section_id, db)
+        if db_lock and _is_lock_active(section) and section.locked_by != user.id:
+            raise HTTPException(status.HTTP_423_LOCKED, "章節已被其他使用者鎖定")
+        raise concurrency.conflict(
+            "章節已被其他使用者修改", SectionResponse.model_validate(section), section.row_version
+        )
+    section, old_status, old_sort_order, old_chapter_number, old_depth_level = row
+    moved = section.sort_order != old_sort_order
+    if moved:
+        overrides = {
+            field: getattr(section, field)
+            for field, previous in (
+                ("chapter_number", old_chapter_number),
+                ("depth_level", old_depth_level),
+            )
+            if getattr(section, field) != previous
+        }
+        [section] = await _renumber([section], db)
+        for field, value in overrides.items():
+            setattr(section, field, value)
     await db.commit()
-    await db.refresh(section)
+    await tree_cache.invalidate(section.project_id)
+    if moved:
+        await realtime_service.publish(section.project_id, "sections_reordered")
+    if section.status != old_status:
+        await realtime_service.publish(
+            section.project_id, "status_changed",
+            section_id=section.id, status=section.status, previous_status=old_status,
+        )
+    else:
+        await realtime_service.publish(section.project_id, "section_updated", section_id=section.id)
     return SectionResponse.model_validate(section)
 
 
@@ -123,46 +278,294 @@ async def delete_section(
     section_id: uuid.UUID, user: User, db: AsyncSession
 ) -> None:
     section = await _get_section_or_404(section_id, db)
-    if _is_lock_active(section) and section.locked_by != user.id:
+    holder = await _lock_holder(section)
+    if holder is not None and holder != user.id:
         raise HTTPException(status.HTTP_423_LOCKED, "章節已被其他使用者鎖定")
+    project_id = section.project_id
     await db.delete(section)
     await db.commit()
+    await tree_cache.invalidate(project_id)
+    if holder is not None:
+        try:
+            await lock_service.release(section_id, user.id)
+        except RedisError:
+            pass  # expires on its own
+    await realtime_service.publish(project_id, "section_deleted", section_id=section_id)
 
 
 async def reorder_sections(
     data: ReorderRequest, db: AsyncSession
 ) -> list[SectionResponse]:
-    results = []
-    for item in data.items:
-        section = await _get_section_or_404(item.id, db)
-        section.sort_order = item.sort_order
-        results.append(section)
+    results = await _bulk_update(
+        [{"id": item.id, "sort_order": item.sort_order} for item in data.items], db
+    )
+    results = await _renumber(results, db)
     await db.commit()
-    for s in results:
-        await db.refresh(s)
+    for project_id in {s.project_id for s in results}:
+        await tree_cache.invalidate(project_id)
+        await realtime_service.publish(project_id, "sections_reordered")
     return [SectionResponse.model_validate(s) for s in results]
 
 
+# ---------------------------------------------------------------------------
+# Hierarchy
+# ---------------------------------------------------------------------------
+
+async def refresh_paths(
+    project_id: uuid.UUID, db: AsyncSession, renumber: bool = False
+) -> int:
+    """Bring ``Section.path`` up to date after sections were added or moved;
+    with ``renumber`` also ``chapter_number`` and ``depth_level``.  Runs in
+    the caller's transaction; returns how many rows changed."""
+    result = await db.execute(select(func.refresh_section_paths(project_id, renumber)))
+    return result.scalar_one()
+
+
+async def _renumber(sections: list[Section], db: AsyncSession) -> list[Section]:
+    """Renumber the projects of moved ``sections``; returns them reloaded
+    if any number changed."""
+    changed = 0
+    for project_id in {s.project_id for s in sections}:
+        changed += await refresh_paths(project_id, db, renumber=True)
+    if not changed:
+        return sections
+    result = await db.execute(
+        select(Section)
+        .where(Section.id.in_([s.id for s in sections]))
+        .order_by(Section.sort_order)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+def in_subtree(root: Section):
+    """``root`` and its descendants, as one range scan on
+    ``(project_id, path)``: descendant paths continue with ".", and "/" is
+    the next character."""
+    return and_(
+        Section.project_id == root.project_id,
+        Section.path >= root.path,
+        Section.path < root.path + "/",
+    )
+
+
+async def get_subtree(
+    section_id: uuid.UUID, db: AsyncSession
+) -> list[SectionResponse]:
+    """A section and everything below it, in document order."""
+    root = await _get_section_or_404(section_id, db)
+    result = await db.execute(
+        select(Section).where(in_subtree(root)).order_by(Section.sort_order)
+    )
+    return [SectionResponse.model_validate(s) for s in result.scalars().all()]
+
+
+async def get_ancestors(
+    section_id: uuid.UUID, db: AsyncSession
+) -> list[SectionResponse]:
+    """The chapters containing a section, outermost first."""
+    section = await _get_section_or_404(section_id, db)
+    ids = [uuid.UUID(hex=h) for h in (section.path or "").split(".")[:-1]]
+    if not ids:
+        return []
+    result = await db.execute(select(Section).where(Section.id.in_(ids)))
+    by_id = {s.id: s for s in result.scalars().all()}
+    return [SectionResponse.model_validate(by_id[i]) for i in ids if i in by_id]
+
+
+# ---------------------------------------------------------------------------
+# Bulk operations
+# ---------------------------------------------------------------------------
+
+# Columns a bulk request may set; only these may be set to null
+_BULK_FIELDS = ("sort_order", "parent_id", "depth_level", "status", "assigned_to")
+_NULLABLE_BULK_FIELDS = {"parent_id", "assigned_to"}
+
+
+async def _bulk_update(
+    items: list[dict], db: AsyncSession, project_id: uuid.UUID | None = None
+) -> list[Section]:
+    """Apply per-section changes as one ``UPDATE … FROM (VALUES …)``.
+
+    Each item holds ``id`` and the columns to set; a column an item leaves
+    out keeps that section's value.  Returns the updated rows, uncommitted.
+    Rolls back with 404 if any id is unknown (or outside ``project_id``).
+    """
+    merged: dict[uuid.UUID, dict] = {}
+    for item in items:
+        merged.setdefault(item["id"], {}).update(item)
+    if not merged:
+        return []
+    fields = [f for f in _BULK_FIELDS if any(f in item for item in merged.values())]
+    if not fields:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, "未指定要更新的欄位")
+
+    # A value column plus a "was sent" flag per field
+    columns = [column("id", Section.id.type)]
+    for field in fields:
+        columns += [column(field, getattr(Section, field).type), column(f"set_{field}", Boolean)]
+    rows = [
+        (section_id, *chain.from_iterable((item.get(field), field in item) for field in fields))
+        for section_id, item in merged.items()
+    ]
+    v = values(*columns, name="v").data(rows)
+
+    stmt = (
+        update(Section)
+        .where(Section.id == v.c.id)
+        .values({
+            # Cast: an all-null VALUES column would otherwise be text
+            field: case(
+                (v.c[f"set_{field}"], cast(v.c[field], getattr(Section, field).type)),
+                else_=getattr(Section, field),
+            )
+            for field in fields
+        } | {"row_version": Section.row_version + 1})
+        .returning(Section)
+        .execution_options(synchronize_session="fetch")
+    )
+    if project_id is not None:
+        stmt = stmt.where(Section.project_id == project_id)
+    sections = list((await db.execute(stmt)).scalars().all())
+    if len(sections) != len(merged):
+        await db.rollback()
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "章節不存在")
+    return sections
+
+
+def _has_cycle(parents: dict[uuid.UUID, uuid.UUID | None]) -> bool:
+    acyclic: set[uuid.UUID] = set()
+    for start in parents:
+        path: set[uuid.UUID] = set()
+        node = start
+        while node is not None and node not in acyclic:
+            if node in path:
+                return True
+            path.add(node)
+            node = parents.get(node)
+        acyclic |= path
+    return False
+
+
+async def _any_locked_by_others(
+    section_ids: set[uuid.UUID], project_id: uuid.UUID, user: User, db: AsyncSession
+) -> bool:
+    """Whether another user holds the edit lock of any of ``section_ids`` —
+    from Redis, or from the DB columns while Redis is unavailable."""
+    try:
+        locks = await lock_service.project_locks(project_id)
+        return any(lock.section_id in section_ids and lock.user_id != user.id for lock in locks)
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, checking locks of project {project_id} in the DB: {e}")
+    result = await db.execute(
+        select(Section.id).where(
+            Section.id.in_(section_ids),
+            ~_lock_available(user.id, datetime.now(timezone.utc)),
+        ).limit(1)
+    )
+    return result.first() is not None
+
+
+async def bulk_update_sections(
+    data: SectionBulkRequest, user: User, db: AsyncSession
+) -> list[SectionResponse]:
+    """Reorder, reparent, restatus and reassign many sections of one
+    project in a single statement.  Like ``update_section``, refused with
+    423 if someone else holds the lock of any section it changes."""
+    if await _any_locked_by_others({item.id for item in data.items}, data.project_id, user, db):
+        raise HTTPException(status.HTTP_423_LOCKED, "章節已被其他使用者鎖定")
+    items = []
+    for item in data.items:
+        changes = {"id": item.id}
+        for field in item.model_fields_set & set(_BULK_FIELDS):
+            value = getattr(item, field)
+            if value is not None or field in _NULLABLE_BULK_FIELDS:
+                changes[field] = value
+        items.append(changes)
+
+    if any("parent_id" in item for item in items):
+        # Parents must be in the project and the outline must stay a tree
+        result = await db.execute(
+            select(Section.id, Section.parent_id).where(Section.project_id == data.project_id)
+        )
+        parents = dict(result.all())
+        for item in items:
+            if "parent_id" in item:
+                parent_id = item["parent_id"]
+                if item["id"] not in parents or (parent_id is not None and parent_id not in parents):
+                    raise HTTPException(status.HTTP_404_NOT_FOUND, "章節不存在")
+                parents[item["id"]] = parent_id
+        if _has_cycle(parents):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "章節不可移至自身或其子章節之下")
+
+    sections = await _bulk_update(items, db, project_id=data.project_id)
+    if any("parent_id" in item or "sort_order" in item for item in items):
+        sections = await _renumber(sections, db)
+    await db.commit()
+    if sections:
+        await tree_cache.invalidate(data.project_id)
+        await realtime_service.publish(
+            data.project_id, "sections_updated", section_ids=[s.id for s in sections]
+        )
+    return [SectionResponse.model_validate(s) for s in sections]
+
+
 # ---------------------------------------------------------------------------
 # Locking
 # ---------------------------------------------------------------------------
 
+def _lock_available(user_id: uuid.UUID, now: datetime):
+    """Lock columns free, expired, or already held by ``user_id``."""
+    return or_(
+        Section.locked_by.is_(None),
+        Section.locked_by == user_id,
+        Section.lock_expires_at.is_(None),
+        Section.lock_expires_at <= now,
+    )
+
+
 async def acquire_lock(
     section_id: uuid.UUID, user: User, db: AsyncSession
 ) -> SectionLockResponse:
+    """Take the section's edit lock (or renew your own).
+
+    The lock lives in Redis with a TTL kept alive by WebSocket heartbeats;
+    clients without the socket renew it by calling this again within
+    ``SECTION_LOCK_TTL_SECONDS``.  The DB columns record the holder for
+    listings.  While Redis is down,
+    the DB columns are the lock: a single conditional UPDATE takes it only
+    if it is free, so two requests can never both win.
+    """
     section = await _get_section_or_404(section_id, db)
 
-    if _is_lock_active(section) and section.locked_by != user.id:
+    stmt = update(Section).where(Section.id == section.id)
+    try:
+        lock = await lock_service.acquire(
+            section.id, section.project_id, user.id, user.full_name
+        )
+        locked_at, expires_at = lock.locked_at, lock.expires_at
+    except lock_service.LockHeld:
         raise HTTPException(status.HTTP_423_LOCKED, "章節已被其他使用者鎖定")
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, locking {section_id} in the DB: {e}")
+        locked_at = datetime.now(timezone.utc)
+        expires_at = locked_at + timedelta(minutes=settings.SECTION_LOCK_TIMEOUT_MINUTES)
+        stmt = stmt.where(_lock_available(user.id, locked_at))
 
-    now = datetime.now(timezone.utc)
-    section.locked_by = user.id
-    section.locked_at = now
-    section.lock_expires_at = now + timedelta(
-        minutes=settings.SECTION_LOCK_TIMEOUT_MINUTES
+    result = await db.execute(
+        stmt.values(locked_by=user.id, locked_at=locked_at, lock_expires_at=expires_at)
+        .returning(Section.id)
     )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status.HTTP_423_LOCKED, "章節已被其他使用者鎖定")
     await db.commit()
     await db.refresh(section)
+    await tree_cache.invalidate(section.project_id)
+    await realtime_service.publish(
+        section.project_id, "lock_acquired",
+        section_id=section.id, user_id=user.id, user_name=user.full_name,
+        locked_at=locked_at.isoformat(), expires_at=expires_at.isoformat(),
+    )
     return SectionLockResponse(
         section_id=section.id,
         locked_by=section.locked_by,
@@ -176,16 +579,33 @@ async def release_lock(
     section_id: uuid.UUID, user: User, db: AsyncSession
 ) -> SectionLockResponse:
     section = await _get_section_or_404(section_id, db)
-
-    if _is_lock_active(section) and section.locked_by != user.id:
+    previous = section.locked_by
+
+    stmt = update(Section).where(Section.id == section.id)
+    try:
+        released = await lock_service.release(section.id, user.id, force=user.role == "Admin")
+        if released is not None:
+            previous = released.user_id
+    except lock_service.LockHeld:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "只有鎖定者或管理員可以解鎖")
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, unlocking {section_id} in the DB: {e}")
         if user.role != "Admin":
-            raise HTTPException(status.HTTP_403_FORBIDDEN, "只有鎖定者或管理員可以解鎖")
+            stmt = stmt.where(_lock_available(user.id, datetime.now(timezone.utc)))
 
-    section.locked_by = None
-    section.locked_at = None
-    section.lock_expires_at = None
+    result = await db.execute(
+        stmt.values(locked_by=None, locked_at=None, lock_expires_at=None)
+        .returning(Section.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "只有鎖定者或管理員可以解鎖")
     await db.commit()
     await db.refresh(section)
+    await tree_cache.invalidate(section.project_id)
+    await realtime_service.publish(
+        section.project_id, "lock_released",
+        section_id=section.id, user_id=previous, released_by=user.id,
+    )
     return SectionLockResponse(
         section_id=section.id,
         locked_by=None,
@@ -206,17 +626,12 @@ async def create_version(
     db: AsyncSession,
 ) -> SectionVersionResponse:
     section = await _get_section_or_404(section_id, db)
-
-    # Get next version number
-    result = await db.execute(
-        select(func.coalesce(func.max(SectionVersion.version_number), 0) + 1)
-        .where(SectionVersion.section_id == section_id)
-    )
-    next_num = result.scalar_one()
+    if data.is_continuation_of is not None:
+        await _get_version_or_404(section_id, data.is_continuation_of, db, text=False)
 
     version = SectionVersion(
         section_id=section_id,
-        version_number=next_num,
+        version_number=await version_store.next_version_number(section_id, db),
         content=data.content,
         content_html=data.content_html,
         source_type=data.source_type,
@@ -224,27 +639,180 @@ async def create_version(
         persona_id=data.persona_id,
         prompt_used=data.prompt_used,
         generation_params=data.generation_params or {},
+        metadata_=layout_metadata(section, data.content),
         is_final=data.is_final,
+        is_continuation_of=data.is_continuation_of,
     )
     db.add(version)
+    await db.flush()
 
-    # Auto-set as current version
+    # Auto-set as current version; the one it replaces becomes a delta
     section.current_version_id = version.id
+    await version_store.compact(section, db)
     await db.commit()
     await db.refresh(version)
+    await tree_cache.invalidate(section.project_id)
+    await realtime_service.publish(
+        section.project_id, "version_created",
+        section_id=section_id, version_id=version.id,
+        version_number=version.version_number, created_by=user.id,
+    )
     return SectionVersionResponse.model_validate(version)
 
 
-async def get_versions(
-    section_id: uuid.UUID, db: AsyncSession
-) -> list[SectionVersionResponse]:
+def _version_response(
+    version: SectionVersion, content: str, content_html: str | None
+) -> SectionVersionResponse:
+    return SectionVersionResponse(
+        id=version.id,
+        section_id=version.section_id,
+        version_number=version.version_number,
+        content=content,
+        content_html=content_html,
+        source_type=version.source_type,
+        created_by=version.created_by,
+        persona_id=version.persona_id,
+        prompt_used=version.prompt_used,
+        is_final=version.is_final,
+        created_at=version.created_at,
+    )
+
+
+async def _get_version_or_404(
+    section_id: uuid.UUID, version_id: uuid.UUID, db: AsyncSession, text: bool = True
+) -> SectionVersion:
+    q = select(SectionVersion).where(
+        SectionVersion.id == version_id, SectionVersion.section_id == section_id
+    )
+    if not text:
+        q = q.options(load_only(SectionVersion.id, SectionVersion.is_continuation_of))
+    version = (await db.execute(q)).scalar_one_or_none()
+    if version is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "版本不存在")
+    return version
+
+
+async def get_version(
+    section_id: uuid.UUID, version_id: uuid.UUID, db: AsyncSession
+) -> SectionVersionResponse:
+    version = await _get_version_or_404(section_id, version_id, db)
+    content, html = await version_store.get_text(version, db)
+    return _version_response(version, content, html)
+
+
+async def list_versions(
+    section_id: uuid.UUID, db: AsyncSession, limit: int = 20, offset: int = 0
+) -> SectionVersionPage:
+    """Version history newest first, without any text — no delta is
+    loaded or applied."""
     await _get_section_or_404(section_id, db)
+    total = (await db.execute(
+        select(func.count()).where(SectionVersion.section_id == section_id)
+    )).scalar_one()
     result = await db.execute(
         select(SectionVersion)
+        .options(load_only(
+            SectionVersion.id, SectionVersion.section_id, SectionVersion.version_number,
+            SectionVersion.source_type, SectionVersion.created_by, SectionVersion.persona_id,
+            SectionVersion.is_continuation_of, SectionVersion.is_final,
+            SectionVersion.metadata_, SectionVersion.created_at,
+        ))
         .where(SectionVersion.section_id == section_id)
         .order_by(SectionVersion.version_number.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    items = [
+        SectionVersionSummary(
+            id=v.id,
+            section_id=v.section_id,
+            version_number=v.version_number,
+            source_type=v.source_type,
+            created_by=v.created_by,
+            persona_id=v.persona_id,
+            is_continuation_of=v.is_continuation_of,
+            is_final=v.is_final,
+            chars=(v.metadata_ or {}).get("layout", {}).get("chars"),
+            created_at=v.created_at,
+        )
+        for v in result.scalars().all()
+    ]
+    return SectionVersionPage(items=items, total=total)
+
+
+async def diff_versions(
+    section_id: uuid.UUID,
+    from_version_id: uuid.UUID,
+    to_version_id: uuid.UUID,
+    db: AsyncSession,
+) -> VersionDiffResponse:
+    """Word-level diff of two versions' content, computed server-side and
+    cached — versions never change, so neither does their diff."""
+    key = (section_id, from_version_id, to_version_id)
+    result = version_diff.cached(key)
+    if result is None:
+        old = await _get_version_or_404(section_id, from_version_id, db)
+        new = await _get_version_or_404(section_id, to_version_id, db)
+        old_text, _ = await version_store.get_text(old, db)
+        new_text, _ = await version_store.get_text(new, db)
+        result = await asyncio.to_thread(version_diff.diff, old_text, new_text)
+        version_diff.remember(key, result)
+    return VersionDiffResponse(
+        from_version_id=from_version_id,
+        to_version_id=to_version_id,
+        ops=[VersionDiffOp(op=op, text=text) for op, text in result.ops],
+        inserted_chars=result.inserted_chars,
+        deleted_chars=result.deleted_chars,
+    )
+
+
+async def merge_versions(
+    section_id: uuid.UUID, data: VersionMergeRequest, user: User, db: AsyncSession
+) -> VersionMergeResponse:
+    """Three-way merge of two diverged versions against the version they
+    both continued from.  A clean merge can be saved as a new version."""
+    ours = await _get_version_or_404(section_id, data.ours_version_id, db)
+    theirs = await _get_version_or_404(section_id, data.theirs_version_id, db)
+    base_id = data.base_version_id or theirs.is_continuation_of or ours.is_continuation_of
+    if base_id is None:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "無法判斷合併基準版本，請指定 base_version_id")
+    base = await _get_version_or_404(section_id, base_id, db)
+
+    base_text, _ = await version_store.get_text(base, db)
+    ours_text, _ = await version_store.get_text(ours, db)
+    theirs_text, _ = await version_store.get_text(theirs, db)
+    merged = await asyncio.to_thread(version_diff.merge3, base_text, ours_text, theirs_text)
+
+    saved = None
+    if data.save and not merged.conflicts:
+        saved = await create_version(
+            section_id,
+            SectionVersionCreate(content=merged.text(), is_continuation_of=ours.id),
+            user,
+            db,
+        )
+    return VersionMergeResponse(
+        base_version_id=base_id,
+        conflicts=merged.conflicts,
+        chunks=[
+            VersionMergeChunk(kind=c.kind, text=c.text, base=c.base, ours=c.ours, theirs=c.theirs)
+            for c in merged.chunks
+        ],
+        saved_version=saved,
     )
-    return [SectionVersionResponse.model_validate(v) for v in result.scalars().all()]
+
+
+async def get_versions(
+    section_id: uuid.UUID, db: AsyncSession
+) -> list[SectionVersionResponse]:
+    await _get_section_or_404(section_id, db)
+    versions = await version_store.load_range(section_id, db)
+    # Rebuilt oldest-first in one pass; newest first like before
+    resolved = [
+        _version_response(v, content, html)
+        for v, content, html in version_store.resolve(versions)
+    ]
+    return resolved[::-1]
 
 
 async def set_current_version(
@@ -261,10 +829,132 @@ async def set_current_version(
             SectionVersion.section_id == section_id,
         )
     )
-    if result.scalar_one_or_none() is None:
+    version = result.scalar_one_or_none()
+    if version is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "版本不存在")
 
+    # The current version is always stored in full
+    await version_store.materialize(version, db)
     section.current_version_id = data.version_id
+    await version_store.compact(section, db)
     await db.commit()
     await db.refresh(section)
+    await tree_cache.invalidate(section.project_id)
+    await realtime_service.publish(
+        section.project_id, "current_version_changed",
+        section_id=section_id, version_id=data.version_id,
+    )
     return SectionResponse.model_validate(section)
+
+
+# ---------------------------------------------------------------------------
+# Bulk content
+# ---------------------------------------------------------------------------
+
+def _project_sections_query(
+    project_id: uuid.UUID,
+    section_ids: list[uuid.UUID] | None = None,
+    subtree_of: Section | None = None,
+):
+    q = (
+        select(Section)
+        .where(Section.project_id == project_id)
+        .order_by(Section.sort_order)
+    )
+    if section_ids:
+        q = q.where(Section.id.in_(section_ids))
+    if subtree_of is not None:
+        q = q.where(in_subtree(subtree_of))
+    return q
+
+
+async def get_project_sections(
+    project_id: uuid.UUID,
+    db: AsyncSession,
+    section_ids: list[uuid.UUID] | None = None,
+    subtree_of: Section | None = None,
+) -> list[Section]:
+    result = await db.execute(_project_sections_query(project_id, section_ids, subtree_of))
+    return list(result.scalars().all())
+
+
+async def iter_current_contents(
+    project_id: uuid.UUID,
+    db: AsyncSession,
+    section_ids: list[uuid.UUID] | None = None,
+    batch_size: int = 100,
+    subtree_of: Section | None = None,
+) -> AsyncIterator[tuple[Section, str]]:
+    """Stream ``(section, current version content)`` in sort order.
+
+    One outer-joined query replaces a version lookup per section; rows are
+    fetched ``batch_size`` at a time from a server-side cursor.  Sections
+    without a current version yield ``""``.
+    """
+    q = (
+        _project_sections_query(project_id, section_ids, subtree_of)
+        .add_columns(SectionVersion.content)
+        .outerjoin(SectionVersion, SectionVersion.id == Section.current_version_id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(q)
+    async for section, content in result:
+        yield section, content or ""
+
+
+# ---------------------------------------------------------------------------
+# Page budget
+# ---------------------------------------------------------------------------
+
+async def get_page_budget(project_id: uuid.UUID, db: AsyncSession) -> PageBudgetResponse:
+    """Estimated pages per section against ``Section.estimated_pages``.
+
+    Uses the layout estimate stored on each current version; versions saved
+    before estimates existed are measured on the fly.
+    """
+    q = (
+        _project_sections_query(project_id)
+        .add_columns(SectionVersion.metadata_)
+        .outerjoin(SectionVersion, SectionVersion.id == Section.current_version_id)
+    )
+    rows = (await db.execute(q)).all()
+
+    missing = [
+        s.current_version_id for s, meta in rows
+        if s.current_version_id and "layout" not in (meta or {})
+    ]
+    contents: dict[uuid.UUID, str] = {}
+    if missing:
+        result = await db.execute(
+            select(SectionVersion.id, SectionVersion.content)
+            .where(SectionVersion.id.in_(missing))
+        )
+        contents = dict(result.all())
+
+    items = []
+    for section, meta in rows:
+        if not section.current_version_id:
+            pages = 0.0
+        elif "layout" in (meta or {}):
+            pages = meta["layout"]["pages"]
+        else:
+            content = contents.get(section.current_version_id, "")
+            pages = layout_metadata(section, content)["layout"]["pages"]
+        items.append(SectionPageBudget(
+            section_id=section.id,
+            chapter_number=section.chapter_number,
+            title=section.title,
+            depth_level=section.depth_level,
+            estimated_pages=section.estimated_pages,
+            layout_pages=pages,
+            over_budget=(
+                section.estimated_pages is not None and pages > section.estimated_pages
+            ),
+        ))
+
+    return PageBudgetResponse(
+        project_id=project_id,
+        budget_pages=sum(i.estimated_pages or 0 for i in items),
+        layout_pages=round(sum(i.layout_pages for i in items), 2),
+        sections=items,
+    )
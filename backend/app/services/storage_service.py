@@ -0,0 +1,189 @@
+"""
+Object storage helpers — ranged streaming downloads and presigned URLs for MinIO.
+"""
+
+import asyncio
+import re
+from datetime import timedelta
+from typing import Iterator
+from urllib.parse import quote
+
+from fastapi import HTTPException, status
+from fastapi.responses import RedirectResponse, StreamingResponse
+from minio import Minio
+from minio.error import S3Error
+
+from app.core.config import settings
+
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def get_minio() -> Minio:
+    return Minio(
+        settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        secure=settings.MINIO_SECURE,
+    )
+
+
+def _get_public_minio() -> Minio:
+    """Client used only for signing URLs the browser will fetch directly.
+
+    The region is fixed so that presigning never needs a round trip to MinIO.
+    """
+    return Minio(
+        settings.MINIO_PUBLIC_ENDPOINT or settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        secure=settings.MINIO_SECURE,
+        region=settings.MINIO_REGION,
+    )
+
+
+def media_type_for(file_type: str) -> str:
+    return MEDIA_TYPES.get(file_type, "application/octet-stream")
+
+
+def content_disposition(filename: str) -> str:
+    # RFC 5987 form so Chinese filenames survive every browser
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+# ---------------------------------------------------------------------------
+# Range handling
+# ---------------------------------------------------------------------------
+
+def parse_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+    """Parse a single ``bytes=`` range into an inclusive (start, end) pair.
+
+    Returns None when the whole object should be sent (no header, or a
+    multi-range request we choose to answer with a plain 200).
+    """
+    if not range_header:
+        return None
+    match = _RANGE_RE.match(range_header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+
+    if first == "":
+        # Suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            _raise_unsatisfiable(size)
+        start = max(0, size - length)
+        end = size - 1
+    else:
+        start = int(first)
+        end = int(last) if last else size - 1
+        end = min(end, size - 1)
+
+    if start >= size or start > end:
+        _raise_unsatisfiable(size)
+    return start, end
+
+
+def _raise_unsatisfiable(size: int) -> None:
+    raise HTTPException(
+        status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        "請求的範圍無效",
+        headers={"Content-Range": f"bytes */{size}"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+def _iter_object(
+    client: Minio, bucket: str, object_name: str, offset: int, length: int
+) -> Iterator[bytes]:
+    response = client.get_object(bucket, object_name, offset=offset, length=length)
+    try:
+        yield from response.stream(settings.DOWNLOAD_CHUNK_SIZE)
+    finally:
+        response.close()
+        response.release_conn()
+
+
+async def stream_object(
+    bucket: str,
+    object_name: str,
+    filename: str,
+    media_type: str,
+    range_header: str | None = None,
+) -> StreamingResponse:
+    """Proxy an object to the client chunk by chunk, honouring HTTP Range."""
+    client = get_minio()
+    try:
+        stat = await asyncio.to_thread(client.stat_object, bucket, object_name)
+    except S3Error as e:
+        if e.code == "NoSuchKey":
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "檔案不存在於儲存空間")
+        raise
+
+    size = stat.size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(filename),
+    }
+    if stat.etag:
+        headers["ETag"] = f'"{stat.etag}"'
+
+    byte_range = parse_range(range_header, size)
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            _iter_object(client, bucket, object_name, 0, 0),
+            media_type=media_type,
+            headers=headers,
+        )
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        _iter_object(client, bucket, object_name, start, length),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Presigned redirect
+# ---------------------------------------------------------------------------
+
+def presigned_url(
+    bucket: str, object_name: str, filename: str, media_type: str
+) -> str:
+    client = _get_public_minio()
+    return client.presigned_get_object(
+        bucket,
+        object_name,
+        expires=timedelta(minutes=settings.DOWNLOAD_PRESIGNED_EXPIRE_MINUTES),
+        response_headers={
+            "response-content-disposition": content_disposition(filename),
+            "response-content-type": media_type,
+        },
+    )
+
+
+def redirect_to_object(
+    bucket: str, object_name: str, filename: str, media_type: str
+) -> RedirectResponse:
+    """Send the client straight to MinIO so the API is not in the data path."""
+    url = presigned_url(bucket, object_name, filename, media_type)
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
@@ -5,12 +5,13 @@ Batch import parsed section structures into a project.
 import uuid
 import logging
 
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.section import Section
 from app.models.user import User
 from app.schemas.structure import ParsedSection, StructureImportResponse
+from app.services import section_service, tree_cache
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +39,10 @@ async def import_sections(
             )
             max_sort = result.scalar_one()
 
-        # Track chapter_number → section id for parent resolution
+        # Ids are generated here so parents resolve without a flush per
+        # section, and the whole outline goes in as one multi-row INSERT
         number_to_id: dict[str, uuid.UUID] = {}
-        imported_ids: list[uuid.UUID] = []
+        rows: list[dict] = []
 
         for idx, parsed in enumerate(sections):
             # Resolve parent_id from chapter_number hierarchy
@@ -48,24 +50,27 @@ async def import_sections(
             if parsed.parent_number and parsed.parent_number in number_to_id:
                 parent_id = number_to_id[parsed.parent_number]
 
-            section = Section(
-                project_id=project_id,
-                parent_id=parent_id,
-                chapter_number=parsed.chapter_number,
-                title=parsed.title,
-                requirement_text=parsed.description or "",
-                sort_order=max_sort + idx + 1,
-                depth_level=parsed.depth_level,
-                estimated_pages=1,
-            )
-            db.add(section)
-            # Flush to get the generated id
-            await db.flush()
+            section_id = uuid.uuid4()
+            rows.append({
+                "id": section_id,
+                "project_id": project_id,
+                "parent_id": parent_id,
+                "chapter_number": parsed.chapter_number,
+                "title": parsed.title,
+                "requirement_text": parsed.description or "",
+                "sort_order": max_sort + idx + 1,
+                "depth_level": parsed.depth_level,
+                "estimated_pages": 1,
+            })
+            number_to_id[parsed.chapter_number] = section_id
 
-            number_to_id[parsed.chapter_number] = section.id
-            imported_ids.append(section.id)
+        if rows:
+            await db.execute(insert(Section), rows)
+            await section_service.refresh_paths(project_id, db)
+        imported_ids = [row["id"] for row in rows]
 
         await db.commit()
+        await tree_cache.invalidate(project_id)
 
         return StructureImportResponse(
             success=True,
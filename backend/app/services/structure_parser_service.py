@@ -10,8 +10,9 @@ import logging
 from app.core.config import settings
 from app.schemas.structure import ParsedSection
 from app.services.llm_providers import get_provider_for_model
+from app.services import ocr_service
 from app.services.llm_providers.base import LLMMessage, ProviderError
-from app.services.parser_service import parse_pdf
+from app.services.parser_service import parse_pdf_pages
 
 logger = logging.getLogger(__name__)
 
@@ -154,8 +155,10 @@ async def parse_from_image(image_base64: str) -> tuple[list[ParsedSection], str,
 
 async def parse_from_pdf(pdf_content: bytes) -> tuple[list[ParsedSection], str, float]:
     """Parse section structure from a PDF file."""
-    # Extract text using existing parser
-    text = parse_pdf(pdf_content)
+    # Extract text using existing parser; scanned pages go through local OCR
+    pages = parse_pdf_pages(pdf_content)
+    pages, _ = await ocr_service.ocr_scanned_pages(pdf_content, pages)
+    text = "\n\n".join(pages)
 
     if len(text.strip()) < 50:
         raise ValueError("PDF 文字內容過少，無法解析章節架構。請嘗試上傳截圖。")
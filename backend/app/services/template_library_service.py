@@ -17,6 +17,7 @@ from app.models.section_template import (
     TemplateVersion,
 )
 from app.schemas.section_template import SectionTemplateCreate, SectionTemplateUpdate
+from app.services import realtime_service, section_service, tree_cache, version_store
 
 logger = logging.getLogger(__name__)
 
@@ -305,23 +306,19 @@ async def apply_template(
         new_content = template.content
 
     # Create new version
-    next_num_result = await db.execute(
-        select(func.coalesce(func.max(SectionVersion.version_number), 0) + 1)
-        .where(SectionVersion.section_id == section_id)
-    )
-    next_num = next_num_result.scalar_one()
-
     version = SectionVersion(
         section_id=section_id,
-        version_number=next_num,
+        version_number=await version_store.next_version_number(section_id, db),
         content=new_content,
         source_type="Human",
         created_by=user_id,
+        metadata_=section_service.layout_metadata(section, new_content),
     )
     db.add(version)
     await db.flush()
 
     section.current_version_id = version.id
+    await version_store.compact(section, db)
 
     # Update template stats
     template.usage_count += 1
@@ -337,4 +334,10 @@ async def apply_template(
     ))
 
     await db.commit()
+    await tree_cache.invalidate(section.project_id)
+    await realtime_service.publish(
+        section.project_id, "version_created",
+        section_id=section_id, version_id=version.id,
+        version_number=version.version_number, created_by=user_id,
+    )
     return new_content
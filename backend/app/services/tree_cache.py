@@ -0,0 +1,94 @@
+"""
+Tree cache — serialized section trees per project in Redis.
+
+Each project has a generation counter; the tree is cached under
+``section-tree:<project_id>:<generation>`` as its JSON body and ETag.
+Writers bump the counter after they commit (``invalidate``), which orphans
+the cached tree — readers then rebuild under the new generation and the old
+key expires.  A reader that built from data older than a concurrent write
+stores it under the generation it started with, which nobody reads any
+more, so a stale tree is never served.
+
+Everything here is best effort: with Redis down the tree is built from the
+database on every request, as before.
+"""
+
+import hashlib
+import logging
+import uuid
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.services import realtime_service
+
+logger = logging.getLogger(__name__)
+
+_GEN_PREFIX = "section-tree-gen:"
+_KEY_PREFIX = "section-tree:"
+
+
+def _key(project_id: uuid.UUID, generation: int) -> str:
+    return f"{_KEY_PREFIX}{project_id}:{generation}"
+
+
+def etag_for(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header covers ``etag`` (weak or strong)."""
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def generation(project_id: uuid.UUID) -> int | None:
+    """Current generation, or None when Redis is unavailable."""
+    try:
+        return int(await realtime_service.get_redis().get(f"{_GEN_PREFIX}{project_id}") or 0)
+    except RedisError as e:
+        logger.warning(f"Tree cache unavailable for project {project_id}: {e}")
+        return None
+
+
+async def load(
+    project_id: uuid.UUID, generation: int, if_none_match: str | None = None
+) -> tuple[str, bytes | None] | None:
+    """``(etag, body)`` of the cached tree, None on a miss.  The body is
+    not fetched, and returned as None, when ``if_none_match`` matches."""
+    redis = realtime_service.get_redis()
+    key = _key(project_id, generation)
+    try:
+        etag = await redis.hget(key, "etag")
+        if etag is None:
+            return None
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        body = await redis.hget(key, "body")
+    except RedisError as e:
+        logger.warning(f"Tree cache read failed for project {project_id}: {e}")
+        return None
+    if body is None:
+        return None
+    return etag, body.encode("utf-8")
+
+
+async def store(project_id: uuid.UUID, generation: int, body: bytes, etag: str) -> None:
+    key = _key(project_id, generation)
+    try:
+        async with realtime_service.get_redis().pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"etag": etag, "body": body.decode("utf-8")})
+            pipe.expire(key, settings.SECTION_TREE_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Tree cache write failed for project {project_id}: {e}")
+
+
+async def invalidate(project_id: uuid.UUID) -> None:
+    """Call after committing any change to the project's sections."""
+    try:
+        await realtime_service.get_redis().incr(f"{_GEN_PREFIX}{project_id}")
+    except RedisError as e:
+        logger.warning(f"Tree cache invalidation failed for project {project_id}: {e}")
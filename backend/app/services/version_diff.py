@@ -0,0 +1,160 @@
+"""
+Version diff — word-level diffs and three-way merges of section text.
+
+Text is split into tokens before comparing: each CJK character is a token
+(Chinese has no spaces to split words on, and a character is the smallest
+unit an editor changes), runs of other letters and digits are words, and
+whitespace runs and punctuation marks stand alone.
+
+Versions are immutable, so a diff is fully determined by its two version
+ids; results are kept in a small in-process LRU.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from app.core.config import settings
+
+# Kana, CJK ideographs and Hangul (the search index in init_db.sql uses the same)
+CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN = re.compile(rf"[{CJK}]|(?:(?![{CJK}])\w)+|\s+|.", re.S)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text)
+
+
+# ---------------------------------------------------------------------------
+# Diff
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DiffResult:
+    # (op, text) with op "equal", "insert" or "delete"; adjacent ops merged
+    ops: list[tuple[str, str]]
+    inserted_chars: int = 0
+    deleted_chars: int = 0
+
+
+_cache: "OrderedDict[tuple, DiffResult]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _append(ops: list[tuple[str, str]], op: str, text: str) -> None:
+    if not text:
+        return
+    if ops and ops[-1][0] == op:
+        ops[-1] = (op, ops[-1][1] + text)
+    else:
+        ops.append((op, text))
+
+
+def diff(old: str, new: str) -> DiffResult:
+    a, b = tokenize(old), tokenize(new)
+    result = DiffResult(ops=[])
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            _append(result.ops, "equal", "".join(a[i1:i2]))
+            continue
+        deleted, inserted = "".join(a[i1:i2]), "".join(b[j1:j2])
+        _append(result.ops, "delete", deleted)
+        _append(result.ops, "insert", inserted)
+        result.deleted_chars += len(deleted)
+        result.inserted_chars += len(inserted)
+    return result
+
+
+def cached(key: tuple) -> DiffResult | None:
+    with _lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def remember(key: tuple, result: DiffResult) -> None:
+    with _lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > settings.VERSION_DIFF_CACHE_ITEMS:
+            _cache.popitem(last=False)
+
+
+# ---------------------------------------------------------------------------
+# Three-way merge
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MergeChunk:
+    # "resolved" chunks carry ``text``; "conflict" chunks the three sides
+    kind: str
+    text: str = ""
+    base: str = ""
+    ours: str = ""
+    theirs: str = ""
+
+
+@dataclass
+class MergeResult:
+    chunks: list[MergeChunk] = field(default_factory=list)
+
+    @property
+    def conflicts(self) -> int:
+        return sum(1 for c in self.chunks if c.kind == "conflict")
+
+    def text(self) -> str | None:
+        """The merged text, or None while conflicts remain."""
+        if self.conflicts:
+            return None
+        return "".join(c.text for c in self.chunks)
+
+
+def _matches(base: list[str], other: list[str]) -> dict[int, int]:
+    """Base token index → index of the same token in ``other``."""
+    pairs: dict[int, int] = {}
+    for i, j, n in SequenceMatcher(None, base, other, autojunk=False).get_matching_blocks():
+        for k in range(n):
+            pairs[i + k] = j + k
+    return pairs
+
+
+def merge3(base: str, ours: str, theirs: str) -> MergeResult:
+    """diff3: walk the base tokens both sides kept unchanged; between two
+    such anchors, take whichever side changed, or either if both made the
+    same change, and report a conflict if they changed it differently."""
+    o, a, b = tokenize(base), tokenize(ours), tokenize(theirs)
+    in_a, in_b = _matches(o, a), _matches(o, b)
+    result = MergeResult()
+
+    def resolved(text: str) -> None:
+        if not text:
+            return
+        if result.chunks and result.chunks[-1].kind == "resolved":
+            result.chunks[-1].text += text
+        else:
+            result.chunks.append(MergeChunk("resolved", text=text))
+
+    i = ja = jb = 0
+    while True:
+        # Next anchor: a base token both sides still have
+        k = i
+        while k < len(o) and not (k in in_a and k in in_b):
+            k += 1
+        ea, eb = (in_a[k], in_b[k]) if k < len(o) else (len(a), len(b))
+        chunk_o, chunk_a, chunk_b = o[i:k], a[ja:ea], b[jb:eb]
+        if chunk_a == chunk_o or chunk_a == chunk_b:
+            resolved("".join(chunk_b))
+        elif chunk_b == chunk_o:
+            resolved("".join(chunk_a))
+        else:
+            result.chunks.append(MergeChunk(
+                "conflict",
+                base="".join(chunk_o), ours="".join(chunk_a), theirs="".join(chunk_b),
+            ))
+        if k == len(o):
+            return result
+        resolved(o[k])
+        i, ja, jb = k + 1, ea + 1, eb + 1
@@ -0,0 +1,212 @@
+"""
+Version store — delta-compressed section version history.
+
+Every version starts out materialized (``content`` set).  Once it is no
+longer a section's current version it is *compacted*: its ``content`` and
+``content_html`` are replaced by a zlib-compressed delta against the
+previous version, unless it is a snapshot.  Snapshots stay full forever:
+
+* every ``SECTION_VERSION_SNAPSHOT_INTERVAL``-th version (1, 11, 21, …), so
+  rebuilding any version applies at most interval − 1 deltas, and
+* any version whose delta would not be much smaller than its text (a full
+  rewrite), recorded as ``storage = 'snapshot'``.
+
+The current version is always materialized, so exports, the page budget
+and the editor read it without reconstruction.  Rows saved before deltas
+existed (``storage = 'full'``) are compacted the next time their section
+gets a new current version.
+
+A delta is a JSON list of ops over sentence tokens of the previous text —
+``[i, j]`` copies tokens ``i:j``, a string inserts itself — for the content
+and for the HTML.
+"""
+
+import json
+import re
+import uuid
+import zlib
+from collections.abc import Iterator
+from difflib import SequenceMatcher
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.section import Section, SectionVersion
+
+# Keep a version full when its delta is not below this share of the
+# compressed full text
+_MAX_DELTA_RATIO = 0.5
+
+# Sentences (with their terminator) and newlines — edits usually touch a
+# few sentences of a paragraph, not the whole line
+_TOKEN = re.compile(r"[^\n。！？!?]+[\n。！？!?]*|[\n。！？!?]+")
+
+
+# ---------------------------------------------------------------------------
+# Delta encoding
+# ---------------------------------------------------------------------------
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text)
+
+
+def _diff(base: str, target: str) -> list:
+    a, b = _tokens(base), _tokens(target)
+    ops: list = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(b[j1:j2]))
+    return ops
+
+
+def _patch(base: str, ops: list) -> str:
+    a = _tokens(base)
+    return "".join("".join(a[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def encode_delta(
+    base: tuple[str, str | None], target: tuple[str, str | None]
+) -> bytes:
+    """Delta turning ``(content, content_html)`` ``base`` into ``target``."""
+    payload = {
+        "c": _diff(base[0], target[0]),
+        "h": None if target[1] is None else _diff(base[1] or "", target[1]),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"))
+
+
+def apply_delta(base: tuple[str, str | None], delta: bytes) -> tuple[str, str | None]:
+    payload = json.loads(zlib.decompress(delta))
+    html = None if payload["h"] is None else _patch(base[1] or "", payload["h"])
+    return _patch(base[0], payload["c"]), html
+
+
+def _is_snapshot_slot(version_number: int) -> bool:
+    return (version_number - 1) % max(1, settings.SECTION_VERSION_SNAPSHOT_INTERVAL) == 0
+
+
+# ---------------------------------------------------------------------------
+# Reconstruction
+# ---------------------------------------------------------------------------
+
+def resolve(versions: list[SectionVersion]) -> Iterator[tuple[SectionVersion, str, str | None]]:
+    """Yield ``(version, content, content_html)`` for a section's versions
+    in ascending ``version_number`` order, applying deltas as it goes.
+
+    The list must start at a materialized version; ``load_range`` returns
+    one that does.
+    """
+    text: tuple[str, str | None] | None = None
+    for version in versions:
+        if version.content is not None:
+            text = (version.content, version.content_html)
+        elif text is None:
+            raise ValueError(f"Version {version.id} has no materialized base")
+        else:
+            text = apply_delta(text, version.delta)
+        yield version, text[0], text[1]
+
+
+async def load_range(
+    section_id: uuid.UUID,
+    db: AsyncSession,
+    upto: int | None = None,
+    start: int | None = None,
+) -> list[SectionVersion]:
+    """Versions of a section in ascending order, from the nearest
+    materialized version at or before ``start`` (default ``upto``) through
+    ``upto``.  Without either, the whole history."""
+    q = select(SectionVersion).where(SectionVersion.section_id == section_id)
+    first = start if start is not None else upto
+    if first is not None:
+        # Nearest materialized version at or before ``first``
+        base = (
+            select(func.max(SectionVersion.version_number))
+            .where(
+                SectionVersion.section_id == section_id,
+                SectionVersion.version_number <= first,
+                SectionVersion.content.is_not(None),
+            )
+            .scalar_subquery()
+        )
+        q = q.where(SectionVersion.version_number >= func.coalesce(base, 1))
+    if upto is not None:
+        q = q.where(SectionVersion.version_number <= upto)
+    result = await db.execute(q.order_by(SectionVersion.version_number))
+    return list(result.scalars().all())
+
+
+async def get_text(version: SectionVersion, db: AsyncSession) -> tuple[str, str | None]:
+    """``(content, content_html)`` of one version."""
+    if version.content is not None:
+        return version.content, version.content_html
+    chain = await load_range(version.section_id, db, upto=version.version_number)
+    *_, (_, content, html) = resolve(chain)
+    return content, html
+
+
+# ---------------------------------------------------------------------------
+# Writes
+# ---------------------------------------------------------------------------
+
+async def next_version_number(section_id: uuid.UUID, db: AsyncSession) -> int:
+    """Allocate the section's next version number.
+
+    ``get_next_version_number`` (init_db.sql) row-locks the section until
+    this transaction ends, so concurrent generations for one section queue
+    up for a number instead of both reading the same ``MAX + 1``.
+    """
+    result = await db.execute(select(func.get_next_version_number(section_id)))
+    return result.scalar_one()
+
+
+async def materialize(version: SectionVersion, db: AsyncSession) -> None:
+    """Fill in ``content`` of a compacted version about to become current.
+    Its delta is kept, so compacting it again is free."""
+    if version.content is None:
+        version.content, version.content_html = await get_text(version, db)
+
+
+async def compact(section: Section, db: AsyncSession) -> int:
+    """Replace superseded materialized versions of ``section`` with deltas.
+
+    Only rows that are not current and not snapshots are touched; returns
+    how many were compacted.  Nothing is loaded when there is nothing to do.
+    """
+    result = await db.execute(
+        select(SectionVersion.version_number).where(
+            SectionVersion.section_id == section.id,
+            SectionVersion.content.is_not(None),
+            SectionVersion.storage != "snapshot",
+            SectionVersion.id != section.current_version_id,
+        )
+    )
+    candidates = {n for n in result.scalars().all() if not _is_snapshot_slot(n)}
+    if not candidates:
+        return 0
+
+    # Only the stretch holding the candidates, from the materialized version
+    # that rebuilds the one before the first of them
+    chain = await load_range(
+        section.id, db, upto=max(candidates), start=max(1, min(candidates) - 1)
+    )
+    previous: tuple[str, str | None] | None = None
+    for version, content, html in resolve(chain):
+        if version.version_number in candidates and previous is not None:
+            if version.delta is None:
+                delta = encode_delta(previous, (content, html))
+                full = zlib.compress((content + (html or "")).encode("utf-8"))
+                if len(delta) < len(full) * _MAX_DELTA_RATIO:
+                    version.delta = delta
+                    version.storage = "delta"
+                else:
+                    version.storage = "snapshot"
+            if version.delta is not None:
+                version.content = None
+                version.content_html = None
+        previous = (content, html)
+    return len(candidates)
@@ -0,0 +1,7 @@
+"""
+Offline performance benchmarks for the backend.
+
+Run from ``backend/``, e.g. ``python -m benchmarks.ingestion_bench``.  No
+PostgreSQL, MinIO or embedding API is needed — see ``common.py`` for the
+stand-ins.
+"""
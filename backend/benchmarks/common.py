@@ -0,0 +1,339 @@
+"""
+Shared benchmark plumbing — stage timer, in-memory MinIO, stub DB session,
+fake embedder, memory and profile helpers.
+
+The stand-ins implement only what the services call, and do the same
+client-side work the real ones would (bind-processing insert rows, copying
+object bytes) so timings stay representative without any network.
+"""
+
+import asyncio
+import cProfile
+import io
+import pstats
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Delete, Insert, Select
+
+_PG_DIALECT = postgresql.dialect()
+
+
+# ---------------------------------------------------------------------------
+# Stage timing
+# ---------------------------------------------------------------------------
+
+class StageTimer:
+    """Accumulate *exclusive* wall time per named stage.
+
+    Pipeline stages are lazy and nested (the chunker pulls from the parser,
+    which pulls from the page-store tap), so entering an inner stage pauses
+    the outer one.  Each stage's total is the time spent in it and not in
+    anything it called.
+    """
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self._stack: list[list] = []  # [name, resumed_at]
+        self._lock = threading.Lock()
+
+    def _push(self, name: str) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            if self._stack:
+                parent = self._stack[-1]
+                self.totals[parent[0]] += now - parent[1]
+            self._stack.append([name, now])
+            self.calls[name] += 1
+
+    def _pop(self) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            name, resumed_at = self._stack.pop()
+            self.totals[name] += now - resumed_at
+            if self._stack:
+                self._stack[-1][1] = now
+
+    @contextmanager
+    def stage(self, name: str):
+        self._push(name)
+        try:
+            yield
+        finally:
+            self._pop()
+
+    def wrap_sync(self, name: str, fn: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def wrap_async(self, name: str, fn: Callable) -> Callable:
+        async def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+
+    def wrap_iter(self, name: str, iterable: Iterable) -> Iterator:
+        it = iter(iterable)
+        while True:
+            self._push(name)
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._pop()
+            yield item
+
+    async def wrap_aiter(self, name: str, iterable: AsyncIterable) -> AsyncIterator:
+        it = aiter(iterable)
+        while True:
+            self._push(name)
+            try:
+                item = await anext(it)
+            except StopAsyncIteration:
+                return
+            finally:
+                self._pop()
+            yield item
+
+    def snapshot(self) -> dict[str, float]:
+        return dict(self.totals)
+
+
+# ---------------------------------------------------------------------------
+# MinIO stand-in
+# ---------------------------------------------------------------------------
+
+class _FakeResponse:
+    def __init__(self, data: bytes):
+        self._buf = io.BytesIO(data)
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self._buf.read(amt)
+
+    def stream(self, amt: int = 64 * 1024) -> Iterator[bytes]:
+        while chunk := self._buf.read(amt):
+            yield chunk
+
+    def close(self) -> None:
+        pass
+
+    def release_conn(self) -> None:
+        pass
+
+
+class _FakeStat:
+    def __init__(self, size: int):
+        self.size = size
+        self.etag = None
+
+
+class FakeMinio:
+    """In-memory object store with the subset of the ``Minio`` API we use."""
+
+    def __init__(self) -> None:
+        self.objects: dict[tuple[str, str], bytes] = {}
+
+    def put_object(
+        self, bucket_name: str, object_name: str, data, length: int,
+        content_type: str = "application/octet-stream", **kwargs,
+    ) -> None:
+        self.objects[(bucket_name, object_name)] = data.read(length) if length >= 0 else data.read()
+
+    def fput_object(self, bucket_name: str, object_name: str, file_path: str, **kwargs) -> None:
+        self.objects[(bucket_name, object_name)] = Path(file_path).read_bytes()
+
+    def get_object(
+        self, bucket_name: str, object_name: str, offset: int = 0, length: int = 0, **kwargs
+    ) -> _FakeResponse:
+        data = self.objects[(bucket_name, object_name)]
+        end = offset + length if length else len(data)
+        return _FakeResponse(data[offset:end])
+
+    def fget_object(self, bucket_name: str, object_name: str, file_path: str, **kwargs) -> None:
+        Path(file_path).write_bytes(self.objects[(bucket_name, object_name)])
+
+    def stat_object(self, bucket_name: str, object_name: str) -> _FakeStat:
+        return _FakeStat(len(self.objects[(bucket_name, object_name)]))
+
+    def remove_object(self, bucket_name: str, object_name: str) -> None:
+        self.objects.pop((bucket_name, object_name), None)
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return True
+
+
+# ---------------------------------------------------------------------------
+# DB session stand-in
+# ---------------------------------------------------------------------------
+
+class _FakeResult:
+    def __init__(self, value: Any = None):
+        self._value = value
+
+    def scalar_one_or_none(self) -> Any:
+        return self._value
+
+    def scalar_one(self) -> Any:
+        return self._value
+
+    def scalars(self) -> "_FakeResult":
+        return self
+
+    def all(self) -> list:
+        return [] if self._value is None else [self._value]
+
+
+class _FakeStream:
+    def __init__(self, rows: Iterable):
+        self._rows = iter(rows)
+
+    def __aiter__(self) -> "_FakeStream":
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeSession:
+    """Stub ``AsyncSession``.
+
+    ``select`` statements return ``lookup`` (normally the object under test);
+    ``stream`` compiles the query and yields ``rows`` (any iterable, so a
+    generator can hydrate ORM objects lazily like a real cursor).  Inserts are compiled for PostgreSQL and every row is run through the
+    column bind processors — the client-side cost of a real bulk insert,
+    minus the network.
+    """
+
+    def __init__(self, lookup: Any = None, rows: Iterable = ()):
+        self.lookup = lookup
+        self.rows = rows
+        self.inserted_rows = 0
+        self._processors: dict[Any, dict[str, Callable | None]] = {}
+
+    def _bind_processors(self, stmt: Insert) -> dict[str, Callable | None]:
+        entity = stmt.entity_description.get("entity")
+        if entity not in self._processors:
+            if entity is not None:
+                columns = {key: col for key, col in sa_inspect(entity).columns.items()}
+            else:
+                columns = {col.key: col for col in stmt.table.columns}
+            self._processors[entity] = {
+                key: col.type.bind_processor(_PG_DIALECT) for key, col in columns.items()
+            }
+        return self._processors[entity]
+
+    async def execute(self, stmt, params=None):
+        if isinstance(stmt, Select):
+            return _FakeResult(self.lookup)
+        if isinstance(stmt, Insert) and params:
+            stmt.compile(dialect=_PG_DIALECT)
+            processors = self._bind_processors(stmt)
+            for row in params:
+                for key, value in row.items():
+                    proc = processors.get(key)
+                    if proc is not None and value is not None:
+                        proc(value)
+            self.inserted_rows += len(params)
+            return _FakeResult()
+        if isinstance(stmt, Delete):
+            stmt.compile(dialect=_PG_DIALECT)
+        return _FakeResult()
+
+    async def stream(self, stmt, params=None) -> "_FakeStream":
+        stmt.compile(dialect=_PG_DIALECT)
+        return _FakeStream(self.rows)
+
+    async def flush(self) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+    async def refresh(self, obj) -> None:
+        pass
+
+    def add(self, obj) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Embedding stand-in
+# ---------------------------------------------------------------------------
+
+def make_fake_embedder(dim: int = 1536, latency_ms: float = 0.0) -> Callable:
+    """Return an ``embed_chunks`` replacement.
+
+    ``latency_ms`` simulates the API round trip per call, so batching
+    changes show up the way they would against the real endpoint.
+    """
+    vector = [0.001 * (i % 97) for i in range(dim)]
+
+    async def embed_chunks(texts: list[str], model: str | None = None) -> list[list[float]]:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return [vector] * len(texts)
+
+    return embed_chunks
+
+
+# ---------------------------------------------------------------------------
+# Memory + profiling
+# ---------------------------------------------------------------------------
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return peak / divisor
+
+
+@contextmanager
+def maybe_profile(path: Path | None, top: int = 15):
+    """cProfile the block and write a ``.prof`` file (snakeviz/pstats)."""
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        print(out.getvalue(), file=sys.stderr)
+
+
+def format_table(headers: list[str], rows: list[list[str]]) -> str:
+    widths = [
+        max(len(h), *(len(r[i]) for r in rows)) if rows else len(h)
+        for i, h in enumerate(headers)
+    ]
+    lines = [
+        "  ".join(h.ljust(w) for h, w in zip(headers, widths)),
+        "  ".join("-" * w for w in widths),
+    ]
+    for row in rows:
+        lines.append("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+    return "\n".join(lines)
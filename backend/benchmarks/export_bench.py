@@ -0,0 +1,397 @@
+"""
+Export benchmark — time ``export_service._build_export`` on synthetic proposals.
+
+Each case (section count × format) runs in a fresh process so peak RSS
+belongs to that case alone.  Reported per case:
+
+* exclusive wall time per stage: load (section rows from the DB cursor),
+  build (DocxBuilder assembly), save (DOCX serialization), convert
+  (LibreOffice, or the stub), watermark, upload, other
+* sections/s over the whole call, page count and output size
+* peak RSS, and with ``--tracemalloc`` the peak Python heap
+
+LibreOffice runs in its own processes, so its memory is not in the RSS
+column.  When ``soffice`` is not on PATH (or with ``--converter stub``)
+conversion is replaced by a stub that lays the DOCX text out on PDF pages
+with PyMuPDF, so the watermark and upload stages still see a realistic file.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.export_bench
+    python -m benchmarks.export_bench --sizes large --formats pdf --repeat 3
+    python -m benchmarks.export_bench --warm-fragments --watermark-mode stamp
+    python -m benchmarks.export_bench --json baseline.json
+
+``--profile DIR`` writes one cProfile ``.prof`` per case; ``--no-isolate``
+runs cases in this process for py-spy, as in ``ingestion_bench``.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+from benchmarks.common import (
+    FakeMinio,
+    FakeSession,
+    StageTimer,
+    format_table,
+    maybe_profile,
+    peak_rss_mb,
+)
+from benchmarks.fixtures import PROPOSAL_SIZES, proposal_sections
+
+STAGES = ("load", "build", "save", "convert", "watermark", "upload")
+FORMATS = ("docx", "pdf")
+CONVERTERS = ("auto", "libreoffice", "stub")
+
+# Stable ids, so a warm run hits the fragments the priming run wrote
+_NAMESPACE = uuid.UUID("6f1c2a9e-3b4d-4e5f-8a7b-9c0d1e2f3a4b")
+
+_W_P = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p"
+_STUB_CHARS_PER_LINE = 40
+_STUB_LINES_PER_PAGE = 45
+
+
+# ---------------------------------------------------------------------------
+# Stub converter
+# ---------------------------------------------------------------------------
+
+def _docx_paragraphs(path: str) -> Iterator[str]:
+    from lxml import etree
+
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as f:
+        for _, element in etree.iterparse(f, tag=_W_P):
+            yield "".join(element.itertext())
+            element.clear()
+
+
+def _stub_convert(src: str, dst: str) -> None:
+    """Fixed-pitch layout of the DOCX text — no fonts, styles or tables,
+    but roughly LibreOffice's page count and a real PDF to post-process."""
+    import fitz
+
+    doc = fitz.open()
+
+    def emit(lines: list[str]) -> None:
+        page = doc.new_page()
+        page.insert_text((72, 72), lines, fontname="china-t", fontsize=10)
+
+    lines: list[str] = []
+    for text in _docx_paragraphs(src):
+        for start in range(0, max(len(text), 1), _STUB_CHARS_PER_LINE):
+            lines.append(text[start:start + _STUB_CHARS_PER_LINE])
+        while len(lines) >= _STUB_LINES_PER_PAGE:
+            emit(lines[:_STUB_LINES_PER_PAGE])
+            lines = lines[_STUB_LINES_PER_PAGE:]
+    if lines or not len(doc):
+        emit(lines)
+    doc.save(dst, garbage=3, deflate=True)
+    doc.close()
+
+
+async def stub_docx_to_pdf_file(src: str, dst: str) -> bool:
+    await asyncio.to_thread(_stub_convert, src, dst)
+    return True
+
+
+async def _start_libreoffice(timeout: float = 120.0) -> None:
+    """Boot the warm pool and wait until a slot is ready, so startup is not
+    billed to the first conversion."""
+    from app.services import conversion_pool
+
+    await conversion_pool.start()
+    deadline = time.monotonic() + timeout
+    while not conversion_pool.get_pool().health()["ready"]:
+        if time.monotonic() > deadline:
+            raise RuntimeError("LibreOffice pool did not become ready")
+        await asyncio.sleep(0.2)
+
+
+# ---------------------------------------------------------------------------
+# One export
+# ---------------------------------------------------------------------------
+
+def _section_rows(project_id: uuid.UUID, size: str, fixture: list[dict]):
+    """Hydrate ORM rows lazily, the way the server-side cursor would."""
+    from app.models.section import Section
+
+    for i, row in enumerate(fixture):
+        yield (
+            Section(
+                id=uuid.uuid5(_NAMESPACE, f"{size}:section:{i}"),
+                project_id=project_id,
+                chapter_number=row["chapter_number"],
+                title=row["title"],
+                sort_order=i,
+                depth_level=row["depth_level"],
+                current_version_id=uuid.uuid5(_NAMESPACE, f"{size}:version:{i}"),
+            ),
+            row["content"],
+        )
+
+
+async def _run_once(size: str, fixture: list[dict], opts: dict) -> dict:
+    from app.models.export_template import ExportHistory
+    from app.models.project import Project
+    from app.schemas.export import ExportRequest
+    from app.services import export_service, pdf_converter, section_service
+    from app.services.docx_builder import DocxBuilder
+
+    project = Project(
+        id=uuid.uuid5(_NAMESPACE, f"{size}:project"),
+        name="效能測試專案",
+        tender_number="BENCH-0001",
+    )
+    request = ExportRequest(
+        project_id=project.id,
+        format=opts["format"],
+        company_name="測試資訊股份有限公司",
+        watermark=opts["watermark"] or None,
+    )
+    history = ExportHistory(
+        id=uuid.uuid4(),
+        project_id=project.id,
+        file_path="",
+        file_name="",
+        file_format=request.format,
+        status="queued",
+        options=request.model_dump(mode="json"),
+        created_by=uuid.uuid4(),
+    )
+
+    minio = FakeMinio()
+    session = FakeSession(lookup=project, rows=_section_rows(project.id, size, fixture))
+    timer = StageTimer()
+
+    iter_current_contents = section_service.iter_current_contents
+    convert = pdf_converter.docx_to_pdf_file
+    if opts["converter"] == "stub":
+        convert = stub_docx_to_pdf_file
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(export_service, "_get_minio", lambda: minio))
+        stack.enter_context(patch.object(
+            section_service, "iter_current_contents",
+            lambda *a, **kw: timer.wrap_aiter("load", iter_current_contents(*a, **kw)),
+        ))
+        stack.enter_context(patch.object(
+            export_service, "_add_sections",
+            timer.wrap_sync("build", export_service._add_sections),
+        ))
+        stack.enter_context(patch.object(
+            DocxBuilder, "save", timer.wrap_sync("save", DocxBuilder.save),
+        ))
+        stack.enter_context(patch.object(
+            pdf_converter, "docx_to_pdf_file", timer.wrap_async("convert", convert),
+        ))
+        stack.enter_context(patch.object(
+            pdf_converter, "add_watermark",
+            timer.wrap_sync("watermark", pdf_converter.add_watermark),
+        ))
+        stack.enter_context(patch.object(
+            export_service, "_upload", timer.wrap_sync("upload", export_service._upload),
+        ))
+
+        started = time.perf_counter()
+        await export_service._build_export(history, session)
+        wall = time.perf_counter() - started
+
+    stages = {name: timer.totals.get(name, 0.0) for name in STAGES}
+    stages["other"] = max(0.0, wall - sum(stages.values()))
+    return {
+        "status": history.status,
+        "wall": wall,
+        "stages": stages,
+        "file_format": history.file_format,
+        "pages": history.page_count or 0,
+        "output_mb": (history.file_size or 0) / (1024 * 1024),
+    }
+
+
+async def _run_repeats(size: str, fixture: list[dict], opts: dict) -> list[dict]:
+    # One event loop for all runs — the LibreOffice pool is bound to it
+    if opts["converter"] == "libreoffice":
+        await _start_libreoffice()
+    try:
+        if opts["warm_fragments"]:
+            await _run_once(size, fixture, opts)  # prime the fragment cache
+        return [await _run_once(size, fixture, opts) for _ in range(opts["repeat"])]
+    finally:
+        if opts["converter"] == "libreoffice":
+            from app.services import conversion_pool
+
+            await conversion_pool.shutdown()
+
+
+def run_case(size: str, file_format: str, opts: dict) -> dict:
+    """Benchmark one proposal size; safe to call in a worker process."""
+    from app.core.config import settings
+    from app.services import conversion_pool, fragment_cache
+    import app.services.export_service  # noqa: F401 — keep imports out of ΔRSS
+
+    opts = {**opts, "format": file_format}
+    if opts["converter"] == "auto":
+        available = conversion_pool.get_pool().available
+        opts["converter"] = "libreoffice" if available else "stub"
+
+    # Generate content before measuring so it doesn't count toward ΔRSS
+    fixture = proposal_sections(PROPOSAL_SIZES[size])
+    content_mb = sum(len(s["content"].encode("utf-8")) for s in fixture) / (1024 * 1024)
+
+    # Never answer from the artifact cache; fragments start cold unless primed
+    settings.EXPORT_CACHE_ENABLED = False
+    settings.EXPORT_WATERMARK_MODE = opts["watermark_mode"]
+    fragment_dir = tempfile.TemporaryDirectory(prefix="aipg-bench-fragments-")
+    settings.EXPORT_FRAGMENT_CACHE_DIR = fragment_dir.name
+    fragment_cache.clear_memory()
+
+    rss_before = peak_rss_mb()
+    if opts["tracemalloc"]:
+        tracemalloc.start()
+
+    profile_path = None
+    if opts["profile_dir"]:
+        profile_path = Path(opts["profile_dir"]) / f"export-{size}-{file_format}.prof"
+
+    try:
+        with maybe_profile(profile_path):
+            runs = asyncio.run(_run_repeats(size, fixture, opts))
+    finally:
+        fragment_dir.cleanup()
+
+    heap_peak = None
+    if opts["tracemalloc"]:
+        heap_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    # Report the median run so one slow outlier doesn't skew stage numbers
+    runs.sort(key=lambda r: r["wall"])
+    median = runs[len(runs) // 2]
+    median.update({
+        "size": size,
+        "format": file_format,
+        "sections": len(fixture),
+        "content_mb": content_mb,
+        "converter": opts["converter"] if file_format == "pdf" else "-",
+        "walls": [r["wall"] for r in runs],
+        "rss_peak_mb": peak_rss_mb(),
+        "rss_delta_mb": peak_rss_mb() - rss_before,
+        "heap_peak_mb": heap_peak,
+        "profile": str(profile_path) if profile_path else None,
+    })
+    return median
+
+
+def _report(results: list[dict]) -> str:
+    headers = ["case", "sections", "content MB", "converter", "pages", "out MB", "wall s",
+               *STAGES, "other", "sections/s", "RSS MB", "ΔRSS MB"]
+    rows = []
+    for r in results:
+        wall = r["wall"] or 1e-9
+        rows.append([
+            f"{r['size']}-{r['format']}",
+            str(r["sections"]),
+            f"{r['content_mb']:.2f}",
+            r["converter"],
+            str(r["pages"]),
+            f"{r['output_mb']:.2f}",
+            f"{r['wall']:.3f}",
+            *(f"{r['stages'][s]:.3f}" for s in (*STAGES, "other")),
+            f"{r['sections'] / wall:.1f}",
+            f"{r['rss_peak_mb']:.0f}",
+            f"{r['rss_delta_mb']:.0f}",
+        ])
+    return format_table(headers, rows)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default=",".join(PROPOSAL_SIZES),
+                        help=f"comma-separated sizes ({','.join(PROPOSAL_SIZES)})")
+    parser.add_argument("--formats", default=",".join(FORMATS),
+                        help="comma-separated output formats (docx,pdf)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="runs per case; the median is reported")
+    parser.add_argument("--converter", choices=CONVERTERS, default="auto",
+                        help="PDF conversion: LibreOffice when installed, else the stub")
+    parser.add_argument("--watermark", default="機密文件",
+                        help="watermark text for PDF exports ('' for none)")
+    parser.add_argument("--watermark-mode", default="xobject",
+                        help="EXPORT_WATERMARK_MODE (xobject or stamp)")
+    parser.add_argument("--warm-fragments", action="store_true",
+                        help="prime the section fragment cache with an untimed run")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report peak Python heap (slower)")
+    parser.add_argument("--profile", type=Path, default=None, metavar="DIR",
+                        help="write a cProfile .prof per case into DIR")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="run cases in this process (for py-spy); RSS is cumulative")
+    parser.add_argument("--json", type=Path, default=None,
+                        help="write raw results as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [s for s in args.sizes.split(",") if s]
+    formats = [f for f in args.formats.split(",") if f]
+    for s in sizes:
+        if s not in PROPOSAL_SIZES:
+            parser.error(f"unknown size: {s}")
+    for f in formats:
+        if f not in FORMATS:
+            parser.error(f"unknown format: {f}")
+
+    opts = {
+        "repeat": max(1, args.repeat),
+        "converter": args.converter,
+        "watermark": args.watermark,
+        "watermark_mode": args.watermark_mode,
+        "warm_fragments": args.warm_fragments,
+        "tracemalloc": args.tracemalloc,
+        "profile_dir": str(args.profile) if args.profile else None,
+    }
+
+    results = []
+    for size in sizes:
+        for file_format in formats:
+            print(f"running {size}-{file_format} ({PROPOSAL_SIZES[size]} sections)",
+                  file=sys.stderr)
+            if args.no_isolate:
+                result = run_case(size, file_format, opts)
+            else:
+                ctx = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    result = pool.submit(run_case, size, file_format, opts).result()
+            results.append(result)
+
+    print(_report(results))
+    failed = [r for r in results if r["status"] != "completed"]
+    for r in failed:
+        print(f"{r['size']}-{r['format']}: export ended with status {r['status']}")
+    if any(r["heap_peak_mb"] is not None for r in results):
+        for r in results:
+            print(f"{r['size']}-{r['format']}: peak Python heap {r['heap_peak_mb']:.1f} MB")
+    if results and opts["repeat"] > 1:
+        for r in results:
+            spread = statistics.pstdev(r["walls"]) if len(r["walls"]) > 1 else 0.0
+            print(f"{r['size']}-{r['format']}: wall min {min(r['walls']):.3f}s ± {spread:.3f}s")
+    if args.profile:
+        print(f"profiles written to {args.profile} (view with `python -m pstats` or snakeviz)")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Deterministic tender-document fixtures of increasing size, and synthetic
+proposal outlines for the export benchmark.
+
+Files are generated once into a cache directory and reused; the same seed
+always produces byte-identical content, so runs are comparable.
+"""
+
+import random
+from pathlib import Path
+
+SIZES = {
+    "small": 10,
+    "medium": 100,
+    "large": 500,
+}
+
+FILE_TYPES = ("pdf", "docx", "xlsx")
+
+_WORDS = (
+    "本案 系統 建置 需求 廠商 應 提供 資料 服務 維運 資訊 安全 管理 機制 "
+    "平台 整合 介接 功能 規格 驗收 教育訓練 保固 期間 專案 進度 報告 文件 "
+    "使用者 權限 備份 還原 效能 監控 雲端 架構 網路 防火牆 稽核 紀錄 "
+    "並 且 於 之 及 與 為 得 依 契約 規定 辦理"
+).split()
+
+PROPOSAL_SIZES = {
+    "small": 50,
+    "medium": 150,
+    "large": 300,
+}
+
+_PARAGRAPHS_PER_PAGE = 8
+_ROWS_PER_PAGE = 40
+_ROWS_PER_SHEET = 2000
+
+
+def _sentence(rng: random.Random) -> str:
+    return "".join(rng.choice(_WORDS) for _ in range(rng.randint(12, 30))) + "。"
+
+
+def _paragraph(rng: random.Random) -> str:
+    return "".join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+
+
+def _write_pdf(path: Path, pages: int, rng: random.Random) -> None:
+    import fitz
+
+    doc = fitz.open()
+    for page_no in range(1, pages + 1):
+        page = doc.new_page()
+        text = f"第 {page_no} 頁\n\n" + "\n".join(
+            _paragraph(rng) for _ in range(_PARAGRAPHS_PER_PAGE // 2)
+        )
+        page.insert_textbox(
+            page.rect + (50, 50, -50, -50), text, fontname="china-t", fontsize=9
+        )
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+
+
+def _write_docx(path: Path, pages: int, rng: random.Random) -> None:
+    from docx import Document
+
+    doc = Document()
+    for page_no in range(1, pages + 1):
+        doc.add_heading(f"第 {page_no} 章 系統需求", level=1)
+        for _ in range(_PARAGRAPHS_PER_PAGE):
+            doc.add_paragraph(_paragraph(rng))
+        if page_no % 5 == 0:
+            table = doc.add_table(rows=6, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(_WORDS) + rng.choice(_WORDS)
+        if page_no < pages:
+            doc.add_page_break()
+    doc.save(str(path))
+
+
+def _write_xlsx(path: Path, pages: int, rng: random.Random) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    total_rows = pages * _ROWS_PER_PAGE
+    for sheet_start in range(0, total_rows, _ROWS_PER_SHEET):
+        ws = wb.create_sheet(f"工作表{sheet_start // _ROWS_PER_SHEET + 1}")
+        ws.append(["項次", "項目", "規格說明", "數量", "單價"])
+        for i in range(sheet_start, min(sheet_start + _ROWS_PER_SHEET, total_rows)):
+            ws.append([
+                i + 1,
+                rng.choice(_WORDS) + rng.choice(_WORDS),
+                _sentence(rng),
+                rng.randint(1, 50),
+                rng.randint(1_000, 500_000),
+            ])
+    wb.save(str(path))
+
+
+_WRITERS = {
+    "pdf": _write_pdf,
+    "docx": _write_docx,
+    "xlsx": _write_xlsx,
+}
+
+
+def ensure_fixture(cache_dir: Path, file_type: str, size: str, seed: int = 42) -> Path:
+    """Return the path of the fixture, generating it on first use."""
+    pages = SIZES[size]
+    path = cache_dir / f"tender-{size}-{pages}p-s{seed}.{file_type}"
+    if not path.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp.{file_type}")
+        _WRITERS[file_type](tmp, pages, random.Random(f"{seed}:{file_type}:{size}"))
+        tmp.replace(path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Proposal outlines
+# ---------------------------------------------------------------------------
+
+_SECTIONS_PER_CHAPTER = 10
+
+
+def _section_content(rng: random.Random) -> str:
+    """Markdown the way the generator writes it: paragraphs, a bullet or
+    numbered list, a sub-heading, and now and then a pipe table."""
+    blocks = [_paragraph(rng) for _ in range(rng.randint(3, 6))]
+    items = [_sentence(rng) for _ in range(rng.randint(3, 6))]
+    if rng.random() < 0.5:
+        blocks.append("\n".join(f"- {item}" for item in items))
+    else:
+        blocks.append("\n".join(f"{i}. {item}" for i, item in enumerate(items, 1)))
+    blocks.append("### " + rng.choice(_WORDS) + rng.choice(_WORDS) + "說明")
+    blocks.extend(_paragraph(rng) for _ in range(rng.randint(1, 3)))
+    if rng.random() < 0.3:
+        rows = ["| 項次 | 項目 | 規格說明 | 數量 |", "| --- | --- | --- | --- |"]
+        rows.extend(
+            f"| {i} | {rng.choice(_WORDS)}{rng.choice(_WORDS)} | {_sentence(rng)} | "
+            f"{rng.randint(1, 50)} |"
+            for i in range(1, rng.randint(4, 12))
+        )
+        blocks.append("\n".join(rows))
+    return "\n\n".join(blocks)
+
+
+def proposal_sections(count: int, seed: int = 42) -> list[dict]:
+    """``count`` sections in sort order: a chapter (depth 0) every
+    ``_SECTIONS_PER_CHAPTER`` sections, the rest alternating depth 1 and 2.
+    Each dict has ``chapter_number``, ``title``, ``depth_level`` and
+    ``content``."""
+    rng = random.Random(f"{seed}:proposal:{count}")
+    sections = []
+    chapter = sub = subsub = 0
+    for i in range(count):
+        if i % _SECTIONS_PER_CHAPTER == 0:
+            chapter, sub, subsub = chapter + 1, 0, 0
+            number, depth = f"{chapter}", 0
+        elif i % 3 == 0 and sub:
+            subsub += 1
+            number, depth = f"{chapter}.{sub}.{subsub}", 2
+        else:
+            sub, subsub = sub + 1, 0
+            number, depth = f"{chapter}.{sub}", 1
+        sections.append({
+            "chapter_number": number,
+            "title": "".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 6))),
+            "depth_level": depth,
+            "content": _section_content(rng),
+        })
+    return sections
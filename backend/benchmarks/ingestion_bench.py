@@ -0,0 +1,270 @@
+"""
+Ingestion benchmark — time ``document_service.process_document`` end to end.
+
+Each case (file type × size) runs in a fresh process so peak RSS belongs to
+that case alone.  Reported per case:
+
+* exclusive wall time per stage: download, parse, ocr, page_store, chunk,
+  embed, db (statement compile + row bind processing), other
+* pages/s and chunks/s over the whole call
+* peak RSS, and with ``--tracemalloc`` the peak Python heap
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.ingestion_bench
+    python -m benchmarks.ingestion_bench --types docx --sizes large --repeat 3
+    python -m benchmarks.ingestion_bench --profile /tmp/ingest-prof
+    python -m benchmarks.ingestion_bench --json baseline.json
+
+``--profile DIR`` writes one cProfile ``.prof`` per case.  For py-spy, run a
+single case in-process so the sampler sees the work::
+
+    py-spy record -f speedscope -o ingest.json -- \\
+        python -m benchmarks.ingestion_bench --no-isolate --types pdf --sizes large
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmarks.common import (
+    FakeMinio,
+    FakeSession,
+    StageTimer,
+    format_table,
+    make_fake_embedder,
+    maybe_profile,
+    peak_rss_mb,
+)
+from benchmarks.fixtures import FILE_TYPES, SIZES, ensure_fixture
+
+STAGES = ("download", "parse", "ocr", "page_store", "chunk", "embed", "db")
+DEFAULT_FIXTURES_DIR = Path("/tmp/aipg-bench-fixtures")
+
+
+async def _run_once(fixture: Path, file_type: str, opts: dict) -> dict:
+    from app.core.config import settings
+    from app.models.document import Document
+    from app.services import (
+        document_service,
+        embedding_service,
+        ocr_service,
+        page_store,
+        parser_service,
+        rag_service,
+    )
+
+    settings.OCR_ENABLED = opts["ocr"]
+
+    minio = FakeMinio()
+    doc = Document(
+        id=uuid.uuid4(),
+        project_id=uuid.uuid4(),
+        filename=fixture.name,
+        original_filename=fixture.name,
+        file_type=file_type,
+        file_size=fixture.stat().st_size,
+        file_path=f"bench/{fixture.name}",
+        uploaded_by=uuid.uuid4(),
+    )
+    minio.fput_object(settings.BUCKET_TENDER_DOCS, doc.file_path, str(fixture))
+    session = FakeSession(lookup=doc)
+    timer = StageTimer()
+
+    iter_records = parser_service.iter_records
+    iter_chunks = rag_service.iter_chunks
+    minio.fget_object = timer.wrap_sync("download", minio.fget_object)
+    session.execute = timer.wrap_async("db", session.execute)
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(document_service, "_get_minio", lambda: minio))
+        stack.enter_context(patch.object(page_store, "get_minio", lambda: minio))
+        stack.enter_context(patch.object(
+            parser_service, "iter_records",
+            lambda *a, **kw: timer.wrap_iter("parse", iter_records(*a, **kw)),
+        ))
+        stack.enter_context(patch.object(
+            parser_service, "parse_pdf_pages",
+            timer.wrap_sync("parse", parser_service.parse_pdf_pages),
+        ))
+        stack.enter_context(patch.object(
+            ocr_service, "ocr_scanned_pages",
+            timer.wrap_async("ocr", ocr_service.ocr_scanned_pages),
+        ))
+        stack.enter_context(patch.object(
+            rag_service, "iter_chunks",
+            lambda *a, **kw: timer.wrap_iter("chunk", iter_chunks(*a, **kw)),
+        ))
+        stack.enter_context(patch.object(
+            page_store.PageWriter, "feed",
+            timer.wrap_sync("page_store", page_store.PageWriter.feed),
+        ))
+        stack.enter_context(patch.object(
+            page_store.PageWriter, "save",
+            timer.wrap_async("page_store", page_store.PageWriter.save),
+        ))
+        stack.enter_context(patch.object(
+            embedding_service, "embed_chunks",
+            timer.wrap_async("embed", make_fake_embedder(opts["embed_dim"], opts["embed_latency_ms"])),
+        ))
+
+        started = time.perf_counter()
+        result = await document_service.process_document(doc.id, session)
+        wall = time.perf_counter() - started
+
+    stages = {name: timer.totals.get(name, 0.0) for name in STAGES}
+    stages["other"] = max(0.0, wall - sum(stages.values()))
+    return {
+        "status": result.status,
+        "wall": wall,
+        "stages": stages,
+        "pages": result.page_count or 0,
+        "chunks": result.chunk_count or 0,
+        "content_length": result.content_length or 0,
+        "rows_inserted": session.inserted_rows,
+    }
+
+
+def run_case(file_type: str, size: str, fixture: str, opts: dict) -> dict:
+    """Benchmark one fixture; safe to call in a worker process."""
+    import app.services.document_service  # noqa: F401 — keep imports out of ΔRSS
+
+    fixture_path = Path(fixture)
+    rss_before = peak_rss_mb()
+    if opts["tracemalloc"]:
+        tracemalloc.start()
+
+    profile_path = None
+    if opts["profile_dir"]:
+        profile_path = Path(opts["profile_dir"]) / f"ingest-{file_type}-{size}.prof"
+
+    runs = []
+    with maybe_profile(profile_path):
+        for _ in range(opts["repeat"]):
+            runs.append(asyncio.run(_run_once(fixture_path, file_type, opts)))
+
+    heap_peak = None
+    if opts["tracemalloc"]:
+        heap_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    # Report the median run so one slow outlier doesn't skew stage numbers
+    runs.sort(key=lambda r: r["wall"])
+    median = runs[len(runs) // 2]
+    median.update({
+        "type": file_type,
+        "size": size,
+        "file_mb": fixture_path.stat().st_size / (1024 * 1024),
+        "walls": [r["wall"] for r in runs],
+        "rss_peak_mb": peak_rss_mb(),
+        "rss_delta_mb": peak_rss_mb() - rss_before,
+        "heap_peak_mb": heap_peak,
+        "profile": str(profile_path) if profile_path else None,
+    })
+    return median
+
+
+def _report(results: list[dict]) -> str:
+    headers = ["case", "MB", "pages", "chunks", "wall s", *STAGES, "other",
+               "pages/s", "chunks/s", "RSS MB", "ΔRSS MB"]
+    rows = []
+    for r in results:
+        wall = r["wall"] or 1e-9
+        rows.append([
+            f"{r['type']}-{r['size']}",
+            f"{r['file_mb']:.1f}",
+            str(r["pages"]),
+            str(r["chunks"]),
+            f"{r['wall']:.3f}",
+            *(f"{r['stages'][s]:.3f}" for s in (*STAGES, "other")),
+            f"{r['pages'] / wall:.1f}",
+            f"{r['chunks'] / wall:.1f}",
+            f"{r['rss_peak_mb']:.0f}",
+            f"{r['rss_delta_mb']:.0f}",
+        ])
+    return format_table(headers, rows)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--types", default=",".join(FILE_TYPES),
+                        help="comma-separated file types (pdf,docx,xlsx)")
+    parser.add_argument("--sizes", default=",".join(SIZES),
+                        help=f"comma-separated sizes ({','.join(SIZES)})")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="runs per case; the median is reported")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0,
+                        help="simulated embedding API latency per batch")
+    parser.add_argument("--embed-dim", type=int, default=1536)
+    parser.add_argument("--ocr", action="store_true",
+                        help="leave OCR enabled (needs tesseract on PATH)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report peak Python heap (slower)")
+    parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--profile", type=Path, default=None, metavar="DIR",
+                        help="write a cProfile .prof per case into DIR")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="run cases in this process (for py-spy); RSS is cumulative")
+    parser.add_argument("--json", type=Path, default=None,
+                        help="write raw results as JSON")
+    args = parser.parse_args(argv)
+
+    types = [t for t in args.types.split(",") if t]
+    sizes = [s for s in args.sizes.split(",") if s]
+    for t in types:
+        if t not in FILE_TYPES:
+            parser.error(f"unknown type: {t}")
+    for s in sizes:
+        if s not in SIZES:
+            parser.error(f"unknown size: {s}")
+
+    opts = {
+        "repeat": max(1, args.repeat),
+        "embed_latency_ms": args.embed_latency_ms,
+        "embed_dim": args.embed_dim,
+        "ocr": args.ocr,
+        "tracemalloc": args.tracemalloc,
+        "profile_dir": str(args.profile) if args.profile else None,
+    }
+
+    results = []
+    for file_type in types:
+        for size in sizes:
+            # Generate fixtures in the parent so it doesn't count toward RSS
+            fixture = ensure_fixture(args.fixtures_dir, file_type, size)
+            print(f"running {file_type}-{size} ({fixture.name})", file=sys.stderr)
+            if args.no_isolate:
+                result = run_case(file_type, size, str(fixture), opts)
+            else:
+                ctx = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    result = pool.submit(run_case, file_type, size, str(fixture), opts).result()
+            results.append(result)
+
+    print(_report(results))
+    if any(r["heap_peak_mb"] is not None for r in results):
+        for r in results:
+            print(f"{r['type']}-{r['size']}: peak Python heap {r['heap_peak_mb']:.1f} MB")
+    if len(results) and opts["repeat"] > 1:
+        for r in results:
+            spread = statistics.pstdev(r["walls"]) if len(r["walls"]) > 1 else 0.0
+            print(f"{r['type']}-{r['size']}: wall min {min(r['walls']):.3f}s ± {spread:.3f}s")
+    if args.profile:
+        print(f"profiles written to {args.profile} (view with `python -m pstats` or snakeviz)")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
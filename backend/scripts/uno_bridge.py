@@ -0,0 +1,92 @@
+"""
+UNO bridge — drives one warm LibreOffice instance for the conversion pool.
+
+Runs under the *system* Python that ships ``python3-uno``, not the app
+interpreter, so it must not import anything from ``app``.  Started as::
+
+    python3 scripts/uno_bridge.py <port> <connect_timeout_seconds>
+
+It prints one JSON line ``{"ready": true}`` once connected, then reads JSON
+requests from stdin and answers each with one JSON line:
+
+    {"op": "convert", "src": "/tmp/x/input.docx", "dst": "/tmp/x/input.pdf"}
+    {"op": "ping"}
+"""
+
+import json
+import sys
+import time
+
+import uno
+from com.sun.star.beans import PropertyValue
+
+
+def _prop(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _reply(payload):
+    sys.stdout.write(json.dumps(payload) + "\n")
+    sys.stdout.flush()
+
+
+def _connect(port, timeout):
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local
+    )
+    url = f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            ctx = resolver.resolve(url)
+            return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+        except Exception:
+            # soffice is still starting up
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.25)
+
+
+def _convert(desktop, src, dst):
+    doc = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(src), "_blank", 0, (_prop("Hidden", True),)
+    )
+    if doc is None:
+        raise RuntimeError("LibreOffice could not open the document")
+    try:
+        doc.storeToURL(
+            uno.systemPathToFileUrl(dst), (_prop("FilterName", "writer_pdf_Export"),)
+        )
+    finally:
+        doc.close(True)
+
+
+def main():
+    port = int(sys.argv[1])
+    timeout = float(sys.argv[2])
+    try:
+        desktop = _connect(port, timeout)
+    except Exception as e:
+        _reply({"ready": False, "error": str(e)})
+        return 1
+    _reply({"ready": True})
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            if request.get("op") == "ping":
+                desktop.getFrames()
+            else:
+                _convert(desktop, request["src"], request["dst"])
+            _reply({"ok": True})
+        except Exception as e:
+            _reply({"ok": False, "error": str(e)})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -51,7 +51,9 @@ api.interceptors.response.use(
     } else if (error.response?.status >= 500) {
       ElMessage.error('伺服器錯誤，請稍後再試')
     } else if (error.response?.data?.detail) {
-      ElMessage.error(error.response.data.detail)
+      // 409 conflicts carry { message, current }
+      const detail = error.response.data.detail
+      ElMessage.error(detail.message ?? detail)
     }
 
     return Promise.reject(error)
@@ -13,8 +13,10 @@ export const projectApi = {
     return api.post('/api/v1/projects/', data)
   },
 
-  updateProject(id, data) {
-    return api.put(`/api/v1/projects/${id}`, data)
+  // With rowVersion, 409 if someone else saved meanwhile
+  updateProject(id, data, rowVersion) {
+    const headers = rowVersion == null ? {} : { 'If-Match': `"${rowVersion}"` }
+    return api.put(`/api/v1/projects/${id}`, data, { headers })
   },
 
   deleteProject(id) {
@@ -23,5 +25,10 @@ export const projectApi = {
 
   getBudget(id) {
     return api.get(`/api/v1/projects/${id}/budget`)
+  },
+
+  // Status counts, written vs estimated, coverage and tokens per chapter
+  getProgress(id) {
+    return api.get(`/api/v1/projects/${id}/progress`)
   }
 }
@@ -0,0 +1,70 @@
+import { useAuthStore } from '@/stores/auth'
+
+const HEARTBEAT_MS = 20000
+const RECONNECT_MS = 3000
+
+function socketUrl(projectId, token) {
+  const base = (import.meta.env.VITE_API_URL || 'http://localhost:8000').replace(/^http/, 'ws')
+  return `${base}/api/v1/realtime/projects/${projectId}?token=${encodeURIComponent(token)}`
+}
+
+// Subscribe to a project's lock / version / status events.
+// onEvent receives every message; the first one (and any after a
+// reconnect) is { type: 'snapshot', locks: [...] }.
+// While editing, call holdLock(sectionId) after sectionApi.lockSection so
+// the lock is renewed by heartbeat; releaseLock() stops renewing it (see
+// SectionEditor.vue).  Without the socket, repeat lockSection instead.
+export function connectProjectEvents(projectId, onEvent) {
+  const authStore = useAuthStore()
+  let socket = null
+  let closed = false
+  let heldSection = null
+  let heartbeatTimer = null
+  let reconnectTimer = null
+
+  function send(message) {
+    if (socket?.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify(message))
+    }
+  }
+
+  function heartbeat() {
+    if (heldSection) send({ type: 'heartbeat', section_id: heldSection })
+  }
+
+  function open() {
+    socket = new WebSocket(socketUrl(projectId, authStore.token))
+    socket.onopen = heartbeat
+    socket.onmessage = (e) => onEvent(JSON.parse(e.data))
+    socket.onclose = (e) => {
+      socket = null
+      if (closed) return
+      // 4403: not a member of the project — retrying will not help
+      if (e.code === 4403) return
+      // 4401: token expired — refresh before reconnecting
+      const retry = e.code === 4401 && authStore.refreshToken
+        ? authStore.doRefreshToken().catch(() => {})
+        : Promise.resolve()
+      reconnectTimer = setTimeout(() => retry.then(() => !closed && open()), RECONNECT_MS)
+    }
+  }
+
+  open()
+  heartbeatTimer = setInterval(heartbeat, HEARTBEAT_MS)
+
+  return {
+    holdLock(sectionId) {
+      heldSection = sectionId
+      heartbeat()
+    },
+    releaseLock() {
+      heldSection = null
+    },
+    close() {
+      closed = true
+      clearInterval(heartbeatTimer)
+      clearTimeout(reconnectTimer)
+      socket?.close()
+    }
+  }
+}
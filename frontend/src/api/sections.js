@@ -6,19 +6,41 @@ export const sectionApi = {
     return api.get(`/api/v1/sections/tree/${projectId}`)
   },
 
+  // Estimated pages per section against the planned page budget
+  getPageBudget(projectId) {
+    return api.get(`/api/v1/sections/page-budget/${projectId}`)
+  },
+
   // Get single section
   getSection(sectionId) {
     return api.get(`/api/v1/sections/${sectionId}`)
   },
 
+  // A section and everything below it, in document order
+  getSubtree(sectionId) {
+    return api.get(`/api/v1/sections/${sectionId}/subtree`)
+  },
+
+  // Chapters containing a section, outermost first (breadcrumbs)
+  getAncestors(sectionId) {
+    return api.get(`/api/v1/sections/${sectionId}/ancestors`)
+  },
+
+  // Full-text search of current content: { query, items, total };
+  // params: project_id, limit, offset
+  search(q, params = {}) {
+    return api.get('/api/v1/sections/search', { params: { q, ...params } })
+  },
+
   // Create section (project_id in body)
   createSection(data) {
     return api.post('/api/v1/sections/', data)
   },
 
-  // Update section
-  updateSection(sectionId, data) {
-    return api.put(`/api/v1/sections/${sectionId}`, data)
+  // Update section; with rowVersion, 409 if someone else saved meanwhile
+  updateSection(sectionId, data, rowVersion) {
+    const headers = rowVersion == null ? {} : { 'If-Match': `"${rowVersion}"` }
+    return api.put(`/api/v1/sections/${sectionId}`, data, { headers })
   },
 
   // Delete section
@@ -31,6 +53,12 @@ export const sectionApi = {
     return api.put('/api/v1/sections/reorder', { items })
   },
 
+  // Bulk changes in one request: items = [{id, sort_order?, parent_id?,
+  // depth_level?, status?, assigned_to?}, ...]; omitted fields are kept
+  bulkUpdate(projectId, items) {
+    return api.post('/api/v1/sections/bulk', { project_id: projectId, items })
+  },
+
   // Lock / unlock
   lockSection(sectionId) {
     return api.post(`/api/v1/sections/${sectionId}/lock`)
@@ -45,6 +73,27 @@ export const sectionApi = {
     return api.get(`/api/v1/sections/${sectionId}/versions`)
   },
 
+  // Metadata only, newest first: { items, total }
+  getVersionHistory(sectionId, params = {}) {
+    return api.get(`/api/v1/sections/${sectionId}/versions/history`, { params })
+  },
+
+  getVersion(sectionId, versionId) {
+    return api.get(`/api/v1/sections/${sectionId}/versions/${versionId}`)
+  },
+
+  // Word-level diff computed on the server: { ops: [{op, text}], ... }
+  diffVersions(sectionId, fromVersionId, toVersionId) {
+    return api.get(`/api/v1/sections/${sectionId}/versions/diff`, {
+      params: { from_version_id: fromVersionId, to_version_id: toVersionId }
+    })
+  },
+
+  // Three-way merge; data = { ours_version_id, theirs_version_id, base_version_id?, save? }
+  mergeVersions(sectionId, data) {
+    return api.post(`/api/v1/sections/${sectionId}/versions/merge`, data)
+  },
+
   createVersion(sectionId, data) {
     return api.post(`/api/v1/sections/${sectionId}/versions`, data)
   },
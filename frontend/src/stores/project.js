@@ -57,16 +57,29 @@ export const useProjectStore = defineStore('project', () => {
     return response.data
   }
 
-  async function updateProject(id, data) {
-    const response = await projectApi.updateProject(id, data)
-    const index = projects.value.findIndex(p => p.id === id)
+  function storeProject(project) {
+    const index = projects.value.findIndex(p => p.id === project.id)
     if (index !== -1) {
-      projects.value[index] = response.data
+      projects.value[index] = project
     }
-    if (currentProject.value?.id === id) {
-      currentProject.value = response.data
+    if (currentProject.value?.id === project.id) {
+      currentProject.value = project
+    }
+  }
+
+  async function updateProject(id, data) {
+    const known = currentProject.value?.id === id
+      ? currentProject.value
+      : projects.value.find(p => p.id === id)
+    try {
+      const response = await projectApi.updateProject(id, data, known?.row_version)
+      storeProject(response.data)
+      return response.data
+    } catch (e) {
+      // Someone else saved first: keep their version so a retry applies on top
+      if (e.response?.status === 409) storeProject(e.response.data.detail.current)
+      throw e
     }
-    return response.data
   }
 
   async function deleteProject(id) {
@@ -103,16 +116,29 @@ export const useProjectStore = defineStore('project', () => {
     return response.data
   }
 
-  async function updateSection(sectionId, data) {
-    const response = await sectionApi.updateSection(sectionId, data)
-    const index = sections.value.findIndex(s => s.id === sectionId)
+  function storeSection(section) {
+    const index = sections.value.findIndex(s => s.id === section.id)
     if (index !== -1) {
-      sections.value[index] = response.data
+      sections.value[index] = section
     }
-    if (currentSection.value?.id === sectionId) {
-      currentSection.value = response.data
+    if (currentSection.value?.id === section.id) {
+      currentSection.value = section
+    }
+  }
+
+  async function updateSection(sectionId, data) {
+    const known = currentSection.value?.id === sectionId
+      ? currentSection.value
+      : sections.value.find(s => s.id === sectionId)
+    try {
+      const response = await sectionApi.updateSection(sectionId, data, known?.row_version)
+      storeSection(response.data)
+      return response.data
+    } catch (e) {
+      // Someone else saved first: keep their version so a retry applies on top
+      if (e.response?.status === 409) storeSection(e.response.data.detail.current)
+      throw e
     }
-    return response.data
   }
 
   async function deleteSection(sectionId) {
@@ -111,6 +111,9 @@ CREATE TABLE IF NOT EXISTS sections (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
     parent_id UUID REFERENCES sections(id) ON DELETE CASCADE,
+    -- Ancestor ids (dashless hex) joined by '.', ending with its own id;
+    -- maintained by refresh_section_paths()
+    path TEXT COLLATE "C",
     chapter_number VARCHAR(20) NOT NULL,
     title VARCHAR(500) NOT NULL,
     requirement_text TEXT,
@@ -125,9 +128,13 @@ CREATE TABLE IF NOT EXISTS sections (
     locked_by UUID REFERENCES users(id),
     locked_at TIMESTAMP WITH TIME ZONE,
     lock_expires_at TIMESTAMP WITH TIME ZONE,
+    -- Progress inputs, maintained by triggers
+    content_chars INT NOT NULL DEFAULT 0,
+    tokens_used BIGINT NOT NULL DEFAULT 0,
+    requirement_links INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
-    UNIQUE(project_id, chapter_number)
+    UNIQUE(project_id, chapter_number) DEFERRABLE INITIALLY IMMEDIATE
 );
 
 CREATE INDEX IF NOT EXISTS idx_sections_project ON sections(project_id);
@@ -138,8 +145,11 @@ CREATE TABLE IF NOT EXISTS section_versions (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     section_id UUID NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
     version_number INT NOT NULL,
-    content TEXT NOT NULL,
+    -- NULL once compacted to delta (see app/services/version_store.py)
+    content TEXT,
     content_html TEXT,
+    delta BYTEA,
+    storage VARCHAR(10) NOT NULL DEFAULT 'full',
     source_type version_source NOT NULL,
     created_by UUID NOT NULL REFERENCES users(id),
     persona_id UUID,
@@ -266,18 +276,235 @@ CREATE TABLE IF NOT EXISTS usage_logs (
 CREATE INDEX IF NOT EXISTS idx_usage_logs_user ON usage_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_usage_logs_project ON usage_logs(project_id);
 
+-- Uploaded Documents (tender files, historical proposals)
+CREATE TABLE IF NOT EXISTS documents (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    filename VARCHAR(500) NOT NULL,
+    original_filename VARCHAR(500) NOT NULL,
+    file_type VARCHAR(20) NOT NULL,
+    file_size BIGINT NOT NULL DEFAULT 0,
+    file_path VARCHAR(1000) NOT NULL,
+    content_text TEXT,
+    is_parsed BOOLEAN NOT NULL DEFAULT FALSE,
+    parsed_at TIMESTAMP WITH TIME ZONE,
+    chunk_count INT NOT NULL DEFAULT 0,
+    uploaded_by UUID NOT NULL REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_documents_project ON documents(project_id);
+
+-- Project Requirements (extracted from tender documents)
+CREATE TABLE IF NOT EXISTS project_requirements (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    document_id UUID REFERENCES documents(id) ON DELETE SET NULL,
+    requirement_key VARCHAR(50) NOT NULL,
+    content TEXT NOT NULL,
+    requirement_type VARCHAR(50) DEFAULT 'other',
+    source_text TEXT,
+    source_page INT,
+    priority VARCHAR(20) DEFAULT 'medium',
+    keywords JSON,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_project_requirements_project ON project_requirements(project_id);
+
+-- Section <-> Requirement Links
+CREATE TABLE IF NOT EXISTS section_requirement_links (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    section_id UUID NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
+    requirement_id UUID NOT NULL REFERENCES project_requirements(id) ON DELETE CASCADE,
+    relevance_score INT DEFAULT 0,
+    is_addressed BOOLEAN DEFAULT FALSE,
+    notes TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_by UUID REFERENCES users(id),
+    CONSTRAINT uq_section_requirement UNIQUE (section_id, requirement_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_section_requirement_links_requirement
+    ON section_requirement_links(requirement_id);
+
+-- Progress Roll-ups, kept current by triggers (see track_section_progress)
+CREATE TABLE IF NOT EXISTS chapter_progress (
+    chapter_id UUID PRIMARY KEY,  -- top-level section; no FK, rows go when empty
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    sections_total INT NOT NULL DEFAULT 0,
+    not_started INT NOT NULL DEFAULT 0,
+    writing INT NOT NULL DEFAULT 0,
+    review INT NOT NULL DEFAULT 0,
+    approved INT NOT NULL DEFAULT 0,
+    locked INT NOT NULL DEFAULT 0,
+    estimated_pages INT NOT NULL DEFAULT 0,
+    content_chars BIGINT NOT NULL DEFAULT 0,
+    tokens_used BIGINT NOT NULL DEFAULT 0,
+    requirement_links INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_chapter_progress_project ON chapter_progress(project_id);
+
+CREATE TABLE IF NOT EXISTS project_progress (
+    project_id UUID PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE,
+    requirements_total INT NOT NULL DEFAULT 0,
+    requirements_covered INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Section Versions: delta-compressed history
+ALTER TABLE section_versions ALTER COLUMN content DROP NOT NULL;
+ALTER TABLE section_versions ADD COLUMN IF NOT EXISTS delta BYTEA;
+ALTER TABLE section_versions ADD COLUMN IF NOT EXISTS storage VARCHAR(10) NOT NULL DEFAULT 'full';
+ALTER TABLE section_versions DROP CONSTRAINT IF EXISTS ck_section_versions_stored;
+ALTER TABLE section_versions ADD CONSTRAINT ck_section_versions_stored
+    CHECK (content IS NOT NULL OR delta IS NOT NULL);
+
+-- Section Versions: full-text search.  Chinese has no spaces for a parser
+-- to split on, so each run of CJK characters is indexed as overlapping
+-- bigrams (a lone character as itself) and other words as lowercase
+-- ASCII alphanumerics, all at consecutive positions so a phrase query is a
+-- chain of <-> over its bigrams.  search_service builds queries with the
+-- same rules.  Compacted versions have no content and so no vector; the
+-- current version is always materialized.
+CREATE OR REPLACE FUNCTION section_search_vector(p_content TEXT)
+RETURNS tsvector AS $$
+DECLARE
+    v_run TEXT;
+    v_terms TEXT[] := '{}';
+    v_pos INT := 0;
+    i INT;
+BEGIN
+    IF p_content IS NULL THEN
+        RETURN NULL;
+    END IF;
+    FOR v_run IN
+        SELECT m[1] FROM regexp_matches(
+            lower(p_content),
+            '([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+|[a-z0-9]+)',
+            'g'
+        ) AS m
+    LOOP
+        IF v_run ~ '^[a-z0-9]' THEN
+            -- tsvector input rejects lexemes of 2 KB or more (hashes,
+            -- pasted data); they are not worth searching for anyway
+            IF octet_length(v_run) > 2046 THEN
+                CONTINUE;
+            END IF;
+            v_pos := v_pos + 1;
+            v_terms := v_terms || (quote_literal(v_run) || ':' || LEAST(v_pos, 16383));
+        ELSIF char_length(v_run) = 1 THEN
+            v_pos := v_pos + 1;
+            v_terms := v_terms || (quote_literal(v_run) || ':' || LEAST(v_pos, 16383));
+        ELSE
+            FOR i IN 1 .. char_length(v_run) - 1 LOOP
+                v_pos := v_pos + 1;
+                v_terms := v_terms || (quote_literal(substr(v_run, i, 2)) || ':' || LEAST(v_pos, 16383));
+            END LOOP;
+        END IF;
+    END LOOP;
+    RETURN array_to_string(v_terms, ' ')::tsvector;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+ALTER TABLE section_versions ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (section_search_vector(content)) STORED;
+CREATE INDEX IF NOT EXISTS idx_section_versions_search ON section_versions
+    USING gin (search_vector);
+
+-- Sections: materialized path for subtree range scans.  Renumbering
+-- rewrites chapter numbers in one UPDATE, so their uniqueness is checked
+-- at the end of the statement rather than per row.
+ALTER TABLE sections ADD COLUMN IF NOT EXISTS path TEXT COLLATE "C";
+ALTER TABLE sections DROP CONSTRAINT IF EXISTS sections_project_id_chapter_number_key;
+ALTER TABLE sections ADD CONSTRAINT sections_project_id_chapter_number_key
+    UNIQUE (project_id, chapter_number) DEFERRABLE INITIALLY IMMEDIATE;
+CREATE INDEX IF NOT EXISTS idx_sections_path ON sections(project_id, path);
+
+-- Sections: progress inputs
+ALTER TABLE sections ADD COLUMN IF NOT EXISTS content_chars INT NOT NULL DEFAULT 0;
+ALTER TABLE sections ADD COLUMN IF NOT EXISTS tokens_used BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE sections ADD COLUMN IF NOT EXISTS requirement_links INT NOT NULL DEFAULT 0;
+
+-- Optimistic concurrency: bumped by every edit of a section's or
+-- project's own fields and sent to clients as the ETag; an update with a
+-- stale If-Match matches no row and is answered with 409
+ALTER TABLE sections ADD COLUMN IF NOT EXISTS row_version INT NOT NULL DEFAULT 1;
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS row_version INT NOT NULL DEFAULT 1;
+
+-- Export History: background job state + artifact cache
+ALTER TABLE IF EXISTS export_history ADD COLUMN IF NOT EXISTS stage VARCHAR(30);
+ALTER TABLE IF EXISTS export_history ADD COLUMN IF NOT EXISTS progress INT NOT NULL DEFAULT 0;
+ALTER TABLE IF EXISTS export_history ADD COLUMN IF NOT EXISTS cache_key VARCHAR(64);
+ALTER TABLE IF EXISTS export_history ADD COLUMN IF NOT EXISTS options JSONB DEFAULT '{}'::jsonb;
+ALTER TABLE IF EXISTS export_history ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP WITH TIME ZONE;
+-- Touched periodically by the process running the job
+ALTER TABLE IF EXISTS export_history ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE;
+DO $$ BEGIN
+    IF to_regclass('export_history') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_export_history_cache
+            ON export_history(project_id, cache_key) WHERE status = 'completed';
+        CREATE INDEX IF NOT EXISTS idx_export_history_active
+            ON export_history(status) WHERE status IN ('queued', 'running');
+    END IF;
+END $$;
+
 -- =============================================================================
 -- Functions
 -- =============================================================================
 
--- Get next version number
+-- Get next version number.  Locks the section row until the caller's
+-- transaction ends, so concurrent callers get consecutive numbers instead
+-- of the same MAX + 1 (each statement below sees rows committed meanwhile).
 CREATE OR REPLACE FUNCTION get_next_version_number(p_section_id UUID)
 RETURNS INT AS $$
 BEGIN
+    PERFORM 1 FROM sections WHERE id = p_section_id FOR UPDATE;
     RETURN COALESCE((SELECT MAX(version_number) + 1 FROM section_versions WHERE section_id = p_section_id), 1);
 END;
 $$ LANGUAGE plpgsql;
 
+-- Recompute the materialized paths of a project's sections from
+-- parent_id.  With p_renumber (after a move) depth_level and chapter_number
+-- also follow the tree: siblings are numbered 1, 2, … by sort_order under
+-- their parent's number.  Only rows that change are written; returns how
+-- many did.
+CREATE OR REPLACE FUNCTION refresh_section_paths(p_project_id UUID, p_renumber BOOLEAN DEFAULT FALSE)
+RETURNS INT AS $$
+DECLARE
+    v_count INT;
+BEGIN
+    WITH RECURSIVE ranked AS (
+        SELECT id, parent_id,
+               ROW_NUMBER() OVER (PARTITION BY parent_id ORDER BY sort_order, chapter_number, id) AS pos
+        FROM sections WHERE project_id = p_project_id
+    ), tree AS (
+        SELECT id, replace(id::text, '-', '') AS path, pos::text AS number, 0 AS depth
+        FROM ranked WHERE parent_id IS NULL
+        UNION ALL
+        SELECT r.id, t.path || '.' || replace(r.id::text, '-', ''), t.number || '.' || r.pos, t.depth + 1
+        FROM ranked r JOIN tree t ON r.parent_id = t.id
+    )
+    UPDATE sections s
+    SET path = t.path,
+        depth_level = CASE WHEN p_renumber THEN t.depth ELSE s.depth_level END,
+        chapter_number = CASE WHEN p_renumber THEN t.number ELSE s.chapter_number END
+    FROM tree t
+    WHERE s.id = t.id
+      AND (s.path IS DISTINCT FROM t.path
+           OR (p_renumber AND (s.depth_level <> t.depth OR s.chapter_number <> t.number)));
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill paths of sections saved before the column existed
+SELECT refresh_section_paths(p.id) FROM projects p
+WHERE EXISTS (SELECT 1 FROM sections s WHERE s.project_id = p.id AND s.path IS NULL);
+
 -- Check token budget
 CREATE OR REPLACE FUNCTION check_token_budget(p_project_id UUID, p_requested_tokens INT DEFAULT 0)
 RETURNS JSONB AS $$
@@ -298,10 +525,13 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Update project tokens trigger
+-- Update project tokens trigger (and the section's, for chapter roll-ups)
 CREATE OR REPLACE FUNCTION update_project_tokens() RETURNS TRIGGER AS $$
 BEGIN
     UPDATE projects SET used_tokens = used_tokens + NEW.total_tokens, updated_at = NOW() WHERE id = NEW.project_id;
+    IF NEW.section_id IS NOT NULL THEN
+        UPDATE sections SET tokens_used = tokens_used + NEW.total_tokens WHERE id = NEW.section_id;
+    END IF;
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
@@ -315,6 +545,208 @@ CREATE OR REPLACE FUNCTION update_updated_at() RETURNS TRIGGER AS $$
 BEGIN NEW.updated_at = NOW(); RETURN NEW; END;
 $$ LANGUAGE plpgsql;
 
+-- -----------------------------------------------------------------------------
+-- Progress counters
+--
+-- Every section adds its share (one section in its status, its estimated
+-- pages, content_chars, tokens_used, requirement_links) to the
+-- chapter_progress row of its top-level chapter, taken from its path.  A
+-- change subtracts the old share and adds the new one in the same
+-- transaction, so moves between chapters need no special handling.
+-- Requirement totals and coverage live in project_progress.
+-- rebuild_progress() recomputes everything for one project.
+-- -----------------------------------------------------------------------------
+
+-- Add (p_sign = 1) or remove (-1) one section's share of its chapter's counters
+CREATE OR REPLACE FUNCTION apply_section_progress(s sections, p_sign INT) RETURNS VOID AS $$
+DECLARE
+    v_chapter UUID;
+BEGIN
+    IF s.path IS NULL THEN
+        RETURN;  -- not placed in the tree yet
+    END IF;
+    v_chapter := substr(s.path, 1, 32)::uuid;
+    -- Only adds insert, so deletes cascading from a project never do
+    IF p_sign > 0 THEN
+        INSERT INTO chapter_progress (chapter_id, project_id) VALUES (v_chapter, s.project_id)
+        ON CONFLICT (chapter_id) DO NOTHING;
+    END IF;
+    UPDATE chapter_progress SET
+        sections_total = sections_total + p_sign,
+        not_started = not_started + CASE WHEN s.status = 'NotStarted' THEN p_sign ELSE 0 END,
+        writing = writing + CASE WHEN s.status = 'Writing' THEN p_sign ELSE 0 END,
+        review = review + CASE WHEN s.status = 'Review' THEN p_sign ELSE 0 END,
+        approved = approved + CASE WHEN s.status = 'Approved' THEN p_sign ELSE 0 END,
+        locked = locked + CASE WHEN s.status = 'Locked' THEN p_sign ELSE 0 END,
+        estimated_pages = estimated_pages + p_sign * COALESCE(s.estimated_pages, 0),
+        content_chars = content_chars + p_sign * s.content_chars,
+        tokens_used = tokens_used + p_sign * s.tokens_used,
+        requirement_links = requirement_links + p_sign * s.requirement_links,
+        updated_at = NOW()
+    WHERE chapter_id = v_chapter;
+    IF p_sign < 0 THEN
+        DELETE FROM chapter_progress WHERE chapter_id = v_chapter AND sections_total <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_section_progress() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_section_progress(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_section_progress(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_section_progress ON sections;
+CREATE TRIGGER trg_section_progress AFTER INSERT OR DELETE ON sections
+    FOR EACH ROW EXECUTE FUNCTION track_section_progress();
+DROP TRIGGER IF EXISTS trg_section_progress_update ON sections;
+CREATE TRIGGER trg_section_progress_update AFTER UPDATE ON sections
+    FOR EACH ROW WHEN (
+        OLD.path IS DISTINCT FROM NEW.path
+        OR OLD.status IS DISTINCT FROM NEW.status
+        OR OLD.estimated_pages IS DISTINCT FROM NEW.estimated_pages
+        OR OLD.content_chars <> NEW.content_chars
+        OR OLD.tokens_used <> NEW.tokens_used
+        OR OLD.requirement_links <> NEW.requirement_links
+    ) EXECUTE FUNCTION track_section_progress();
+
+-- Length of the current version.  It may not be re-materialized yet when
+-- the section row is written, hence the layout estimate's character count.
+CREATE OR REPLACE FUNCTION set_section_content_chars() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.content_chars := COALESCE((
+        SELECT COALESCE(char_length(content), (metadata->'layout'->>'chars')::int)
+        FROM section_versions WHERE id = NEW.current_version_id
+    ), 0);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_section_content_chars ON sections;
+CREATE TRIGGER trg_section_content_chars BEFORE UPDATE ON sections
+    FOR EACH ROW WHEN (OLD.current_version_id IS DISTINCT FROM NEW.current_version_id)
+    EXECUTE FUNCTION set_section_content_chars();
+
+CREATE OR REPLACE FUNCTION track_requirements() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO project_progress AS p (project_id, requirements_total) VALUES (NEW.project_id, 1)
+        ON CONFLICT (project_id) DO UPDATE
+            SET requirements_total = p.requirements_total + 1, updated_at = NOW();
+    ELSE
+        UPDATE project_progress SET requirements_total = requirements_total - 1, updated_at = NOW()
+        WHERE project_id = OLD.project_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A requirement is covered while at least one section links to it.  The
+-- requirement row is locked so concurrent link changes see each other.
+CREATE OR REPLACE FUNCTION track_requirement_links() RETURNS TRIGGER AS $$
+DECLARE
+    v_link RECORD;
+    v_sign INT;
+    v_project UUID;
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        UPDATE sections SET requirement_links = requirement_links - 1 WHERE id = OLD.section_id;
+        UPDATE sections SET requirement_links = requirement_links + 1 WHERE id = NEW.section_id;
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        v_link := NEW; v_sign := 1;
+    ELSE
+        v_link := OLD; v_sign := -1;
+    END IF;
+    PERFORM 1 FROM project_requirements WHERE id = v_link.requirement_id FOR UPDATE;
+    UPDATE sections SET requirement_links = requirement_links + v_sign WHERE id = v_link.section_id;
+    IF NOT EXISTS (
+        SELECT 1 FROM section_requirement_links
+        WHERE requirement_id = v_link.requirement_id AND id <> v_link.id
+    ) THEN
+        -- Either side may already be gone when the delete cascades from it
+        v_project := COALESCE(
+            (SELECT project_id FROM sections WHERE id = v_link.section_id),
+            (SELECT project_id FROM project_requirements WHERE id = v_link.requirement_id)
+        );
+        UPDATE project_progress
+        SET requirements_covered = requirements_covered + v_sign, updated_at = NOW()
+        WHERE project_id = v_project;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_requirements_progress ON project_requirements;
+CREATE TRIGGER trg_requirements_progress AFTER INSERT OR DELETE ON project_requirements
+    FOR EACH ROW EXECUTE FUNCTION track_requirements();
+
+DROP TRIGGER IF EXISTS trg_requirement_links_progress ON section_requirement_links;
+CREATE TRIGGER trg_requirement_links_progress
+    AFTER INSERT OR DELETE OR UPDATE OF section_id ON section_requirement_links
+    FOR EACH ROW EXECUTE FUNCTION track_requirement_links();
+
+-- Recompute one project's progress inputs and counters from scratch
+CREATE OR REPLACE FUNCTION rebuild_progress(p_project_id UUID) RETURNS VOID AS $$
+BEGIN
+    UPDATE sections s SET
+        content_chars = COALESCE((
+            SELECT COALESCE(char_length(v.content), (v.metadata->'layout'->>'chars')::int)
+            FROM section_versions v WHERE v.id = s.current_version_id
+        ), 0),
+        tokens_used = COALESCE((SELECT SUM(u.total_tokens) FROM usage_logs u WHERE u.section_id = s.id), 0)
+    WHERE s.project_id = p_project_id;
+
+    DELETE FROM project_progress WHERE project_id = p_project_id;
+    INSERT INTO project_progress (project_id) VALUES (p_project_id);
+
+    UPDATE sections s SET requirement_links = (
+        SELECT COUNT(*) FROM section_requirement_links l WHERE l.section_id = s.id
+    )
+    WHERE s.project_id = p_project_id;
+    UPDATE project_progress SET
+        requirements_total = (
+            SELECT COUNT(*) FROM project_requirements WHERE project_id = p_project_id
+        ),
+        requirements_covered = (
+            SELECT COUNT(DISTINCT l.requirement_id)
+            FROM section_requirement_links l
+            JOIN project_requirements r ON r.id = l.requirement_id
+            WHERE r.project_id = p_project_id
+        )
+    WHERE project_id = p_project_id;
+
+    -- The updates above went through the triggers; replace their result
+    DELETE FROM chapter_progress WHERE project_id = p_project_id;
+    INSERT INTO chapter_progress (
+        chapter_id, project_id, sections_total, not_started, writing, review, approved, locked,
+        estimated_pages, content_chars, tokens_used, requirement_links
+    )
+    SELECT substr(path, 1, 32)::uuid, p_project_id, COUNT(*),
+           COUNT(*) FILTER (WHERE status = 'NotStarted'),
+           COUNT(*) FILTER (WHERE status = 'Writing'),
+           COUNT(*) FILTER (WHERE status = 'Review'),
+           COUNT(*) FILTER (WHERE status = 'Approved'),
+           COUNT(*) FILTER (WHERE status = 'Locked'),
+           COALESCE(SUM(estimated_pages), 0), SUM(content_chars), SUM(tokens_used),
+           SUM(requirement_links)
+    FROM sections
+    WHERE project_id = p_project_id AND path IS NOT NULL
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill counters of projects created before they existed
+SELECT rebuild_progress(p.id) FROM projects p
+WHERE NOT EXISTS (SELECT 1 FROM project_progress pp WHERE pp.project_id = p.id);
+
 -- =============================================================================
 -- Seed Data
 -- =============================================================================